@@ -19,14 +19,14 @@ from authn.session_revocation import CURRENT_SESSION_IAT_LEEWAY_SECONDS
 from .utils import _get_current_session_iat
 
 
-def _blacklist_session_access_tokens(user, session_created_at):
+def _blacklist_session_access_tokens(user, session_created_ats):
     """
-    Blacklist access tokens associated with a session.
+    Blacklist access tokens associated with one or more sessions.
 
     Since access tokens don't directly reference their refresh token,
     we use the session creation timestamp as a session identifier.
     When checking access tokens, we compare their iat (issued-at) with
-    stored revoked session timestamps.
+    the revoked session timestamps in the user's revocation record.
 
     This enables immediate session termination when a device is revoked.
     """
@@ -37,19 +37,25 @@ def _blacklist_session_access_tokens(user, session_created_at):
         "ACCESS_TOKEN_LIFETIME", timedelta(days=1)
     )
 
-    # Blacklist entry expires when the access token would have expired
-    expires_at = session_created_at + access_lifetime
-
-    # Create session key using timestamp - matches the JWT's iat claim
-    session_ts = int(session_created_at.timestamp())
-    session_key = f"session_{user.id}_{session_ts}"
+    sessions = []
+    for session_created_at in session_created_ats:
+        # Blacklist entry expires when the access token would have expired
+        expires_at = session_created_at + access_lifetime
+
+        # Session timestamp matches the JWT's iat claim
+        session_ts = int(session_created_at.timestamp())
+        sessions.append((session_ts, expires_at))
+
+        # Per-session blacklist item, still read by images that predate the
+        # revocation record (keeps a rollback safe).
+        SecurityRepository.blacklist_token(
+            jti=f"session_{user.id}_{session_ts}",
+            user_id=user.id,
+            expires_at=expires_at,
+        )
 
-    # Create a blacklist entry using DynamoDB
-    SecurityRepository.blacklist_token(
-        jti=session_key,
-        user_id=user.id,
-        expires_at=expires_at,
-    )
+    if sessions:
+        SecurityRepository.revoke_sessions(user.id, sessions)
 
 
 @api_view(["DELETE", "POST"])
@@ -96,7 +102,7 @@ def revoke_device(request, token_id):
     BlacklistedToken.objects.create(token=token)
 
     # Also blacklist associated access tokens for immediate effect
-    _blacklist_session_access_tokens(request.user, token.created_at)
+    _blacklist_session_access_tokens(request.user, [token.created_at])
 
     return Response({"message": "Device logged out successfully"})
 
@@ -136,8 +142,9 @@ def revoke_all_other_devices(request):
             ignore_conflicts=True,
         )
         # Blacklist associated access tokens for immediate effect
-        for token in tokens_to_revoke:
-            _blacklist_session_access_tokens(request.user, token.created_at)
+        _blacklist_session_access_tokens(
+            request.user, [t.created_at for t in tokens_to_revoke]
+        )
 
     revoked_count = len(tokens_to_revoke)
 
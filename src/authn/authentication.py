@@ -5,9 +5,10 @@ from rest_framework.authentication import CSRFCheck
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 
 from authn.repositories import SecurityRepository
-from authn.session_revocation import SESSION_REVOCATION_MATCH_WINDOW_SECONDS
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -59,25 +60,31 @@ class CookieJWTAuthentication(JWTAuthentication):
         try:
             validated_token = self.get_validated_token(raw_token)
 
-            # Check if this access token has been blacklisted (session revoked)
+            # Blacklisted JTI and revoked session are checked together: one
+            # BatchGetItem at most, usually none thanks to per-worker caches.
             jti = validated_token.get("jti")
-            if jti and SecurityRepository.is_blacklisted(jti):
+            iat = validated_token.get("iat")
+            revocation = SecurityRepository.check_access_token(
+                jti,
+                validated_token.get(api_settings.USER_ID_CLAIM),
+                int(iat) if iat else None,
+            )
+            metrics.incr("auth_dynamodb_round_trips", revocation.round_trips)
+
+            # Check if this access token has been blacklisted (session revoked)
+            if revocation.blacklisted:
                 logger.warning("Rejecting blacklisted token JTI: %s...", jti[:8])
                 raise exceptions.AuthenticationFailed("Session has been revoked")
 
             user = self.get_user(validated_token)
 
-            # Check if session has been revoked by matching user + token time.
-            iat = validated_token.get("iat")
-            if user and iat:
-                token_iat = int(iat)
-                if SecurityRepository.check_session_revocation(
-                    user.id, token_iat, SESSION_REVOCATION_MATCH_WINDOW_SECONDS
-                ):
-                    logger.info("Rejecting revoked session for user %s", user.id)
-                    raise exceptions.AuthenticationFailed(
-                        "Session has been revoked. Please log in again."
-                    )
+            # Check if session has been revoked by matching user + token time
+            # against the user's revocation record.
+            if user and revocation.session_revoked:
+                logger.info("Rejecting revoked session for user %s", user.id)
+                raise exceptions.AuthenticationFailed(
+                    "Session has been revoked. Please log in again."
+                )
 
         except (InvalidToken, TokenError):
             return None
@@ -0,0 +1,78 @@
+"""Management command to fold legacy session blacklist items into user records."""
+
+from collections import defaultdict
+from datetime import UTC, datetime
+
+from boto3.dynamodb.conditions import Attr, Key
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from authn.repositories import SecurityRepository
+from core.dynamodb.client import get_table, query_all
+
+
+def _parse_session_key(jti: str):
+    """Return (user_id, session_ts) for ``session_<user_id>_<ts>``, else None."""
+    parts = jti.split("_")
+    if len(parts) != 3 or parts[0] != "session":
+        return None
+    try:
+        return int(parts[1]), int(parts[2])
+    except ValueError:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy still-live per-session access-token blacklist items "
+        "(session_<user>_<ts>) into each user's session revocation record. "
+        "Safe to re-run; existing records are merged, not replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the sessions that would be migrated without writing them",
+        )
+
+    def handle(self, *args, **options):
+        lifetime = settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+        since = (timezone.now() - lifetime).isoformat()
+        now_epoch = int(timezone.now().timestamp())
+
+        items = query_all(
+            get_table("auth_security"),
+            IndexName="EntityTypeIndex",
+            KeyConditionExpression=(
+                Key("entity_type").eq("blacklist") & Key("created_at").gte(since)
+            ),
+            FilterExpression=Attr("jti").begins_with("session_"),
+        )
+
+        sessions = defaultdict(list)
+        for item in items:
+            parsed = _parse_session_key(item.get("jti", ""))
+            expires_at = int(item.get("expires_at", 0))
+            if parsed is None or expires_at <= now_epoch:
+                continue
+            user_id, session_ts = parsed
+            sessions[user_id].append(
+                (session_ts, datetime.fromtimestamp(expires_at, tz=UTC))
+            )
+
+        total = sum(len(v) for v in sessions.values())
+        self.stdout.write(
+            f"Found {total} live revoked sessions for {len(sessions)} users."
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: no records written."))
+            return
+
+        for user_id, pairs in sessions.items():
+            SecurityRepository.revoke_sessions(user_id, pairs)
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {len(sessions)} revocation records.")
+        )
@@ -0,0 +1,48 @@
+"""Tests for the migrate_session_revocations management command."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from authn.repositories import SecurityRepository
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class MigrateSessionRevocationsCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("migrate_session_revocations", *args, stdout=out)
+        return out.getvalue()
+
+    def setUp(self):
+        super().setUp()
+        self.iat = int(timezone.now().timestamp())
+        expires = timezone.now() + timedelta(hours=1)
+        SecurityRepository.blacklist_token(f"session_7_{self.iat}", 7, expires)
+        SecurityRepository.blacklist_token(f"session_7_{self.iat - 600}", 7, expires)
+        SecurityRepository.blacklist_token(f"session_8_{self.iat}", 8, expires)
+        SecurityRepository.blacklist_token("plain-jti", 9, expires)
+
+    def test_copies_legacy_sessions_into_user_records(self):
+        output = self._run()
+
+        self.assertIn("Found 3 live revoked sessions for 2 users", output)
+        self.assertTrue(SecurityRepository.is_session_revoked(7, self.iat))
+        self.assertTrue(SecurityRepository.is_session_revoked(7, self.iat - 600))
+        self.assertTrue(SecurityRepository.is_session_revoked(8, self.iat))
+        self.assertFalse(SecurityRepository.is_session_revoked(9, self.iat))
+
+    def test_rerun_merges_instead_of_duplicating(self):
+        self._run()
+        self._run()
+        record = SecurityRepository.get_session_revocations(7, use_cache=False)
+        self.assertEqual(len(record.ranges), 2)
+
+    def test_dry_run_writes_nothing(self):
+        output = self._run("--dry-run")
+
+        self.assertIn("Dry run", output)
+        self.assertFalse(SecurityRepository.is_session_revoked(7, self.iat))
@@ -3,22 +3,55 @@ Repository for DynamoDB AuthSecurity table operations.
 
 Single-table design for 3 entity types:
 - AccessTokenBlacklist: PK=JTI#<jti>, SK=BLACKLIST
+- SessionRevocations: PK=REVOKED#<user_id>, SK=SESSIONS
 - FailedLoginAttempt: PK=FAILED#<username>, SK=ATTEMPT
 - LoginAuditLog: PK=AUDIT#<username>, SK=LOG#<created_at>#<uuid>
 """
 
 from __future__ import annotations
 
+import logging
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 
 from boto3.dynamodb.conditions import Attr, Key
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
 
-from authn.session_revocation import SESSION_REVOCATION_MATCH_WINDOW_SECONDS
-from core.dynamodb.client import get_table, query_limited
+from authn.session_revocation import (
+    SESSION_REVOCATION_MATCH_WINDOW_SECONDS,
+    SessionRevocations,
+)
+from core.dynamodb.client import batch_get_items, get_table, query_limited
+from core.local_cache import LocalTTLCache
+
+logger = logging.getLogger(__name__)
+
+_NOT_CACHED = object()
+
+
+@dataclass(frozen=True)
+class TokenRevocationStatus:
+    """Outcome of SecurityRepository.check_access_token()."""
+
+    blacklisted: bool
+    session_revoked: bool
+    round_trips: int
+
+
+# Optimistic-concurrency retries when two revocations for the same user race.
+SESSION_REVOCATION_WRITE_ATTEMPTS = 5
+
+# Shared-cache counter bumped on every blacklist write; workers drop their
+# negative JTI cache entries when it moves.
+BLACKLIST_GENERATION_CACHE_KEY = "authn:blacklist-generation"
+
+_revocation_cache: Optional[LocalTTLCache] = None
+_blacklist_cache: Optional[LocalTTLCache] = None
 
 
 def _now_iso() -> str:
@@ -34,6 +67,156 @@ def _table():
     return get_table("auth_security")
 
 
+def _blacklist_key(jti: str) -> dict:
+    return {"pk": f"JTI#{jti}", "sk": "BLACKLIST"}
+
+
+def _revocation_key(user_id) -> dict:
+    return {"pk": f"REVOKED#{user_id}", "sk": "SESSIONS"}
+
+
+def _revocation_version_key(user_id) -> str:
+    return f"authn:session-revocations:version:{user_id}"
+
+
+def _access_token_lifetime() -> timedelta:
+    return getattr(settings, "SIMPLE_JWT", {}).get(
+        "ACCESS_TOKEN_LIFETIME", timedelta(days=1)
+    )
+
+
+def _revocation_cache_ttl() -> float:
+    return float(getattr(settings, "SESSION_REVOCATION_CACHE_TTL_SECONDS", 0))
+
+
+def _get_revocation_cache() -> LocalTTLCache:
+    global _revocation_cache
+    if _revocation_cache is None:
+        _revocation_cache = LocalTTLCache(
+            max_entries=getattr(
+                settings, "SESSION_REVOCATION_CACHE_MAX_ENTRIES", 10000
+            ),
+            ttl_seconds=_revocation_cache_ttl(),
+        )
+    return _revocation_cache
+
+
+def _blacklist_cache_ttl() -> float:
+    return float(getattr(settings, "JWT_BLACKLIST_CACHE_TTL_SECONDS", 0))
+
+
+def _get_blacklist_cache() -> LocalTTLCache:
+    global _blacklist_cache
+    if _blacklist_cache is None:
+        _blacklist_cache = LocalTTLCache(
+            max_entries=getattr(settings, "JWT_BLACKLIST_CACHE_MAX_ENTRIES", 50000),
+            ttl_seconds=_blacklist_cache_ttl(),
+        )
+    return _blacklist_cache
+
+
+def _shared_generation_enabled() -> bool:
+    return bool(getattr(settings, "JWT_BLACKLIST_SHARED_GENERATION", False))
+
+
+def _shared_cache_get(key: str) -> Optional[int]:
+    """Read a version counter from the shared cache; None if unknown/unavailable."""
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.warning("Shared cache unavailable reading %s", key)
+        return None
+
+
+def _shared_cache_set(key: str, value: int) -> None:
+    try:
+        cache.set(key, value, timeout=int(_access_token_lifetime().total_seconds()))
+    except Exception:
+        logger.warning("Could not publish %s to the shared cache", key)
+
+
+def _bump_blacklist_generation() -> None:
+    try:
+        cache.add(BLACKLIST_GENERATION_CACHE_KEY, 0, timeout=None)
+        cache.incr(BLACKLIST_GENERATION_CACHE_KEY)
+    except ValueError:
+        # Evicted between add and incr; the next bump recreates it.
+        pass
+    except Exception:
+        logger.warning("Could not bump the shared blacklist generation")
+
+
+def _get_shared_version(user_id) -> Optional[int]:
+    """Latest revocation version published by any worker, if known."""
+    return _shared_cache_get(_revocation_version_key(user_id))
+
+
+def _publish_version(user_id, version: int) -> None:
+    _shared_cache_set(_revocation_version_key(user_id), version)
+
+
+def _cached_not_blacklisted(jti: str) -> tuple[bool, Optional[int]]:
+    """
+    Return (known_not_blacklisted, generation) from the worker cache.
+
+    The generation is the shared blacklist generation observed *before* any
+    DynamoDB read, and is what a fresh negative answer must be stored under.
+    """
+    if _blacklist_cache_ttl() <= 0:
+        return False, None
+    generation = (
+        _shared_cache_get(BLACKLIST_GENERATION_CACHE_KEY)
+        if _shared_generation_enabled()
+        else None
+    )
+    cached = _get_blacklist_cache().get(jti, _NOT_CACHED)
+    hit = cached is not _NOT_CACHED and (generation is None or cached == generation)
+    return hit, generation
+
+
+def _remember_not_blacklisted(jti: str, generation: Optional[int]) -> None:
+    ttl = _blacklist_cache_ttl()
+    if ttl > 0:
+        _get_blacklist_cache().set(jti, generation, ttl)
+
+
+def _cached_revocations(user_id) -> tuple[Optional[SessionRevocations], Optional[int]]:
+    """
+    Return (cached record or None, shared version) for *user_id*.
+
+    A cached record is only returned while no newer version has been
+    published to the shared cache.
+    """
+    if _revocation_cache_ttl() <= 0:
+        return None, None
+    shared_version = _get_shared_version(user_id)
+    cached = _get_revocation_cache().get(str(user_id))
+    if cached is not None and (
+        shared_version is None or cached.version >= shared_version
+    ):
+        return cached, shared_version
+    return None, shared_version
+
+
+def _remember_revocations(user_id, record: SessionRevocations) -> None:
+    ttl = _revocation_cache_ttl()
+    if ttl > 0:
+        _get_revocation_cache().set(str(user_id), record, ttl)
+
+
+def _parse_revocations(item: Optional[dict]) -> SessionRevocations:
+    if not item:
+        return SessionRevocations()
+    revoked_before = item.get("revoked_before")
+    return SessionRevocations(
+        version=int(item.get("record_version", 0)),
+        ranges=tuple(
+            sorted(tuple(int(v) for v in r) for r in item.get("revoked_ranges", []))
+        ),
+        revoked_before=int(revoked_before) if revoked_before is not None else None,
+    )
+
+
 class SecurityRepository:
     """Data access for the MobileID-AuthSecurity DynamoDB table."""
 
@@ -47,12 +230,22 @@ class SecurityRepository:
         Check if an access token JTI is blacklisted.
 
         Hot path — called on every authenticated request.
-        Single GetItem by PK, sub-10ms latency.
+        Single GetItem by PK, sub-10ms latency. "Not blacklisted" answers are
+        cached per worker for JWT_BLACKLIST_CACHE_TTL_SECONDS, and dropped early
+        when the shared blacklist generation moves.
         """
-        resp = _table().get_item(
-            Key={"pk": f"JTI#{jti}", "sk": "BLACKLIST"},
-            ProjectionExpression="pk",
-        )
+        known_clean, generation = _cached_not_blacklisted(jti)
+        if known_clean:
+            return False
+
+        blacklisted = SecurityRepository._fetch_blacklisted(jti)
+        if not blacklisted:
+            _remember_not_blacklisted(jti, generation)
+        return blacklisted
+
+    @staticmethod
+    def _fetch_blacklisted(jti: str) -> bool:
+        resp = _table().get_item(Key=_blacklist_key(jti), ProjectionExpression="pk")
         return "Item" in resp
 
     @staticmethod
@@ -73,6 +266,21 @@ class SecurityRepository:
                 "expires_at": _to_epoch(expires_at),
             }
         )
+        if _blacklist_cache is not None:
+            _blacklist_cache.delete(jti)
+        if _shared_generation_enabled():
+            _bump_blacklist_generation()
+
+    @staticmethod
+    def clear_blacklist_cache() -> None:
+        """Drop this worker's cached "not blacklisted" answers."""
+        if _blacklist_cache is not None:
+            _blacklist_cache.clear()
+
+    @staticmethod
+    def blacklist_cache_stats() -> dict:
+        """Hit/miss counters of this worker's negative JTI cache."""
+        return _get_blacklist_cache().stats()
 
     @staticmethod
     def check_session_revocation(
@@ -83,10 +291,10 @@ class SecurityRepository:
         """
         Check if a session has been revoked by matching possible session JTIs.
 
-        Uses BatchGetItem to check all ~21 possible JTIs in a single round-trip
-        instead of sequential GetItem calls.
+        Legacy lookup over the per-session ``session_<user>_<ts>`` blacklist
+        items. Authentication uses is_session_revoked(); this is kept for
+        tooling that still needs to inspect the old layout.
         """
-        from django.conf import settings
         from core.dynamodb.client import get_resource
 
         possible_jtis = [
@@ -117,6 +325,178 @@ class SecurityRepository:
         """Blacklist a session by its key."""
         SecurityRepository.blacklist_token(session_key, user_id, expires_at)
 
+    # ==================================================================
+    # SessionRevocations operations
+    # ==================================================================
+
+    @staticmethod
+    def get_session_revocations(
+        user_id: int, use_cache: bool = True
+    ) -> SessionRevocations:
+        """
+        Return the user's revoked-session record.
+
+        Hot path — called on every authenticated request. Served from the
+        per-worker cache unless another worker has published a newer version
+        to the shared cache; otherwise a single GetItem.
+        """
+        if not use_cache:
+            return SecurityRepository._fetch_session_revocations(user_id)
+
+        cached, shared_version = _cached_revocations(user_id)
+        if cached is not None:
+            return cached
+
+        record = SecurityRepository._fetch_session_revocations(
+            user_id, consistent=shared_version is not None
+        )
+        _remember_revocations(user_id, record)
+        return record
+
+    @staticmethod
+    def is_session_revoked(user_id: int, token_iat: int) -> bool:
+        """Check whether an access token issued at *token_iat* was revoked."""
+        return SecurityRepository.get_session_revocations(user_id).is_revoked(
+            int(token_iat)
+        )
+
+    @staticmethod
+    def revoke_sessions(
+        user_id: int,
+        sessions: Iterable[tuple[int, datetime]],
+        revoked_before: datetime = None,
+        window: int = SESSION_REVOCATION_MATCH_WINDOW_SECONDS,
+    ) -> SessionRevocations:
+        """
+        Add ``(session_ts, expires_at)`` pairs to the user's revocation record.
+
+        *revoked_before* additionally revokes every token issued before it.
+        Concurrent writers are serialized with a conditional put on the record
+        version; the new version is published so other workers drop their
+        cached copy.
+        """
+        pairs = [(int(ts), _to_epoch(exp)) for ts, exp in sessions]
+        before_epoch = _to_epoch(revoked_before) if revoked_before else None
+        conflict = _table().meta.client.exceptions.ConditionalCheckFailedException
+
+        for _attempt in range(SESSION_REVOCATION_WRITE_ATTEMPTS):
+            current = SecurityRepository._fetch_session_revocations(
+                user_id, consistent=True
+            )
+            updated = current.with_sessions(
+                pairs, window=window, revoked_before=before_epoch
+            )
+            expirations = [exp for _, _, exp in updated.ranges]
+            if updated.revoked_before is not None:
+                expirations.append(
+                    updated.revoked_before
+                    + int(_access_token_lifetime().total_seconds())
+                )
+
+            item = {
+                **_revocation_key(user_id),
+                "entity_type": "session_revocations",
+                "user_id": str(user_id),
+                "record_version": updated.version,
+                "revoked_ranges": [list(r) for r in updated.ranges],
+                "updated_at": _now_iso(),
+                "expires_at": max(expirations, default=_to_epoch(timezone.now())),
+            }
+            if updated.revoked_before is not None:
+                item["revoked_before"] = updated.revoked_before
+
+            try:
+                _table().put_item(
+                    Item=item,
+                    ConditionExpression=(
+                        Attr("pk").not_exists()
+                        | Attr("record_version").eq(current.version)
+                    ),
+                )
+            except conflict:
+                continue
+
+            _remember_revocations(user_id, updated)
+            _publish_version(user_id, updated.version)
+            return updated
+
+        raise RuntimeError(
+            f"Could not update session revocations for user {user_id} after "
+            f"{SESSION_REVOCATION_WRITE_ATTEMPTS} attempts"
+        )
+
+    @staticmethod
+    def _fetch_session_revocations(
+        user_id: int, consistent: bool = False
+    ) -> SessionRevocations:
+        resp = _table().get_item(
+            Key=_revocation_key(user_id),
+            ProjectionExpression="record_version, revoked_ranges, revoked_before",
+            ConsistentRead=consistent,
+        )
+        return _parse_revocations(resp.get("Item"))
+
+    @staticmethod
+    def clear_session_revocation_cache() -> None:
+        """Drop this worker's cached revocation records."""
+        if _revocation_cache is not None:
+            _revocation_cache.clear()
+
+    # ==================================================================
+    # Combined authentication check
+    # ==================================================================
+
+    @staticmethod
+    def check_access_token(
+        jti: Optional[str], user_id, token_iat: Optional[int]
+    ) -> TokenRevocationStatus:
+        """
+        Check the JTI blacklist and the user's session revocations together.
+
+        Hot path — called on every authenticated request. Whatever the
+        per-worker caches cannot answer is fetched with a single BatchGetItem
+        (JTI item + revocation record); ``round_trips`` reports how many
+        DynamoDB requests that took, including UnprocessedKeys retries.
+        """
+        keys = []
+        known_clean, generation = (True, None)
+        if jti:
+            known_clean, generation = _cached_not_blacklisted(jti)
+            if not known_clean:
+                keys.append(_blacklist_key(jti))
+
+        record, shared_version = (None, None)
+        check_session = user_id is not None and token_iat is not None
+        if check_session:
+            record, shared_version = _cached_revocations(user_id)
+            if record is None:
+                keys.append(_revocation_key(user_id))
+
+        stats = {"round_trips": 0}
+        blacklisted = False
+        if keys:
+            items = batch_get_items(
+                "auth_security",
+                keys,
+                projection=("pk, record_version, revoked_ranges, revoked_before"),
+                consistent=shared_version is not None,
+                stats=stats,
+            )
+            by_pk = {item["pk"]: item for item in items}
+            if jti and not known_clean:
+                blacklisted = _blacklist_key(jti)["pk"] in by_pk
+                if not blacklisted:
+                    _remember_not_blacklisted(jti, generation)
+            if check_session and record is None:
+                record = _parse_revocations(by_pk.get(_revocation_key(user_id)["pk"]))
+                _remember_revocations(user_id, record)
+
+        return TokenRevocationStatus(
+            blacklisted=blacklisted,
+            session_revoked=bool(record and record.is_revoked(int(token_iat))),
+            round_trips=stats["round_trips"],
+        )
+
     # ==================================================================
     # FailedLoginAttempt operations
     # ==================================================================
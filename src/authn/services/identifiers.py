@@ -1,7 +1,7 @@
 import secrets
 
 from authn.models import UserProfile
-from index.repositories import BarcodeRepository
+from index.services.barcode import generate_unique_identification_barcode
 
 
 def generate_unique_information_id(length: int = 9) -> str:
@@ -18,14 +18,6 @@ def generate_unique_information_id(length: int = 9) -> str:
             return info_id
 
 
-def generate_unique_identification_barcode() -> str:
-    """Generate a unique 28-digit Identification barcode value."""
-    while True:
-        code = "".join(str(secrets.randbelow(10)) for _ in range(28))
-        if not BarcodeRepository.barcode_exists(code):
-            return code
-
-
 __all__ = [
     "generate_unique_identification_barcode",
     "generate_unique_information_id",
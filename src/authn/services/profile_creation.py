@@ -1,14 +1,8 @@
 from authn.models import UserProfile
-from index.repositories import (
-    BarcodeRepository,
-    SettingsRepository,
-    TransactionRepository,
-)
+from index.repositories import SettingsRepository, TransactionRepository
+from index.services.barcode import rotate_identification_barcode
 
-from .identifiers import (
-    generate_unique_identification_barcode,
-    generate_unique_information_id,
-)
+from .identifiers import generate_unique_information_id
 
 
 def create_user_profile(
@@ -23,17 +17,13 @@ def create_user_profile(
         user_profile_img=user_profile_img or None,
     )
 
-    ident_barcode = BarcodeRepository.create(
-        user_id=user.id,
-        barcode_value=generate_unique_identification_barcode(),
-        barcode_type="Identification",
-        owner_username=user.username,
-    )
+    ident_barcode = rotate_identification_barcode(user)
 
     TransactionRepository.create(
         user_id=user.id,
         barcode_uuid=ident_barcode["barcode_uuid"],
         barcode_value=ident_barcode["barcode"],
+        barcode_owner_id=user.id,
     )
 
     SettingsRepository.update(
@@ -1,8 +1,15 @@
 """
 Shared tolerances for identifying the current session across access and refresh
-tokens.
+tokens, and the per-user record of revoked sessions checked on every request.
 """
 
+from __future__ import annotations
+
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
 # Access and refresh tokens are minted together, but the persisted refresh-token
 # timestamps can differ by a small amount depending on storage timing. Keep all
 # "is this the current session?" checks aligned to the same narrow leeway so we
@@ -11,3 +18,70 @@ CURRENT_SESSION_IAT_LEEWAY_SECONDS = 2
 
 # Authentication should use the same tolerance as device listing/revocation.
 SESSION_REVOCATION_MATCH_WINDOW_SECONDS = CURRENT_SESSION_IAT_LEEWAY_SECONDS
+
+_MAX_EPOCH = 2**63
+
+
+@dataclass(frozen=True)
+class SessionRevocations:
+    """
+    A user's revoked sessions, as stored in one AuthSecurity item.
+
+    ``ranges`` holds non-overlapping ``(start, end, expires_at)`` tuples of
+    revoked access-token ``iat`` values, sorted by ``start``; each range is the
+    revoked session's timestamp widened by the match window. ``revoked_before``
+    revokes every token issued strictly before it. ``version`` increases on
+    every write and drives cache invalidation.
+    """
+
+    version: int = 0
+    ranges: tuple[tuple[int, int, int], ...] = ()
+    revoked_before: Optional[int] = None
+
+    def is_revoked(self, token_iat: int, now: int = None) -> bool:
+        """Return True if a token issued at *token_iat* belongs to a revoked session."""
+        if self.revoked_before is not None and token_iat < self.revoked_before:
+            return True
+        idx = bisect.bisect_right(self.ranges, (token_iat, _MAX_EPOCH, _MAX_EPOCH))
+        if idx == 0:
+            return False
+        start, end, expires_at = self.ranges[idx - 1]
+        now = int(time.time()) if now is None else now
+        return start <= token_iat <= end and expires_at > now
+
+    def with_sessions(
+        self,
+        sessions: Iterable[tuple[int, int]],
+        window: int = SESSION_REVOCATION_MATCH_WINDOW_SECONDS,
+        revoked_before: Optional[int] = None,
+        now: int = None,
+    ) -> "SessionRevocations":
+        """
+        Return the next version with ``(session_ts, expires_at)`` pairs added.
+
+        Expired ranges are dropped and overlapping ones merged so the record
+        stays proportional to the number of live revoked sessions.
+        """
+        now = int(time.time()) if now is None else now
+        ranges = [r for r in self.ranges if r[2] > now]
+        ranges.extend(
+            (ts - window, ts + window, exp) for ts, exp in sessions if exp > now
+        )
+        ranges.sort()
+
+        merged: list[list[int]] = []
+        for start, end, exp in ranges:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+                merged[-1][2] = max(merged[-1][2], exp)
+            else:
+                merged.append([start, end, exp])
+
+        if self.revoked_before is not None:
+            revoked_before = max(revoked_before or 0, self.revoked_before)
+
+        return SessionRevocations(
+            version=self.version + 1,
+            ranges=tuple(tuple(r) for r in merged),
+            revoked_before=revoked_before,
+        )
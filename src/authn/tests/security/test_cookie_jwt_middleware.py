@@ -72,11 +72,8 @@ class CookieJWTAuthenticationTests(APITestCase):
 
         # Create a session revocation entry matching the token's iat
         iat = int(access_token["iat"])
-        session_key = f"session_{self.user.id}_{iat}"
-        SecurityRepository.blacklist_token(
-            jti=session_key,
-            user_id=self.user.id,
-            expires_at=timezone.now() + timedelta(hours=1),
+        SecurityRepository.revoke_sessions(
+            self.user.id, [(iat, timezone.now() + timedelta(hours=1))]
         )
 
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
@@ -96,11 +93,9 @@ class CookieJWTAuthenticationTests(APITestCase):
         nearby_other_session_iat = (
             int(access_token["iat"]) + CURRENT_SESSION_IAT_LEEWAY_SECONDS + 1
         )
-        session_key = f"session_{self.user.id}_{nearby_other_session_iat}"
-        SecurityRepository.blacklist_token(
-            jti=session_key,
-            user_id=self.user.id,
-            expires_at=timezone.now() + timedelta(hours=1),
+        SecurityRepository.revoke_sessions(
+            self.user.id,
+            [(nearby_other_session_iat, timezone.now() + timedelta(hours=1))],
         )
 
         self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access_token}")
@@ -108,6 +103,19 @@ class CookieJWTAuthenticationTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["username"], "cookieuser")
 
+    def test_auth_round_trips_are_recorded_in_request_metrics(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        SecurityRepository.clear_blacklist_cache()
+        SecurityRepository.clear_session_revocation_cache()
+
+        response = self.client.get(self.auth_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.wsgi_request.metrics.get("auth_dynamodb_round_trips"), 1
+        )
+
     def test_cookie_auth_post_requires_csrf(self):
         """POST with cookie auth but no CSRF token should fail."""
         csrf_client = APIClient(enforce_csrf_checks=True)
@@ -3,6 +3,7 @@ Unit tests for SecurityRepository — DynamoDB-backed auth security operations.
 
 Covers:
 - AccessTokenBlacklist: is_blacklisted, blacklist_token, check_session_revocation
+- SessionRevocations: revoke_sessions, is_session_revoked, record caching
 - FailedLoginAttempt: get_failed_attempt, increment_failed_attempt, reset, lock
 - LoginAuditLog: create_audit_log, get_audit_logs_for_user
 
@@ -12,11 +13,15 @@ worth pinning down explicitly.
 """
 
 from datetime import timedelta
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.utils import timezone
 
-from authn.repositories import SecurityRepository
+from authn.repositories import SecurityRepository, security_repo
+from authn.repositories.security_repo import _revocation_version_key
+from authn.session_revocation import SessionRevocations
 from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
 
 
@@ -46,6 +51,65 @@ class BlacklistOperationsTests(DynamoDBCleanupMixin, TestCase):
         self.assertTrue(SecurityRepository.is_blacklisted("session_7_1700000000"))
 
 
+class BlacklistNegativeCacheTests(DynamoDBCleanupMixin, TestCase):
+    """is_blacklisted caches "not blacklisted" answers per worker."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.expires = timezone.now() + timedelta(hours=1)
+
+    def test_repeat_check_skips_dynamodb(self):
+        self.assertFalse(SecurityRepository.is_blacklisted("jti-fresh"))
+        with patch.object(SecurityRepository, "_fetch_blacklisted") as mock_fetch:
+            self.assertFalse(SecurityRepository.is_blacklisted("jti-fresh"))
+        mock_fetch.assert_not_called()
+        self.assertEqual(SecurityRepository.blacklist_cache_stats()["hits"], 1)
+
+    def test_blacklist_on_same_worker_is_seen_immediately(self):
+        self.assertFalse(SecurityRepository.is_blacklisted("jti-soon"))
+        SecurityRepository.blacklist_token(
+            "jti-soon", user_id=1, expires_at=self.expires
+        )
+        self.assertTrue(SecurityRepository.is_blacklisted("jti-soon"))
+
+    def test_generation_bump_invalidates_other_entries(self):
+        self.assertFalse(SecurityRepository.is_blacklisted("jti-a"))
+        # A write on another worker only moves the shared generation.
+        SecurityRepository.blacklist_token("jti-b", user_id=1, expires_at=self.expires)
+        with patch.object(
+            SecurityRepository, "_fetch_blacklisted", return_value=False
+        ) as mock_fetch:
+            SecurityRepository.is_blacklisted("jti-a")
+        mock_fetch.assert_called_once_with("jti-a")
+
+    @override_settings(JWT_BLACKLIST_SHARED_GENERATION=False)
+    def test_without_shared_generation_entries_live_for_ttl(self):
+        self.assertFalse(SecurityRepository.is_blacklisted("jti-a"))
+        SecurityRepository.blacklist_token("jti-b", user_id=1, expires_at=self.expires)
+        with patch.object(SecurityRepository, "_fetch_blacklisted") as mock_fetch:
+            self.assertFalse(SecurityRepository.is_blacklisted("jti-a"))
+        mock_fetch.assert_not_called()
+
+    def test_positive_answers_are_not_cached(self):
+        SecurityRepository.blacklist_token("jti-x", user_id=1, expires_at=self.expires)
+        SecurityRepository.is_blacklisted("jti-x")
+        with patch.object(
+            SecurityRepository, "_fetch_blacklisted", return_value=True
+        ) as mock_fetch:
+            self.assertTrue(SecurityRepository.is_blacklisted("jti-x"))
+        mock_fetch.assert_called_once()
+
+    @override_settings(JWT_BLACKLIST_CACHE_TTL_SECONDS=0)
+    def test_cache_disabled_reads_every_time(self):
+        with patch.object(
+            SecurityRepository, "_fetch_blacklisted", return_value=False
+        ) as mock_fetch:
+            SecurityRepository.is_blacklisted("jti-a")
+            SecurityRepository.is_blacklisted("jti-a")
+        self.assertEqual(mock_fetch.call_count, 2)
+
+
 class SessionRevocationTests(DynamoDBCleanupMixin, TestCase):
     """check_session_revocation scans a narrow window of JTIs around token iat."""
 
@@ -96,6 +160,182 @@ class SessionRevocationTests(DynamoDBCleanupMixin, TestCase):
         )
 
 
+class SessionRevocationsRecordTests(SimpleTestCase):
+    """Pure matching/merging logic of the per-user revocation record."""
+
+    NOW = 1700000000
+
+    def test_empty_record_revokes_nothing(self):
+        self.assertFalse(SessionRevocations().is_revoked(self.NOW, now=self.NOW))
+
+    def test_matches_within_window_only(self):
+        record = SessionRevocations().with_sessions(
+            [(self.NOW, self.NOW + 60)], window=2, now=self.NOW
+        )
+        self.assertEqual(record.version, 1)
+        self.assertTrue(record.is_revoked(self.NOW - 2, now=self.NOW))
+        self.assertTrue(record.is_revoked(self.NOW + 2, now=self.NOW))
+        self.assertFalse(record.is_revoked(self.NOW + 3, now=self.NOW))
+        self.assertFalse(record.is_revoked(self.NOW - 3, now=self.NOW))
+
+    def test_expired_ranges_do_not_match_and_are_pruned(self):
+        record = SessionRevocations().with_sessions(
+            [(self.NOW, self.NOW + 60)], now=self.NOW
+        )
+        self.assertFalse(record.is_revoked(self.NOW, now=self.NOW + 60))
+
+        later = record.with_sessions(
+            [(self.NOW + 500, self.NOW + 600)], now=self.NOW + 61
+        )
+        self.assertEqual(len(later.ranges), 1)
+        self.assertEqual(later.version, 2)
+
+    def test_overlapping_sessions_are_merged(self):
+        record = SessionRevocations().with_sessions(
+            [(self.NOW, self.NOW + 60), (self.NOW + 3, self.NOW + 90)],
+            window=2,
+            now=self.NOW,
+        )
+        self.assertEqual(record.ranges, ((self.NOW - 2, self.NOW + 5, self.NOW + 90),))
+
+    def test_revoked_before_rejects_older_tokens(self):
+        record = SessionRevocations().with_sessions(
+            [], revoked_before=self.NOW, now=self.NOW
+        )
+        self.assertTrue(record.is_revoked(self.NOW - 1, now=self.NOW))
+        self.assertFalse(record.is_revoked(self.NOW, now=self.NOW))
+
+
+class SessionRevocationRepositoryTests(DynamoDBCleanupMixin, TestCase):
+    """revoke_sessions / is_session_revoked against the single user record."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.iat = int(timezone.now().timestamp())
+        self.expires = timezone.now() + timedelta(hours=1)
+
+    def test_revoked_session_matches_within_window(self):
+        SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        self.assertTrue(SecurityRepository.is_session_revoked(1, self.iat + 2))
+        self.assertFalse(SecurityRepository.is_session_revoked(1, self.iat + 3))
+        self.assertFalse(SecurityRepository.is_session_revoked(2, self.iat))
+
+    def test_revocations_accumulate_in_one_record(self):
+        SecurityRepository.revoke_sessions(1, [(self.iat - 600, self.expires)])
+        record = SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        self.assertEqual(record.version, 2)
+        self.assertEqual(len(record.ranges), 2)
+        self.assertTrue(SecurityRepository.is_session_revoked(1, self.iat - 600))
+        self.assertTrue(SecurityRepository.is_session_revoked(1, self.iat))
+
+    def test_check_is_served_from_worker_cache(self):
+        SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        SecurityRepository.clear_session_revocation_cache()
+        SecurityRepository.is_session_revoked(1, self.iat)
+
+        with patch.object(
+            SecurityRepository, "_fetch_session_revocations"
+        ) as mock_fetch:
+            self.assertTrue(SecurityRepository.is_session_revoked(1, self.iat))
+        mock_fetch.assert_not_called()
+
+    def test_newer_shared_version_invalidates_worker_cache(self):
+        self.assertFalse(SecurityRepository.is_session_revoked(1, self.iat))
+        # Simulate another worker revoking the session: the record changes in
+        # DynamoDB and the version is published, but this worker's cache is
+        # untouched.
+        SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        stale = SessionRevocations()
+        with patch(
+            "authn.repositories.security_repo.LocalTTLCache.get", return_value=stale
+        ):
+            self.assertEqual(cache.get(_revocation_version_key(1)), 1)
+            self.assertTrue(SecurityRepository.is_session_revoked(1, self.iat))
+
+    @override_settings(SESSION_REVOCATION_CACHE_TTL_SECONDS=0)
+    def test_cache_disabled_reads_record_every_time(self):
+        SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        with patch.object(
+            SecurityRepository,
+            "_fetch_session_revocations",
+            return_value=SessionRevocations(),
+        ) as mock_fetch:
+            SecurityRepository.is_session_revoked(1, self.iat)
+            SecurityRepository.is_session_revoked(1, self.iat)
+        self.assertEqual(mock_fetch.call_count, 2)
+
+    def test_concurrent_write_is_retried(self):
+        SecurityRepository.revoke_sessions(1, [(self.iat - 600, self.expires)])
+        real_fetch = SecurityRepository._fetch_session_revocations
+        calls = []
+
+        def racing_fetch(user_id, consistent=False):
+            record = real_fetch(user_id, consistent=consistent)
+            if not calls:
+                # Another writer lands between our read and our conditional put.
+                calls.append(record)
+                SecurityRepository.revoke_sessions(
+                    user_id, [(self.iat - 300, self.expires)]
+                )
+            return record
+
+        with patch.object(
+            SecurityRepository, "_fetch_session_revocations", side_effect=racing_fetch
+        ):
+            SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+
+        record = SecurityRepository.get_session_revocations(1, use_cache=False)
+        self.assertEqual(record.version, 3)
+        self.assertEqual(len(record.ranges), 3)
+
+
+class CheckAccessTokenTests(DynamoDBCleanupMixin, TestCase):
+    """check_access_token answers both auth checks with at most one batch read."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.iat = int(timezone.now().timestamp())
+        self.expires = timezone.now() + timedelta(hours=1)
+
+    def test_cold_check_uses_one_round_trip(self):
+        with patch(
+            "authn.repositories.security_repo.batch_get_items",
+            wraps=security_repo.batch_get_items,
+        ) as mock_batch:
+            status = SecurityRepository.check_access_token("jti-1", 1, self.iat)
+
+        mock_batch.assert_called_once()
+        self.assertEqual(len(mock_batch.call_args.args[1]), 2)
+        self.assertEqual(status.round_trips, 1)
+        self.assertFalse(status.blacklisted)
+        self.assertFalse(status.session_revoked)
+
+    def test_warm_check_needs_no_round_trip(self):
+        SecurityRepository.check_access_token("jti-1", 1, self.iat)
+        status = SecurityRepository.check_access_token("jti-1", 1, self.iat)
+        self.assertEqual(status.round_trips, 0)
+
+    def test_reports_blacklisted_jti_and_revoked_session(self):
+        SecurityRepository.blacklist_token("jti-1", user_id=1, expires_at=self.expires)
+        SecurityRepository.revoke_sessions(1, [(self.iat, self.expires)])
+        SecurityRepository.clear_session_revocation_cache()
+
+        status = SecurityRepository.check_access_token("jti-1", "1", self.iat)
+        self.assertTrue(status.blacklisted)
+        self.assertTrue(status.session_revoked)
+        self.assertEqual(status.round_trips, 1)
+
+    def test_without_user_only_checks_jti(self):
+        with patch(
+            "authn.repositories.security_repo.batch_get_items",
+            wraps=security_repo.batch_get_items,
+        ) as mock_batch:
+            SecurityRepository.check_access_token("jti-1", None, None)
+        self.assertEqual(len(mock_batch.call_args.args[1]), 1)
+
+
 class FailedLoginAttemptTests(DynamoDBCleanupMixin, TestCase):
     def test_get_failed_attempt_returns_none_when_missing(self):
         self.assertIsNone(SecurityRepository.get_failed_attempt("nobody"))
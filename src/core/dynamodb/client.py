@@ -4,7 +4,10 @@ Shared DynamoDB client and resource helpers.
 Provides a singleton boto3 resource for connection reuse across the application.
 """
 
+import time
+
 import boto3
+from boto3.dynamodb.types import TypeSerializer
 from botocore.config import Config
 from django.conf import settings
 
@@ -23,6 +26,8 @@ def _build_kwargs():
                 "max_attempts": settings.DYNAMODB_MAX_ATTEMPTS,
                 "mode": "standard",
             },
+            # Leave room for concurrent fan-out from core.dynamodb.concurrency.
+            max_pool_connections=max(10, settings.DYNAMODB_MAX_CONCURRENCY),
         ),
     }
     if settings.DYNAMODB_ENDPOINT_URL:
@@ -63,21 +68,151 @@ def get_table(name_key):
     return get_resource().Table(table_name)
 
 
+def iter_pages(table, *, max_items=None, prefetch=True, first_page=None, **kwargs):
+    """
+    Yield the responses of a paginated query one page at a time.
+
+    While the caller works on a page, the next one is already being fetched
+    on the shared DynamoDB pool (core.dynamodb.concurrency), so consuming a
+    long query costs about one page's latency per page instead of two round
+    trips' worth of waiting. Pass ``prefetch=False`` where later pages are
+    rarely needed. With *max_items*, no page is requested once the pages
+    yielded so far hold that many items. Closing the generator early
+    cancels a prefetch that has not started yet.
+
+    *first_page* is a response the caller already has for *kwargs*; it is
+    yielded instead of querying again. Each response's LastEvaluatedKey is
+    the cursor to resume after it.
+    """
+    from core.dynamodb.concurrency import prefetch_executor
+
+    executor = prefetch_executor() if prefetch else None
+    kwargs = dict(kwargs)
+    seen = 0
+    pending = None
+    resp = first_page if first_page is not None else table.query(**kwargs)
+    try:
+        while True:
+            seen += len(resp.get("Items", []))
+            last_key = resp.get("LastEvaluatedKey")
+            more = bool(last_key) and (max_items is None or seen < max_items)
+            if more:
+                kwargs["ExclusiveStartKey"] = last_key
+                if executor is not None:
+                    pending = executor.submit(table.query, **kwargs)
+            yield resp
+            if not more:
+                return
+            if pending is not None:
+                resp, pending = pending.result(), None
+            else:
+                resp = table.query(**kwargs)
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+class QueryStream:
+    """
+    Iterator over the items of a query, read lazily page by page.
+
+    Built by iter_query(). Only the current page is held in memory, the
+    first item is available after one round trip, and the caller may stop
+    at any point. ``cursor`` is the ExclusiveStartKey that resumes the query
+    right after the last item handed out (None once the query is
+    exhausted); pass it back as ``ExclusiveStartKey`` to continue.
+
+    A cursor in the middle of a page is built from the last item's key
+    attributes: *key_names* if given, otherwise the attribute names of the
+    query's LastEvaluatedKey. Queries that may stop inside their final page
+    should pass *key_names* (table key plus index key, for an index).
+    """
+
+    def __init__(
+        self, table, *, max_items=None, key_names=None, prefetch=True, **kwargs
+    ):
+        if max_items is not None:
+            if max_items <= 0:
+                raise ValueError("max_items must be positive")
+            if kwargs.get("Limit") is None or kwargs["Limit"] > max_items:
+                kwargs["Limit"] = max_items
+        self._pages = iter_pages(
+            table, max_items=max_items, prefetch=prefetch, **kwargs
+        )
+        self._max_items = max_items
+        self._key_names = tuple(key_names) if key_names else None
+        self._cursor = kwargs.get("ExclusiveStartKey")
+        self._last_item = None
+        self._page_items = iter(())
+        self._page_left = 0
+        self._page_last_key = None
+        self._started = False
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> dict:
+        if self._max_items is not None and self.count >= self._max_items:
+            self.close()
+            raise StopIteration
+        while self._page_left == 0:
+            if self._started and not self._page_last_key:
+                self.close()
+                raise StopIteration
+            resp = next(self._pages, None)
+            if resp is None:
+                raise StopIteration
+            self._started = True
+            items = resp.get("Items", [])
+            self._page_items = iter(items)
+            self._page_left = len(items)
+            self._page_last_key = resp.get("LastEvaluatedKey")
+            if self._key_names is None and self._page_last_key:
+                self._key_names = tuple(self._page_last_key)
+            # An empty (fully filtered) page still moves the cursor.
+            self._cursor = self._page_last_key
+            self._last_item = None
+
+        item = next(self._page_items)
+        self._page_left -= 1
+        self.count += 1
+        self._last_item = item
+        return item
+
+    @property
+    def exhausted(self) -> bool:
+        """True once every item of the query has been handed out."""
+        return self._started and self._page_left == 0 and not self._page_last_key
+
+    @property
+    def cursor(self) -> dict | None:
+        if self._last_item is None:
+            return None if self.exhausted else self._cursor
+        if self._page_left == 0:
+            return self._page_last_key
+        if not self._key_names:
+            raise ValueError("Cannot resume inside the last page without key_names")
+        return {name: self._last_item[name] for name in self._key_names}
+
+    def close(self) -> None:
+        """Stop reading; cancels a prefetch that has not started."""
+        self._pages.close()
+
+
+def iter_query(table, **kwargs) -> QueryStream:
+    """Stream a query's items lazily; see QueryStream and iter_pages."""
+    return QueryStream(table, **kwargs)
+
+
 def query_all(table, **kwargs):
     """
     Auto-paginating query that follows LastEvaluatedKey.
 
-    Returns a flat list of all matching items across all pages.
+    Returns a flat list of all matching items across all pages. Prefer
+    iter_query() when the caller may not need every item.
     """
-    items = []
-    while True:
-        resp = table.query(**kwargs)
-        items.extend(resp.get("Items", []))
-        last_key = resp.get("LastEvaluatedKey")
-        if not last_key:
-            break
-        kwargs["ExclusiveStartKey"] = last_key
-    return items
+    return list(iter_query(table, **kwargs))
 
 
 def query_limited(table, max_items, **kwargs):
@@ -88,26 +223,92 @@ def query_limited(table, max_items, **kwargs):
     a smaller Limit). With FilterExpression, Limit bounds pre-filter rows,
     so callers using filters may want to pass a larger per-page Limit.
     """
-    if max_items <= 0:
-        raise ValueError("max_items must be positive")
+    return list(iter_query(table, max_items=max_items, **kwargs))
+
 
-    per_page = kwargs.get("Limit")
-    if per_page is None or per_page > max_items:
-        kwargs["Limit"] = max_items
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+
+
+def batch_get_items(name_key, keys, projection=None, consistent=False, stats=None):
+    """
+    BatchGetItem over any number of keys from one table.
 
+    Splits into DynamoDB's 100-key batches and retries UnprocessedKeys with
+    a short exponential backoff. Returns the found items in no particular
+    order; missing keys are simply absent. If *stats* is a dict, its
+    ``round_trips`` entry is incremented once per request sent.
+    """
+    table_name = settings.DYNAMODB_TABLES[name_key]
+    resource = get_resource()
     items = []
-    while True:
-        resp = table.query(**kwargs)
-        items.extend(resp.get("Items", []))
-        if len(items) >= max_items:
-            return items[:max_items]
-        last_key = resp.get("LastEvaluatedKey")
-        if not last_key:
-            break
-        kwargs["ExclusiveStartKey"] = last_key
+
+    keys = list(keys)
+    for start in range(0, len(keys), BATCH_GET_MAX_KEYS):
+        request = {"Keys": keys[start : start + BATCH_GET_MAX_KEYS]}
+        if projection:
+            request["ProjectionExpression"] = projection
+        if consistent:
+            request["ConsistentRead"] = True
+
+        attempt = 0
+        while request:
+            resp = resource.batch_get_item(RequestItems={table_name: request})
+            if stats is not None:
+                stats["round_trips"] = stats.get("round_trips", 0) + 1
+            items.extend(resp.get("Responses", {}).get(table_name, []))
+            request = resp.get("UnprocessedKeys", {}).get(table_name)
+            if request:
+                attempt += 1
+                if attempt > BATCH_GET_MAX_RETRIES:
+                    raise RuntimeError(
+                        f"BatchGetItem on {table_name} left keys unprocessed "
+                        f"after {BATCH_GET_MAX_RETRIES} retries"
+                    )
+                time.sleep(0.05 * (2 ** (attempt - 1)))
     return items
 
 
+_SERIALIZED_FIELDS = ("Item", "Key", "ExpressionAttributeValues")
+_serializer = TypeSerializer()
+
+
+def _serialize_action(action: dict) -> dict:
+    ((op, params),) = action.items()
+    params = dict(params)
+    params["TableName"] = settings.DYNAMODB_TABLES[params.pop("table")]
+    for field in _SERIALIZED_FIELDS:
+        if field in params:
+            params[field] = {
+                k: _serializer.serialize(v) for k, v in params[field].items()
+            }
+    return {op: params}
+
+
+def transact_write_items(actions):
+    """
+    Apply up to 100 writes atomically with TransactWriteItems.
+
+    Each action is a single-key dict such as
+    ``{"Put": {"table": "barcodes", "Item": {...}, "ConditionExpression": ...}}``
+    where ``table`` is a DYNAMODB_TABLES key and Item/Key/
+    ExpressionAttributeValues hold plain Python values, as with the resource
+    API. Condition and update expressions must be strings.
+
+    Raises the client's TransactionCanceledException when any condition
+    fails; use cancellation_reasons() to see which one.
+    """
+    get_client().transact_write_items(
+        TransactItems=[_serialize_action(a) for a in actions]
+    )
+
+
+def cancellation_reasons(exc) -> list:
+    """Per-action cancellation codes ("None", "ConditionalCheckFailed", ...)."""
+    reasons = getattr(exc, "response", {}).get("CancellationReasons") or []
+    return [r.get("Code", "None") for r in reasons]
+
+
 def reset():
     """Reset cached clients (useful for testing)."""
     global _resource, _client
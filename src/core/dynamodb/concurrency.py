@@ -0,0 +1,207 @@
+"""
+Bounded per-worker thread pool for independent DynamoDB calls.
+
+boto3 clients are thread-safe, so fan-out of independent reads (e.g. one
+GSI query per barcode on the dashboard) can overlap their network latency
+instead of paying it sequentially.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from core.dynamodb.client import get_resource, get_table
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker_state = threading.local()
+
+
+def _mark_worker_thread():
+    _worker_state.in_pool = True
+
+
+def _in_pool_thread() -> bool:
+    return getattr(_worker_state, "in_pool", False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide DynamoDB thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DYNAMODB_MAX_CONCURRENCY,
+                    thread_name_prefix="dynamodb",
+                    initializer=_mark_worker_thread,
+                )
+    return _executor
+
+
+def map_concurrent(fn, items) -> list:
+    """
+    Apply *fn* to every item on the shared pool and return results in order.
+
+    Runs inline when there is nothing to overlap, when concurrency is disabled,
+    or when called from a pool thread (nested fan-out would otherwise be able
+    to starve the pool and deadlock). Exceptions from *fn* propagate.
+    """
+    items = list(items)
+    if len(items) <= 1 or settings.DYNAMODB_MAX_CONCURRENCY <= 1 or _in_pool_thread():
+        return [fn(item) for item in items]
+
+    # Build the shared resource on the calling thread; boto3 resource
+    # construction is not thread-safe, but calls through it are.
+    get_resource()
+    return list(get_executor().map(fn, items))
+
+
+def prefetch_executor():
+    """
+    The shared pool for background reads ahead of the caller, or None where
+    map_concurrent would run inline.
+    """
+    if settings.DYNAMODB_MAX_CONCURRENCY <= 1 or _in_pool_thread():
+        return None
+    # See map_concurrent: build the shared resource on this thread.
+    get_resource()
+    return get_executor()
+
+
+class ConcurrentReads:
+    """
+    A group of independent reads started on the shared pool.
+
+    ``submit`` starts a call and returns its Future; ``result`` waits for it
+    until the group's deadline (DYNAMODB_FANOUT_TIMEOUT_SECONDS after the
+    group was created, unless *timeout* is given). The pool is shared with
+    background prefetches, so on a busy worker calls can sit in its queue.
+    Past the deadline the group stops relying on the pool: calls that have
+    not started are cancelled, and every call whose result is still needed
+    runs on the caller's thread, as do later submits. A call already running
+    on the pool is issued again inline; its pool result is dropped. Leaving
+    the ``with`` block cancels calls that have not started yet, so
+    speculative reads that turn out to be unnecessary do not hold pool
+    threads.
+
+    Where map_concurrent would run inline (concurrency disabled, or on a
+    pool thread) each call runs inside ``submit`` instead.
+    """
+
+    def __init__(self, timeout: float = None):
+        if timeout is None:
+            timeout = float(getattr(settings, "DYNAMODB_FANOUT_TIMEOUT_SECONDS", 0))
+        self._deadline = time.monotonic() + timeout if timeout > 0 else None
+        self._futures = []
+        self._calls = {}
+        self._inline = settings.DYNAMODB_MAX_CONCURRENCY <= 1 or _in_pool_thread()
+        if not self._inline:
+            # See map_concurrent: build the shared resource on this thread.
+            get_resource()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        if self._inline:
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        future = get_executor().submit(fn, *args, **kwargs)
+        self._futures.append(future)
+        self._calls[future] = (fn, args, kwargs)
+        return future
+
+    def result(self, future: Future):
+        """Return the result of *future* (re-raising its exception)."""
+        if future.cancelled() and future in self._calls:
+            # Cancelled when the group missed its deadline.
+            return self._run_inline(future)
+        remaining = None
+        if self._deadline is not None:
+            remaining = max(0.0, self._deadline - time.monotonic())
+        try:
+            return future.result(timeout=remaining)
+        except TimeoutError:
+            if future.done():
+                # The call itself raised a TimeoutError.
+                raise
+            logger.warning("Concurrent DynamoDB reads missed their deadline")
+            self._inline = True
+            self.cancel()
+            return self._run_inline(future)
+
+    def _run_inline(self, future: Future):
+        fn, args, kwargs = self._calls[future]
+        return fn(*args, **kwargs)
+
+    def cancel(self) -> None:
+        """Cancel every call of the group that has not started yet."""
+        for future in self._futures:
+            future.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+        return False
+
+
+def _scan_segment(table, segment: int, total_segments: int, scan_kwargs: dict):
+    """Yield every item of one scan segment, following LastEvaluatedKey."""
+    kwargs = {**scan_kwargs, "Segment": segment, "TotalSegments": total_segments}
+    while True:
+        resp = table.scan(**kwargs)
+        yield from resp.get("Items", [])
+        last_key = resp.get("LastEvaluatedKey")
+        if not last_key:
+            return
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def parallel_scan(name_key, aggregate, *, total_segments=None, **scan_kwargs) -> list:
+    """
+    Scan a whole table as ``total_segments`` parallel segments.
+
+    ``aggregate`` receives an iterator over one segment's items and returns a
+    partial result; the partials come back as a list, in segment order, for
+    the caller to merge. Pass FilterExpression / ProjectionExpression through
+    ``scan_kwargs`` to keep rows off the wire.
+
+    Segments run on a short-lived pool of their own, so a long admin scan
+    cannot tie up the shared pool that request fan-out depends on.
+    """
+    if total_segments is None:
+        total_segments = settings.DYNAMODB_SCAN_SEGMENTS
+    total_segments = max(1, int(total_segments))
+    table = get_table(name_key)
+
+    def run(segment):
+        return aggregate(_scan_segment(table, segment, total_segments, scan_kwargs))
+
+    workers = min(total_segments, settings.DYNAMODB_MAX_CONCURRENCY)
+    if workers <= 1 or _in_pool_thread():
+        return [run(segment) for segment in range(total_segments)]
+
+    with ThreadPoolExecutor(
+        max_workers=workers,
+        thread_name_prefix="dynamodb-scan",
+        initializer=_mark_worker_thread,
+    ) as executor:
+        return list(executor.map(run, range(total_segments)))
+
+
+def reset():
+    """Shut down the pool (useful for testing and settings overrides)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
@@ -44,11 +44,39 @@ def _base_create_kwargs(table_name, key_schema, attribute_definitions):
     return kwargs
 
 
-def _gsi(index_name, key_schema):
+# Non-key attributes projected into the Barcodes GSIs: what the pull pool,
+# dashboard and barcode serializers read from index query results. Avatars
+# live in separate items (see BarcodeRepository.get_avatar) and anything not
+# listed here must be re-read by primary key.
+BARCODE_INDEX_ATTRIBUTES = (
+    "barcode",
+    "barcode_type",
+    "share_with_others",
+    "owner_username",
+    "profile_name",
+    "profile_info_id",
+    "profile_gender",
+    "profile_avatar_ref",
+    "total_usage",
+    "usage_shards",
+    "total_usage_limit",
+    "daily_usage_limit",
+    "last_used",
+)
+
+
+def _gsi(index_name, key_schema, include=None):
+    """GSI definition projecting ALL attributes, or only *include* if given."""
+    projection = {"ProjectionType": "ALL"}
+    if include:
+        projection = {
+            "ProjectionType": "INCLUDE",
+            "NonKeyAttributes": list(include),
+        }
     gsi = {
         "IndexName": index_name,
         "KeySchema": key_schema,
-        "Projection": {"ProjectionType": "ALL"},
+        "Projection": projection,
     }
     if settings.DYNAMODB_BILLING_MODE != "PAY_PER_REQUEST":
         gsi["ProvisionedThroughput"] = {
@@ -58,6 +86,85 @@ def _gsi(index_name, key_schema):
     return gsi
 
 
+def _shared_pool_shard_gsi():
+    """
+    Sparse pull-pool index: only shared DynamicBarcodes carry ``pool_shard``
+    (``DynamicBarcode#<gender>#<n>``), spreading the pool over several
+    partitions instead of one ``barcode_type`` value.
+    """
+    return _gsi(
+        "SharedPoolShardIndex",
+        [
+            {"AttributeName": "pool_shard", "KeyType": "HASH"},
+            {"AttributeName": "time_created", "KeyType": "RANGE"},
+        ],
+        include=BARCODE_INDEX_ATTRIBUTES,
+    )
+
+
+def _user_barcode_time_gsi():
+    """
+    A user's barcodes ordered by ``time_created``, so listings come back
+    sorted instead of by barcode_uuid. A GSI rather than an LSI because an
+    LSI cannot be added to an existing table.
+    """
+    return _gsi(
+        "UserBarcodeTimeIndex",
+        [
+            {"AttributeName": "user_id", "KeyType": "HASH"},
+            {"AttributeName": "time_created", "KeyType": "RANGE"},
+        ],
+        include=BARCODE_INDEX_ATTRIBUTES,
+    )
+
+
+def _add_missing_gsi(table_name, gsi, attribute_definitions):
+    """Create *gsi* on an existing table if it is not there yet."""
+    client = get_resource().meta.client
+    description = client.describe_table(TableName=table_name)["Table"]
+    existing = {g["IndexName"] for g in description.get("GlobalSecondaryIndexes", [])}
+    if gsi["IndexName"] in existing:
+        return False
+    client.update_table(
+        TableName=table_name,
+        AttributeDefinitions=attribute_definitions,
+        GlobalSecondaryIndexUpdates=[{"Create": gsi}],
+    )
+    return True
+
+
+def add_missing_indexes():
+    """
+    Add GSIs introduced after a table was first created.
+
+    Returns a list of "<table>.<index>" names that were requested. DynamoDB
+    backfills new indexes asynchronously.
+    """
+    added = []
+    barcodes = settings.DYNAMODB_TABLES["barcodes"]
+    if not _table_exists(barcodes):
+        return added
+    for gsi, attribute_definitions in (
+        (
+            _shared_pool_shard_gsi(),
+            [
+                {"AttributeName": "pool_shard", "AttributeType": "S"},
+                {"AttributeName": "time_created", "AttributeType": "S"},
+            ],
+        ),
+        (
+            _user_barcode_time_gsi(),
+            [
+                {"AttributeName": "user_id", "AttributeType": "S"},
+                {"AttributeName": "time_created", "AttributeType": "S"},
+            ],
+        ),
+    ):
+        if _add_missing_gsi(barcodes, gsi, attribute_definitions):
+            added.append(f"{barcodes}.{gsi['IndexName']}")
+    return added
+
+
 def _enable_ttl(table_name, attribute_name):
     resource = get_resource()
     resource.meta.client.update_time_to_live(
@@ -88,12 +195,14 @@ def create_barcodes_table(wait=True):
             {"AttributeName": "barcode", "AttributeType": "S"},
             {"AttributeName": "barcode_type", "AttributeType": "S"},
             {"AttributeName": "time_created", "AttributeType": "S"},
+            {"AttributeName": "pool_shard", "AttributeType": "S"},
         ],
     )
     kwargs["GlobalSecondaryIndexes"] = [
         _gsi(
             "BarcodeValueIndex",
             [{"AttributeName": "barcode", "KeyType": "HASH"}],
+            include=BARCODE_INDEX_ATTRIBUTES,
         ),
         _gsi(
             "SharedBarcodeTypeIndex",
@@ -101,7 +210,10 @@ def create_barcodes_table(wait=True):
                 {"AttributeName": "barcode_type", "KeyType": "HASH"},
                 {"AttributeName": "time_created", "KeyType": "RANGE"},
             ],
+            include=BARCODE_INDEX_ATTRIBUTES,
         ),
+        _shared_pool_shard_gsi(),
+        _user_barcode_time_gsi(),
     ]
     resource.create_table(**kwargs)
     if wait:
@@ -348,6 +460,32 @@ def create_admin_otp_table(wait=True):
     return True
 
 
+def create_usage_counters_table(wait=True):
+    """Create the UsageCounters table with TTL for expiring daily counters."""
+    table_name = settings.DYNAMODB_TABLES["usage_counters"]
+    if _table_exists(table_name):
+        return False
+
+    resource = get_resource()
+    kwargs = _base_create_kwargs(
+        table_name=table_name,
+        key_schema=[
+            {"AttributeName": "pk", "KeyType": "HASH"},
+            {"AttributeName": "sk", "KeyType": "RANGE"},
+        ],
+        attribute_definitions=[
+            {"AttributeName": "pk", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"},
+        ],
+    )
+    resource.create_table(**kwargs)
+    if wait:
+        _wait_for_table(table_name)
+
+    _enable_ttl(table_name, "expires_at")
+    return True
+
+
 def create_all_tables(wait=True):
     """Create all DynamoDB tables. Returns list of created table names."""
     created = []
@@ -361,6 +499,7 @@ def create_all_tables(wait=True):
         ("webauthn_credentials", create_webauthn_credentials_table),
         ("admin_audit", create_admin_audit_table),
         ("admin_otp", create_admin_otp_table),
+        ("usage_counters", create_usage_counters_table),
     ]:
         if fn(wait=wait):
             created.append(settings.DYNAMODB_TABLES[name])
@@ -1,5 +1,6 @@
-"""Tests for core.dynamodb.client singleton helpers and query_all pagination."""
+"""Tests for core.dynamodb.client singleton helpers and query pagination."""
 
+import threading
 from unittest.mock import MagicMock, patch
 
 from django.conf import settings
@@ -243,6 +244,102 @@ class QueryLimitedTest(TestCase):
         fake_table.query.assert_not_called()
 
 
+class IterQueryTest(TestCase):
+    PAGES = [
+        {
+            "Items": [{"pk": "a", "sk": 1}, {"pk": "a", "sk": 2}],
+            "LastEvaluatedKey": {"pk": "a", "sk": 2},
+        },
+        {"Items": [{"pk": "a", "sk": 3}, {"pk": "a", "sk": 4}]},
+    ]
+
+    def _table(self, pages=None):
+        fake_table = MagicMock()
+        fake_table.query.side_effect = list(pages or self.PAGES)
+        return fake_table
+
+    def test_next_page_is_fetched_while_caller_holds_current(self):
+        fetched = threading.Event()
+        fake_table = MagicMock()
+
+        def query(**kwargs):
+            if "ExclusiveStartKey" in kwargs:
+                fetched.set()
+                return self.PAGES[1]
+            return self.PAGES[0]
+
+        fake_table.query.side_effect = query
+        pages = client_mod.iter_pages(fake_table, KeyConditionExpression="x")
+
+        self.assertEqual(next(pages), self.PAGES[0])
+        self.assertTrue(fetched.wait(5))
+        self.assertEqual(next(pages), self.PAGES[1])
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=1)
+    def test_early_stop_reads_one_page_without_prefetch(self):
+        fake_table = self._table()
+
+        stream = client_mod.iter_query(fake_table, KeyConditionExpression="x")
+        self.assertEqual(next(stream), {"pk": "a", "sk": 1})
+        stream.close()
+
+        fake_table.query.assert_called_once()
+
+    def test_max_items_within_first_page_skips_prefetch(self):
+        fake_table = self._table()
+
+        items = list(client_mod.iter_query(fake_table, max_items=2))
+
+        self.assertEqual(len(items), 2)
+        fake_table.query.assert_called_once()
+        self.assertEqual(fake_table.query.call_args.kwargs["Limit"], 2)
+
+    def test_cursor_resumes_after_last_item(self):
+        stream = client_mod.iter_query(self._table(), key_names=("pk", "sk"))
+        next(stream)
+        self.assertEqual(stream.cursor, {"pk": "a", "sk": 1})
+        next(stream)
+        # End of a page: its LastEvaluatedKey.
+        self.assertEqual(stream.cursor, {"pk": "a", "sk": 2})
+        next(stream)
+        self.assertEqual(stream.cursor, {"pk": "a", "sk": 3})
+        self.assertFalse(stream.exhausted)
+        next(stream)
+        self.assertIsNone(stream.cursor)
+        self.assertTrue(stream.exhausted)
+
+    def test_cursor_key_names_default_to_last_evaluated_key(self):
+        stream = client_mod.iter_query(self._table())
+        next(stream)
+
+        self.assertEqual(stream.cursor, {"pk": "a", "sk": 1})
+
+    def test_resuming_passes_cursor_as_exclusive_start_key(self):
+        fake_table = self._table([{"Items": []}])
+
+        list(client_mod.iter_query(fake_table, ExclusiveStartKey={"pk": "a"}))
+
+        self.assertEqual(
+            fake_table.query.call_args.kwargs["ExclusiveStartKey"], {"pk": "a"}
+        )
+
+    def test_first_page_is_not_queried_again(self):
+        fake_table = self._table(self.PAGES[1:])
+
+        items = list(
+            client_mod.iter_query(
+                fake_table, first_page=self.PAGES[0], KeyConditionExpression="x"
+            )
+        )
+
+        self.assertEqual([i["sk"] for i in items], [1, 2, 3, 4])
+        fake_table.query.assert_called_once()
+        self.assertEqual(
+            fake_table.query.call_args.kwargs["ExclusiveStartKey"],
+            {"pk": "a", "sk": 2},
+        )
+
+
 class BotoConstructionTest(TestCase):
     """Verify the cached path actually invokes boto3 when cache is empty."""
 
@@ -270,3 +367,80 @@ class BotoConstructionTest(TestCase):
 
         self.assertIs(result, sentinel)
         mock_boto3.client.assert_called_once()
+
+
+class BatchGetItemsTest(TestCase):
+    def _patch_resource(self, responses):
+        fake_resource = MagicMock()
+        fake_resource.batch_get_item.side_effect = responses
+        return patch.object(client_mod, "get_resource", return_value=fake_resource)
+
+    def test_splits_keys_into_batches_of_100(self):
+        table_name = settings.DYNAMODB_TABLES["usage_counters"]
+        keys = [{"pk": f"k{i}", "sk": "s"} for i in range(150)]
+        with self._patch_resource(
+            [
+                {"Responses": {table_name: [{"pk": "k0"}]}},
+                {"Responses": {table_name: [{"pk": "k149"}]}},
+            ]
+        ) as get_resource:
+            items = client_mod.batch_get_items("usage_counters", keys)
+
+        calls = get_resource.return_value.batch_get_item.call_args_list
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(calls[0].kwargs["RequestItems"][table_name]["Keys"]), 100)
+        self.assertEqual(len(calls[1].kwargs["RequestItems"][table_name]["Keys"]), 50)
+        self.assertEqual(items, [{"pk": "k0"}, {"pk": "k149"}])
+
+    @patch("core.dynamodb.client.time.sleep")
+    def test_retries_unprocessed_keys(self, mock_sleep):
+        table_name = settings.DYNAMODB_TABLES["usage_counters"]
+        leftover = {"Keys": [{"pk": "b", "sk": "s"}], "ProjectionExpression": "pk"}
+        with self._patch_resource(
+            [
+                {
+                    "Responses": {table_name: [{"pk": "a"}]},
+                    "UnprocessedKeys": {table_name: leftover},
+                },
+                {"Responses": {table_name: [{"pk": "b"}]}},
+            ]
+        ) as get_resource:
+            items = client_mod.batch_get_items(
+                "usage_counters",
+                [{"pk": "a", "sk": "s"}, {"pk": "b", "sk": "s"}],
+                projection="pk",
+            )
+
+        calls = get_resource.return_value.batch_get_item.call_args_list
+        self.assertEqual(calls[1].kwargs["RequestItems"][table_name], leftover)
+        self.assertEqual(items, [{"pk": "a"}, {"pk": "b"}])
+        mock_sleep.assert_called_once()
+
+    @patch("core.dynamodb.client.time.sleep")
+    def test_counts_round_trips_including_retries(self, mock_sleep):
+        table_name = settings.DYNAMODB_TABLES["usage_counters"]
+        leftover = {"Keys": [{"pk": "b", "sk": "s"}], "ConsistentRead": True}
+        stats = {}
+        with self._patch_resource(
+            [
+                {"Responses": {}, "UnprocessedKeys": {table_name: leftover}},
+                {"Responses": {table_name: [{"pk": "b"}]}},
+            ]
+        ) as get_resource:
+            client_mod.batch_get_items(
+                "usage_counters",
+                [{"pk": "b", "sk": "s"}],
+                consistent=True,
+                stats=stats,
+            )
+
+        first = get_resource.return_value.batch_get_item.call_args_list[0]
+        self.assertTrue(first.kwargs["RequestItems"][table_name]["ConsistentRead"])
+        self.assertEqual(stats["round_trips"], 2)
+
+    def test_returns_empty_list_without_calling_dynamodb_for_no_keys(self):
+        with self._patch_resource([]) as get_resource:
+            items = client_mod.batch_get_items("usage_counters", [])
+
+        self.assertEqual(items, [])
+        get_resource.return_value.batch_get_item.assert_not_called()
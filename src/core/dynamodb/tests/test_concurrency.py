@@ -0,0 +1,178 @@
+"""Tests for core.dynamodb.concurrency bounded fan-out helpers."""
+
+import threading
+
+from boto3.dynamodb.conditions import Attr
+from django.test import TestCase, override_settings
+
+from core.dynamodb import concurrency
+from core.dynamodb.client import get_table
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class MapConcurrentTest(TestCase):
+    def tearDown(self):
+        concurrency.reset()
+
+    def test_preserves_input_order(self):
+        results = concurrency.map_concurrent(lambda x: x * 2, range(20))
+
+        self.assertEqual(results, [x * 2 for x in range(20)])
+
+    def test_runs_on_pool_threads(self):
+        names = concurrency.map_concurrent(
+            lambda _: threading.current_thread().name, range(4)
+        )
+
+        self.assertTrue(all(name.startswith("dynamodb") for name in names))
+
+    def test_single_item_runs_inline(self):
+        names = concurrency.map_concurrent(
+            lambda _: threading.current_thread().name, [1]
+        )
+
+        self.assertEqual(names, [threading.current_thread().name])
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=1)
+    def test_concurrency_of_one_runs_inline(self):
+        names = concurrency.map_concurrent(
+            lambda _: threading.current_thread().name, range(3)
+        )
+
+        self.assertEqual(set(names), {threading.current_thread().name})
+
+    def test_nested_fan_out_runs_inline_instead_of_deadlocking(self):
+        def outer(x):
+            return sum(concurrency.map_concurrent(lambda y: x + y, range(3)))
+
+        results = concurrency.map_concurrent(outer, range(20))
+
+        self.assertEqual(results, [3 * x + 3 for x in range(20)])
+
+    def test_propagates_exceptions(self):
+        def boom(x):
+            if x == 2:
+                raise ValueError("boom")
+            return x
+
+        with self.assertRaises(ValueError):
+            concurrency.map_concurrent(boom, range(4))
+
+
+class ConcurrentReadsTest(TestCase):
+    def tearDown(self):
+        concurrency.reset()
+
+    def test_independent_calls_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def meet(x):
+            barrier.wait()  # only returns once both calls are running
+            return x
+
+        with concurrency.ConcurrentReads() as reads:
+            first = reads.submit(meet, 1)
+            second = reads.submit(meet, 2)
+            self.assertEqual((reads.result(first), reads.result(second)), (1, 2))
+
+    def test_propagates_exceptions(self):
+        def boom():
+            raise ValueError("boom")
+
+        with concurrency.ConcurrentReads() as reads:
+            future = reads.submit(boom)
+            with self.assertRaises(ValueError):
+                reads.result(future)
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=2)
+    def test_missed_deadline_runs_remaining_calls_inline(self):
+        concurrency.reset()
+        release = threading.Event()
+        caller = threading.current_thread().name
+        reads = concurrency.ConcurrentReads(timeout=0.05)
+        for _ in range(2):
+            reads.submit(release.wait, 5)
+        queued = reads.submit(lambda: threading.current_thread().name)
+        other = reads.submit(lambda: "other")
+
+        try:
+            self.assertEqual(reads.result(queued), caller)
+            self.assertTrue(other.cancelled())
+            self.assertEqual(reads.result(other), "other")
+            later = reads.submit(lambda: threading.current_thread().name)
+            self.assertTrue(later.done())
+            self.assertEqual(reads.result(later), caller)
+        finally:
+            release.set()
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=2)
+    def test_exit_cancels_unneeded_calls(self):
+        concurrency.reset()
+        release = threading.Event()
+        try:
+            with concurrency.ConcurrentReads() as reads:
+                for _ in range(2):
+                    reads.submit(release.wait, 5)
+                speculative = reads.submit(lambda: "unused")
+            self.assertTrue(speculative.cancelled())
+        finally:
+            release.set()
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=1)
+    def test_concurrency_of_one_runs_inline(self):
+        with concurrency.ConcurrentReads() as reads:
+            future = reads.submit(lambda: threading.current_thread().name)
+            self.assertTrue(future.done())
+            self.assertEqual(reads.result(future), threading.current_thread().name)
+
+
+class ParallelScanTest(DynamoDBCleanupMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        table = get_table("usage_counters")
+        with table.batch_writer() as batch:
+            for i in range(40):
+                batch.put_item(
+                    Item={"pk": f"ITEM#{i}", "sk": "X", "n": i, "pad": "x" * 10}
+                )
+
+    def test_segments_cover_every_item_once(self):
+        partials = concurrency.parallel_scan(
+            "usage_counters",
+            lambda items: sorted(int(item["n"]) for item in items),
+            total_segments=4,
+        )
+
+        self.assertEqual(len(partials), 4)
+        merged = sorted(n for partial in partials for n in partial)
+        self.assertEqual(merged, list(range(40)))
+
+    def test_passes_filter_and_projection(self):
+        partials = concurrency.parallel_scan(
+            "usage_counters",
+            list,
+            total_segments=3,
+            FilterExpression=Attr("n").lt(5),
+            ProjectionExpression="n",
+        )
+
+        items = [item for partial in partials for item in partial]
+        self.assertEqual(sorted(int(i["n"]) for i in items), list(range(5)))
+        self.assertTrue(all(set(item) == {"n"} for item in items))
+
+    def test_runs_segments_on_dedicated_threads(self):
+        names = concurrency.parallel_scan(
+            "usage_counters",
+            lambda items: (list(items), threading.current_thread().name)[1],
+            total_segments=4,
+        )
+
+        self.assertTrue(all(name.startswith("dynamodb-scan") for name in names))
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=1)
+    def test_concurrency_of_one_scans_segments_inline(self):
+        partials = concurrency.parallel_scan(
+            "usage_counters", lambda items: sum(1 for _ in items), total_segments=3
+        )
+
+        self.assertEqual(sum(partials), 40)
@@ -3,7 +3,7 @@
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from core.dynamodb.tables import create_all_tables
+from core.dynamodb.tables import add_missing_indexes, create_all_tables
 
 
 class Command(BaseCommand):
@@ -34,3 +34,6 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.SUCCESS(f"  Created: {name}"))
         else:
             self.stdout.write(self.style.SUCCESS("All tables already exist."))
+
+        for name in add_missing_indexes():
+            self.stdout.write(self.style.SUCCESS(f"  Added index: {name}"))
@@ -0,0 +1,25 @@
+"""
+Per-request counters (e.g. DynamoDB round trips spent on authentication).
+
+RequestMetricsMiddleware opens a fresh counter dict for each request; code
+anywhere in the request calls ``incr()``. Outside a request it is a no-op.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+request_metrics_context: ContextVar[Optional[dict]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def incr(name: str, value: int = 1) -> None:
+    """Add *value* to the current request's counter *name*."""
+    metrics = request_metrics_context.get()
+    if metrics is not None:
+        metrics[name] = metrics.get(name, 0) + value
+
+
+def current() -> dict:
+    """Return a copy of the current request's counters."""
+    return dict(request_metrics_context.get() or {})
@@ -0,0 +1,29 @@
+import logging
+
+from core.metrics import request_metrics_context
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """Collect per-request counters and log them when the response is ready."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = {}
+        token = request_metrics_context.set(metrics)
+        request.metrics = metrics
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics_context.reset(token)
+        if metrics:
+            logger.debug(
+                "Request metrics %s %s: %s",
+                request.method,
+                request.path,
+                " ".join(f"{k}={v}" for k, v in sorted(metrics.items())),
+            )
+        return response
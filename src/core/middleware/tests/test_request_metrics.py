@@ -0,0 +1,24 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from core import metrics
+from core.middleware.request_metrics import RequestMetricsMiddleware
+
+
+class RequestMetricsMiddlewareTests(SimpleTestCase):
+    def test_collects_counters_for_the_request(self):
+        def view(request):
+            metrics.incr("auth_dynamodb_round_trips")
+            metrics.incr("auth_dynamodb_round_trips", 2)
+            return HttpResponse("ok")
+
+        request = RequestFactory().get("/health/")
+        with self.assertLogs("core.middleware.request_metrics", "DEBUG") as logs:
+            RequestMetricsMiddleware(view)(request)
+
+        self.assertEqual(request.metrics, {"auth_dynamodb_round_trips": 3})
+        self.assertIn("auth_dynamodb_round_trips=3", logs.output[0])
+
+    def test_incr_outside_request_is_noop(self):
+        metrics.incr("anything")
+        self.assertEqual(metrics.current(), {})
@@ -61,3 +61,25 @@ SIMPLE_JWT = {
 AUTH_EXPOSE_TOKENS_IN_BODY = (
     env("AUTH_EXPOSE_TOKENS_IN_BODY", "False").lower() == "true"
 )
+
+# Per-worker cache of each user's session-revocation record (checked on every
+# authenticated request). Writers bump a version in the shared Django cache so
+# other workers refetch immediately; without a shared cache, staleness is
+# bounded by this TTL. 0 disables the local cache.
+SESSION_REVOCATION_CACHE_TTL_SECONDS = float(
+    env("SESSION_REVOCATION_CACHE_TTL_SECONDS", "30")
+)
+SESSION_REVOCATION_CACHE_MAX_ENTRIES = int(
+    env("SESSION_REVOCATION_CACHE_MAX_ENTRIES", "10000")
+)
+
+# Per-worker negative cache for the access-token JTI blacklist. A JTI seen as
+# "not blacklisted" is trusted for this many seconds, so a token revoked on
+# another worker can be accepted here for at most that long. With the shared
+# generation enabled, blacklist writes bump a counter in the Django cache and
+# workers drop their negative entries on the next request. 0 disables.
+JWT_BLACKLIST_CACHE_TTL_SECONDS = float(env("JWT_BLACKLIST_CACHE_TTL_SECONDS", "5"))
+JWT_BLACKLIST_CACHE_MAX_ENTRIES = int(env("JWT_BLACKLIST_CACHE_MAX_ENTRIES", "50000"))
+JWT_BLACKLIST_SHARED_GENERATION = (
+    env("JWT_BLACKLIST_SHARED_GENERATION", "True").lower() == "true"
+)
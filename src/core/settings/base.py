@@ -103,6 +103,7 @@ MIDDLEWARE = [
     # CORS middleware must be placed before Django's security middleware
     "corsheaders.middleware.CorsMiddleware",
     "core.middleware.request_id.RequestIdMiddleware",
+    "core.middleware.request_metrics.RequestMetricsMiddleware",
     # Default Django middleware
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
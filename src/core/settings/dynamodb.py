@@ -37,6 +37,135 @@ DYNAMODB_CONNECT_TIMEOUT_SECONDS = float(
 DYNAMODB_READ_TIMEOUT_SECONDS = float(os.getenv("DYNAMODB_READ_TIMEOUT_SECONDS", "5"))
 DYNAMODB_MAX_ATTEMPTS = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "3"))
 
+# Per-worker thread pool size for independent DynamoDB reads issued in
+# parallel (dashboard prefetch, fan-out queries). 1 disables concurrency.
+DYNAMODB_MAX_CONCURRENCY = int(os.getenv("DYNAMODB_MAX_CONCURRENCY", "8"))
+# Deadline for a group of concurrent reads (core.dynamodb.concurrency
+# .ConcurrentReads), counted from when the group starts. Past it the group's
+# remaining reads run on the request thread. 0 waits forever.
+DYNAMODB_FANOUT_TIMEOUT_SECONDS = float(
+    os.getenv("DYNAMODB_FANOUT_TIMEOUT_SECONDS", "10")
+)
+
+# Write-behind analytics rollups of barcode-use transactions (the transaction
+# items themselves are written with the use). Each worker buffers up to
+# USAGE_ROLLUP_BUFFER_MAX_ITEMS items and flushes batches of 25 when a batch is
+# full or its oldest item is USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS old. A full
+# buffer blocks the request for up to the enqueue timeout, then writes inline.
+# Off under TESTING so tests see every write synchronously.
+USAGE_ROLLUP_WRITE_BEHIND = (
+    os.getenv(
+        "USAGE_ROLLUP_WRITE_BEHIND",
+        "False" if os.getenv("TESTING", "False").lower() == "true" else "True",
+    ).lower()
+    == "true"
+)
+USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS = float(
+    os.getenv("USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS", "1")
+)
+USAGE_ROLLUP_BUFFER_MAX_ITEMS = int(os.getenv("USAGE_ROLLUP_BUFFER_MAX_ITEMS", "1000"))
+USAGE_ROLLUP_BUFFER_ENQUEUE_TIMEOUT_SECONDS = float(
+    os.getenv("USAGE_ROLLUP_BUFFER_ENQUEUE_TIMEOUT_SECONDS", "2")
+)
+
+# Transaction history pages (TransactionService.history_page and the
+# transaction_history endpoint). Clients ask for up to
+# TRANSACTION_HISTORY_MAX_PAGE_SIZE items per page; the signed cursors that
+# continue a listing expire after TRANSACTION_HISTORY_CURSOR_MAX_AGE_SECONDS.
+TRANSACTION_HISTORY_PAGE_SIZE = int(os.getenv("TRANSACTION_HISTORY_PAGE_SIZE", "50"))
+TRANSACTION_HISTORY_MAX_PAGE_SIZE = int(
+    os.getenv("TRANSACTION_HISTORY_MAX_PAGE_SIZE", "200")
+)
+TRANSACTION_HISTORY_CURSOR_MAX_AGE_SECONDS = int(
+    os.getenv("TRANSACTION_HISTORY_CURSOR_MAX_AGE_SECONDS", "86400")
+)
+
+# Answer whole-day admin analytics from the usage rollups in the
+# UsageCounters table instead of scanning Transactions. Keep False until
+# rebuild_usage_rollups has run once.
+USAGE_ROLLUP_READS = os.getenv("USAGE_ROLLUP_READS", "False").lower() == "true"
+
+# Sharded total_usage counters for hot barcodes. A barcode whose usage writes,
+# as seen by one worker, exceed USAGE_SHARD_WRITES_PER_SECOND (averaged over
+# USAGE_SHARD_RATE_WINDOW_SECONDS) is switched to USAGE_COUNTER_SHARDS counter
+# items in UsageCounters; 0 disables automatic sharding. While sharded, the
+# barcode item's last_used is rewritten at most once per
+# USAGE_SHARD_LAST_USED_RESOLUTION_SECONDS.
+USAGE_COUNTER_SHARDS = int(os.getenv("USAGE_COUNTER_SHARDS", "8"))
+USAGE_SHARD_WRITES_PER_SECOND = float(os.getenv("USAGE_SHARD_WRITES_PER_SECOND", "20"))
+USAGE_SHARD_RATE_WINDOW_SECONDS = float(
+    os.getenv("USAGE_SHARD_RATE_WINDOW_SECONDS", "10")
+)
+USAGE_SHARD_LAST_USED_RESOLUTION_SECONDS = int(
+    os.getenv("USAGE_SHARD_LAST_USED_RESOLUTION_SECONDS", "60")
+)
+
+# Segments (TotalSegments) used by core.dynamodb.concurrency.parallel_scan for
+# admin analytics over whole tables. At most DYNAMODB_MAX_CONCURRENCY run at
+# once.
+DYNAMODB_SCAN_SEGMENTS = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "8"))
+
+# Per-worker cache of the shared DynamicBarcode pull pool. Entries older than
+# this are refreshed in the background; 0 disables the cache and every pull
+# queries SharedBarcodeTypeIndex directly.
+PULL_POOL_CACHE_TTL_SECONDS = float(os.getenv("PULL_POOL_CACHE_TTL_SECONDS", "5"))
+
+# Read-through cache of user settings: a per-worker LRU (SETTINGS_CACHE_*)
+# in front of the shared Django cache. Writes publish a new settings version
+# so other workers refetch on their next read. With a per-process cache
+# backend (LocMemCache) shared items are kept no longer than the local TTL,
+# which then bounds staleness across workers. 0 disables a tier.
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "30"))
+SETTINGS_CACHE_MAX_ENTRIES = int(os.getenv("SETTINGS_CACHE_MAX_ENTRIES", "10000"))
+SETTINGS_SHARED_CACHE_TTL_SECONDS = int(
+    os.getenv("SETTINGS_SHARED_CACHE_TTL_SECONDS", "3600")
+)
+
+# Read the pull pool from the sharded, sparse SharedPoolShardIndex. When
+# upgrading an existing table, run with False (pool reads then use
+# SharedBarcodeTypeIndex) until backfill_pool_shards has tagged the existing
+# shared barcodes. Writes always maintain pool_shard.
+SHARED_POOL_SHARDED_READS = (
+    os.getenv("SHARED_POOL_SHARDED_READS", "False").lower() == "true"
+)
+
+# List a user's own barcodes from UserBarcodeTimeIndex, already ordered by
+# time_created. When upgrading an existing table, run with False (listings
+# then read and sort the whole partition) until create_dynamodb_tables has
+# added the index and it is ACTIVE.
+USER_BARCODE_TIME_INDEX_READS = (
+    os.getenv("USER_BARCODE_TIME_INDEX_READS", "False").lower() == "true"
+)
+
+# Paged dashboard barcode lists (barcode_dashboard GET with a cursor or
+# page_size). Requests without either still get the whole list.
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+DASHBOARD_MAX_PAGE_SIZE = int(os.getenv("DASHBOARD_MAX_PAGE_SIZE", "200"))
+
+# Barcode uniqueness locks moved from a single partition to hashed shards.
+# While True, the legacy "__barcode_unique__" partition is also checked on
+# create and cleaned up on delete. Set to False once shard_barcode_locks has
+# rewritten every legacy lock.
+BARCODE_UNIQUE_LOCK_LEGACY_READS = (
+    os.getenv("BARCODE_UNIQUE_LOCK_LEGACY_READS", "True").lower() == "true"
+)
+
+# Pre-locked Identification barcode values
+# (index.repositories.identification_reservoir). refill tops the reservoir up
+# to IDENTIFICATION_RESERVOIR_TARGET values; with background refill on, a
+# worker whose listings come up short runs one on a daemon thread. Off under
+# TESTING so tests control when values are reserved.
+IDENTIFICATION_RESERVOIR_TARGET = int(
+    os.getenv("IDENTIFICATION_RESERVOIR_TARGET", "1000")
+)
+IDENTIFICATION_RESERVOIR_BACKGROUND_REFILL = (
+    os.getenv(
+        "IDENTIFICATION_RESERVOIR_BACKGROUND_REFILL",
+        "False" if os.getenv("TESTING", "False").lower() == "true" else "True",
+    ).lower()
+    == "true"
+)
+
 # AWS credentials (optional — prefer IAM roles in production)
 # These are only used when explicitly set; boto3 will otherwise use the
 # standard credential chain (env vars, ~/.aws/credentials, instance profile).
@@ -54,6 +183,7 @@ DYNAMODB_TABLES = {
     "webauthn_credentials": f"{DYNAMODB_TABLE_PREFIX}WebAuthnCredentials",
     "admin_audit": f"{DYNAMODB_TABLE_PREFIX}AdminAudit",
     "admin_otp": f"{DYNAMODB_TABLE_PREFIX}AdminOtp",
+    "usage_counters": f"{DYNAMODB_TABLE_PREFIX}UsageCounters",
 }
 
 if PERSISTENCE_MODE == "dynamodb":
@@ -64,4 +194,5 @@ else:
         "transactions",
         "user_settings",
         "auth_security",
+        "usage_counters",
     )
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.local_cache import LocalTTLCache
+
+
+class LocalTTLCacheTest(SimpleTestCase):
+    def test_get_returns_default_for_missing_key(self):
+        cache = LocalTTLCache(max_entries=2, ttl_seconds=10)
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.get("missing", 0), 0)
+
+    def test_entries_expire_after_ttl(self):
+        cache = LocalTTLCache(max_entries=2, ttl_seconds=10)
+        with patch("core.local_cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("core.local_cache.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.get("a"), 1)
+        with patch("core.local_cache.time.monotonic", return_value=110.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalTTLCache(max_entries=2, ttl_seconds=10)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_zero_ttl_does_not_store(self):
+        cache = LocalTTLCache(max_entries=2, ttl_seconds=0)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_stats_track_hit_rate(self):
+        cache = LocalTTLCache(max_entries=2, ttl_seconds=10)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["size"], 1)
@@ -1,6 +1,6 @@
 import logging
 
-from index.repositories import SettingsRepository
+from index.repositories import BarcodeRepository, SettingsRepository
 from index.services.barcode import generate_barcode
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -40,11 +40,15 @@ class ActiveProfileAPIView(APIView):
                 profile_data = {
                     "name": barcode.get("profile_name"),
                     "information_id": barcode.get("profile_info_id"),
-                    "has_avatar": bool(barcode.get("profile_avatar")),
+                    "has_avatar": BarcodeRepository.has_avatar(barcode),
                 }
-                # Add avatar data if exists
-                if barcode.get("profile_avatar"):
-                    img_data = barcode["profile_avatar"]
+                # Avatars live outside the barcode item; fetch only when set.
+                img_data = (
+                    BarcodeRepository.get_avatar(barcode)
+                    if profile_data["has_avatar"]
+                    else None
+                )
+                if img_data:
                     if not img_data.startswith("data:image"):
                         img_data = f"data:image/png;base64,{img_data}"
                     profile_data["avatar_data"] = img_data
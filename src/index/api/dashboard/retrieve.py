@@ -1,3 +1,6 @@
+from django.conf import settings as django_settings
+from django.core import signing
+from rest_framework import status
 from rest_framework.response import Response
 
 from index.repositories import BarcodeRepository, SettingsRepository
@@ -5,20 +8,63 @@ from index.serializers import (
     BarcodeSerializer,
     UserBarcodeSettingsSerializer,
     UserBarcodePullSettingsSerializer,
+    prefetch_barcode_activity,
 )
 
+DASHBOARD_CURSOR_SALT = "index.dashboard.barcodes"
+
+
+def _dashboard_page_request(request):
+    """
+    (page_size, cursor) of a paged request, or (None, None) when the request
+    names neither. Raises ValueError for a bad page_size or cursor.
+    """
+    params = request.query_params
+    raw_cursor = params.get("cursor")
+    raw_page_size = params.get("page_size")
+    if not raw_cursor and not raw_page_size:
+        return None, None
+
+    page_size = (
+        int(raw_page_size)
+        if raw_page_size
+        else getattr(django_settings, "DASHBOARD_PAGE_SIZE", 50)
+    )
+    page_size = max(
+        1, min(page_size, getattr(django_settings, "DASHBOARD_MAX_PAGE_SIZE", 200))
+    )
+    if not raw_cursor:
+        return page_size, None
+    try:
+        data = signing.loads(raw_cursor, salt=DASHBOARD_CURSOR_SALT)
+    except signing.BadSignature:
+        raise ValueError("Invalid cursor.")
+    if data.get("u") != str(request.user.id):
+        raise ValueError("Cursor does not match this listing.")
+    return page_size, data["k"]
+
 
 class DashboardRetrieveMixin:
     """GET handler: retrieve user settings and barcodes."""
 
     def get(self, request):
         user = request.user
+        try:
+            page_size, cursor = _dashboard_page_request(request)
+        except ValueError as exc:
+            return Response(
+                {"status": "error", "message": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Get or create user settings (single DynamoDB item)
         settings = SettingsRepository.get_or_create(user.id)
 
-        # Get dashboard barcodes (user's own + shared DynamicBarcodes)
-        barcodes = BarcodeRepository.get_dashboard_barcodes(user.id)
+        # Get dashboard barcodes (user's own + shared DynamicBarcodes), all
+        # of them unless the client asked for a page.
+        barcodes, next_key = BarcodeRepository.get_dashboard_page(
+            user.id, page_size=page_size, cursor=cursor
+        )
 
         # Extract pull settings from the merged settings item
         pull_settings_data = {
@@ -31,6 +77,8 @@ class DashboardRetrieveMixin:
             "request": request,
             "pull_settings": pull_settings_data,
             "barcodes": barcodes,
+            # Batch-load per-barcode activity instead of querying per row.
+            "barcode_activity": prefetch_barcode_activity(barcodes),
         }
         settings_serializer = UserBarcodeSettingsSerializer(
             settings, context=shared_context
@@ -44,10 +92,19 @@ class DashboardRetrieveMixin:
             barcodes, many=True, context=shared_context
         )
 
-        return Response(
-            {
-                "settings": settings_serializer.data,
-                "pull_settings": pull_settings_data,
-                "barcodes": barcodes_serializer.data,
-            }
-        )
+        data = {
+            "settings": settings_serializer.data,
+            "pull_settings": pull_settings_data,
+            "barcodes": barcodes_serializer.data,
+        }
+        if page_size is not None:
+            data["next_cursor"] = (
+                signing.dumps(
+                    {"u": str(user.id), "k": next_key},
+                    salt=DASHBOARD_CURSOR_SALT,
+                    compress=True,
+                )
+                if next_key
+                else None
+            )
+        return Response(data)
@@ -9,11 +9,19 @@ from index.serializers import (
 
 
 class DashboardSettingsUpdateMixin:
-    """POST handler: update user barcode settings and/or pull settings."""
+    """POST handler: update user barcode settings and/or pull settings.
+
+    Pull-setting changes, the automatic barcode clear and the field updates
+    are collected into one SettingsRepository.upsert() whose ALL_NEW result
+    is the response, so a POST reads the settings once and writes them once.
+    """
 
     def post(self, request):
         user = request.user
         settings = SettingsRepository.get_or_create(user.id)
+        # Collected and written once. Error responses still persist what was
+        # collected before them, as the step-by-step writes used to.
+        updates = {}
 
         data = request.data.copy()
         barcode_requested = "barcode" in data
@@ -27,17 +35,13 @@ class DashboardSettingsUpdateMixin:
             pull_serializer = UserBarcodePullSettingsSerializer(data=pull_settings_data)
             if pull_serializer.is_valid():
                 validated = pull_serializer.validated_data
-                SettingsRepository.update(
-                    user.id,
-                    pull_setting=validated.get(
-                        "pull_setting", settings.get("pull_setting")
-                    ),
-                    pull_gender_setting=validated.get(
-                        "gender_setting", settings.get("pull_gender_setting")
-                    ),
+                updates["pull_setting"] = validated.get(
+                    "pull_setting", settings.get("pull_setting")
+                )
+                updates["pull_gender_setting"] = validated.get(
+                    "gender_setting", settings.get("pull_gender_setting")
                 )
-                # Refresh settings
-                settings = SettingsRepository.get_or_create(user.id)
+                settings = {**settings, **updates}
                 pull_settings_enabled_after = settings.get("pull_setting") == "Enable"
             else:
                 return Response(
@@ -59,6 +63,8 @@ class DashboardSettingsUpdateMixin:
             and pull_settings_enabled_after
             and not pull_setting_enabled_now
         ):
+            if updates:
+                SettingsRepository.upsert(user.id, **updates)
             return Response(
                 {
                     "status": "error",
@@ -76,7 +82,8 @@ class DashboardSettingsUpdateMixin:
         if pull_settings_enabled_after:
             data.pop("barcode", None)
             if settings.get("active_barcode_uuid"):
-                SettingsRepository.set_active_barcode(user.id, None)
+                updates["active_barcode_uuid"] = None
+                updates["active_barcode_owner_id"] = None
                 settings["active_barcode_uuid"] = None
 
         # Build pull_settings dict for serializer context
@@ -94,7 +101,6 @@ class DashboardSettingsUpdateMixin:
 
         if serializer.is_valid():
             validated = serializer.validated_data
-            updates = {}
             if "active_barcode_uuid" in validated:
                 updates["active_barcode_uuid"] = validated["active_barcode_uuid"]
                 updates["active_barcode_owner_id"] = (
@@ -114,10 +120,7 @@ class DashboardSettingsUpdateMixin:
                 updates["prefer_front_camera"] = validated["prefer_front_camera"]
 
             if updates:
-                SettingsRepository.update(user.id, **updates)
-
-            # Refresh for response
-            settings = SettingsRepository.get_or_create(user.id)
+                settings = SettingsRepository.upsert(user.id, **updates)
 
             response_settings = UserBarcodeSettingsSerializer(
                 settings,
@@ -133,6 +136,8 @@ class DashboardSettingsUpdateMixin:
                 }
             )
 
+        if updates:
+            SettingsRepository.upsert(user.id, **updates)
         return Response(
             {"status": "error", "errors": serializer.errors},
             status=status.HTTP_400_BAD_REQUEST,
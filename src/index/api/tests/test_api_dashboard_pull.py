@@ -57,6 +57,42 @@ class BarcodeDashboardPullSettingsTest(BarcodeDashboardTestBase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("barcode", response.data["errors"])
 
+    def test_rejected_barcode_selection_keeps_pull_settings_changes(self):
+        """Pull settings sent with a rejected barcode selection are saved"""
+        self._authenticate_user(self.user)
+
+        SettingsRepository.update(
+            self.user.id,
+            pull_setting="Enable",
+            pull_gender_setting="Male",
+        )
+
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="12345678901234",
+            barcode_type="DynamicBarcode",
+            owner_username=self.user.username,
+        )
+
+        url = reverse("index:api_barcode_dashboard")
+        response = self.client.post(
+            url,
+            {
+                "pull_settings": {
+                    "pull_setting": "Enable",
+                    "gender_setting": "Female",
+                },
+                "barcode": barcode["barcode_uuid"],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("barcode", response.data["errors"])
+        settings = SettingsRepository.get(self.user.id)
+        self.assertEqual(settings["pull_setting"], "Enable")
+        self.assertEqual(settings["pull_gender_setting"], "Female")
+
     def test_dashboard_post_can_update_barcode_when_pull_disabled(self):
         """Test that barcode can be updated when pull_setting is disabled"""
         self._authenticate_user(self.user)
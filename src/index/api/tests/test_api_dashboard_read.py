@@ -87,6 +87,48 @@ class BarcodeDashboardReadTest(BarcodeDashboardTestBase):
         self.assertIn("owned_dynamic", returned_values)
         self.assertNotIn("shared_private", returned_values)
 
+    def test_dashboard_get_pages_with_signed_cursor(self):
+        self._authenticate_user(self.user)
+        for minute in range(3):
+            BarcodeRepository.create(
+                user_id=self.user.id,
+                barcode_value=f"paged_{minute}",
+                owner_username=self.user.username,
+                time_created=f"2026-04-23T00:0{minute}:00+00:00",
+            )
+        url = reverse("index:api_barcode_dashboard")
+
+        response = self.client.get(url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["barcode"] for item in response.data["barcodes"]],
+            ["paged_2", "paged_1"],
+        )
+
+        response = self.client.get(url, {"cursor": response.data["next_cursor"]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["barcode"] for item in response.data["barcodes"]], ["paged_0"]
+        )
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_dashboard_get_rejects_foreign_or_tampered_cursor(self):
+        other = User.objects.create_user("otheruser")
+        for minute in range(2):
+            BarcodeRepository.create(
+                user_id=other.id,
+                barcode_value=f"other_{minute}",
+                time_created=f"2026-04-23T00:0{minute}:00+00:00",
+            )
+        url = reverse("index:api_barcode_dashboard")
+        self._authenticate_user(other)
+        cursor = self.client.get(url, {"page_size": 1}).data["next_cursor"]
+
+        self._authenticate_user(self.user)
+        for bad in (cursor, cursor + "x"):
+            response = self.client.get(url, {"cursor": bad})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_dashboard_get_includes_pull_settings(self):
         """Test that GET dashboard includes pull_settings in response"""
         self._authenticate_user(self.user)
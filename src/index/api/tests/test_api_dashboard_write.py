@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.contrib.auth.models import User
 from django.urls import reverse
 from index.repositories import BarcodeRepository, SettingsRepository
@@ -60,6 +62,46 @@ class BarcodeDashboardWriteTest(BarcodeDashboardTestBase):
         self.assertEqual(settings["active_barcode_uuid"], shared["barcode_uuid"])
         self.assertEqual(settings["active_barcode_owner_id"], str(owner.id))
 
+    def test_dashboard_post_settings_is_one_write(self):
+        """Pull settings, auto-clear and field updates share one UpdateItem."""
+        self._authenticate_user(self.user)
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="12345678901234",
+            barcode_type="DynamicBarcode",
+            owner_username=self.user.username,
+        )
+        SettingsRepository.set_active_own_barcode(self.user.id, barcode["barcode_uuid"])
+
+        url = reverse("index:api_barcode_dashboard")
+        with patch.object(
+            SettingsRepository, "upsert", wraps=SettingsRepository.upsert
+        ) as mock_upsert, patch.object(
+            SettingsRepository, "get", wraps=SettingsRepository.get
+        ) as mock_get:
+            response = self.client.post(
+                url,
+                {
+                    "pull_settings": {
+                        "pull_setting": "Enable",
+                        "gender_setting": "Male",
+                    },
+                    "scanner_detection_enabled": True,
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # One read (get) and one write.
+        self.assertEqual(mock_get.call_count, 1)
+        mock_upsert.assert_called_once()
+        settings = SettingsRepository.get(self.user.id)
+        self.assertEqual(settings["pull_setting"], "Enable")
+        self.assertEqual(settings["pull_gender_setting"], "Male")
+        self.assertTrue(settings["scanner_detection_enabled"])
+        self.assertNotIn("active_barcode_uuid", settings)
+        self.assertTrue(response.data["settings"]["scanner_detection_enabled"])
+
     def test_dashboard_put_create_barcode(self):
         """Test creating new barcode"""
         self._authenticate_user(self.user)
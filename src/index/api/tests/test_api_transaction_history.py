@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from index.repositories import TransactionRepository
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class TransactionHistoryAPITest(DynamoDBTestMixin, APITestCase):
+    """Test TransactionHistoryAPIView"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        self.url = reverse("index:api_transaction_history")
+        self.now = timezone.now()
+        for i in range(3):
+            TransactionRepository.create(
+                user_id=self.user.id,
+                barcode_uuid="bc-uuid",
+                barcode_value="12345",
+                time_created=(self.now - timedelta(hours=i)).isoformat(),
+            )
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_pages_follow_next_cursor(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.get(
+            self.url, {"page_size": 2, "cursor": response.data["next_cursor"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["barcode_value"], "12345")
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_time_range_limits_results(self):
+        since = (self.now - timedelta(minutes=90)).isoformat()
+        response = self.client.get(self.url, {"since": since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_bad_parameters_are_rejected(self):
+        for params in (
+            {"cursor": "not-a-cursor"},
+            {"since": "yesterday"},
+            {"page_size": "many"},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bad_page_size_message_is_readable(self):
+        response = self.client.get(self.url, {"page_size": "many"})
+        self.assertEqual(response.data["message"], "Invalid page_size: many")
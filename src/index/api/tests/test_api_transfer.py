@@ -57,7 +57,8 @@ class TransferDynamicBarcodeAPITest(DynamoDBTestMixin, APITestCase):
         # Check profile data was denormalized into barcode item
         self.assertEqual(barcode.get("profile_name"), "John Doe")
         self.assertEqual(barcode.get("profile_info_id"), "12345")
-        self.assertEqual(barcode.get("profile_avatar"), "dGVzdGltYWdl")
+        self.assertNotIn("profile_avatar", barcode)
+        self.assertEqual(BarcodeRepository.get_avatar(barcode), "dGVzdGltYWdl")
 
     def test_transfer_missing_html(self):
         """Test that missing HTML returns error"""
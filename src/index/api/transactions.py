@@ -0,0 +1,59 @@
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from index.services.transactions import TransactionService
+
+
+def _parse_bound(value):
+    """ISO datetime query parameter; None if absent, ValueError if invalid."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid datetime: {value}")
+    return parsed
+
+
+def _parse_page_size(value):
+    """Integer query parameter; None if absent, ValueError if invalid."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid page_size: {value}") from None
+
+
+class TransactionHistoryAPIView(APIView):
+    """
+    Page through the current user's transactions, newest first.
+
+    GET params: cursor (next_cursor of the previous page), page_size, and an
+    optional since/until ISO datetime range. Returns
+    {"results": [...], "next_cursor": str | null}.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            since = _parse_bound(params.get("since"))
+            until = _parse_bound(params.get("until"))
+            page_size = _parse_page_size(params.get("page_size"))
+            page = TransactionService.history_page(
+                request.user,
+                cursor=params.get("cursor") or None,
+                page_size=page_size,
+                since=since,
+                until=until,
+            )
+        except ValueError as exc:
+            return Response(
+                {"status": "error", "message": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(page)
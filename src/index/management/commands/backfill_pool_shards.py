@@ -0,0 +1,58 @@
+"""Management command to tag shared barcodes with their pull-pool shard."""
+
+from django.core.management.base import BaseCommand
+
+from core.dynamodb.client import get_table
+from index.repositories.barcode_repo import _pool_shard_for, _sync_pool_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Scan the Barcodes table and set (or clear) pool_shard so that "
+        "SharedPoolShardIndex holds exactly the shared DynamicBarcodes. "
+        "Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the barcodes that need updating without writing",
+        )
+
+    def handle(self, *args, **options):
+        table = get_table("barcodes")
+        scan_kwargs = {
+            "ProjectionExpression": (
+                "user_id, barcode_uuid, barcode_type, share_with_others, "
+                "profile_gender, pool_shard"
+            ),
+        }
+        scanned = changed = 0
+
+        while True:
+            resp = table.scan(**scan_kwargs)
+            for item in resp.get("Items", []):
+                scanned += 1
+                if item.get("pool_shard") == _pool_shard_for(item):
+                    continue
+                changed += 1
+                if not options["dry_run"]:
+                    _sync_pool_shard(item)
+
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Dry run: {changed} of {scanned} barcodes need a pool "
+                    "shard update."
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {changed} of {scanned} barcodes.")
+        )
@@ -0,0 +1,90 @@
+"""Management command to rebuild daily usage counters from Transactions."""
+
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.dynamodb.client import get_table
+from index.repositories.usage_counter_repo import (
+    DAILY_COUNTER_RETENTION_DAYS,
+    UsageCounterRepository,
+    local_day,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild per-barcode daily usage counters by scanning the Transactions "
+        "table. Existing counters for the rebuilt days are overwritten, and "
+        "those with no transactions are reset to 0. Uses recorded while this "
+        "runs may be lost or counted twice for the current day; re-run with "
+        "--days 1 once the day is quiet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DAILY_COUNTER_RETENTION_DAYS,
+            help="Only rebuild counters for the last N local days "
+            f"(default: {DAILY_COUNTER_RETENTION_DAYS})",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the counters that would be written without writing them",
+        )
+
+    def handle(self, *args, **options):
+        days = options["days"]
+        if days < 1:
+            raise CommandError("--days must be at least 1")
+        first_day = (timezone.localdate() - timedelta(days=days - 1)).isoformat()
+
+        table = get_table("transactions")
+        counts: Counter = Counter()
+        scanned = 0
+
+        scan_kwargs = {
+            "ProjectionExpression": "barcode_uuid, time_created",
+        }
+        while True:
+            resp = table.scan(**scan_kwargs)
+            for item in resp.get("Items", []):
+                scanned += 1
+                bc_uuid = item.get("barcode_uuid")
+                tc = item.get("time_created")
+                if not bc_uuid or not tc:
+                    continue
+                try:
+                    day = local_day(tc)
+                except ValueError:
+                    continue
+                if day < first_day:
+                    continue
+                counts[(bc_uuid, day)] += 1
+
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+        stale = UsageCounterRepository.get_daily_counter_keys(first_day) - set(counts)
+        for key in stale:
+            counts[key] = 0
+
+        self.stdout.write(
+            f"Scanned {scanned} transactions; {len(counts)} daily counters "
+            f"since {first_day}, {len(stale)} of them reset to 0."
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: no counters written."))
+            return
+
+        written = UsageCounterRepository.put_daily_counts(
+            (bc_uuid, day, count) for (bc_uuid, day), count in counts.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily counters."))
@@ -0,0 +1,73 @@
+"""Management command to move inline barcode avatars into avatar items."""
+
+from boto3.dynamodb.conditions import Attr
+from django.core.management.base import BaseCommand
+
+from core.dynamodb.client import get_table
+from index.repositories.barcode_repo import _store_avatar
+
+
+class Command(BaseCommand):
+    help = (
+        "Move profile_avatar images stored inline on barcode items into "
+        "content-addressed avatar items and replace them with "
+        "profile_avatar_ref. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the barcodes with inline avatars without rewriting them",
+        )
+
+    def handle(self, *args, **options):
+        table = get_table("barcodes")
+        scan_kwargs = {
+            "FilterExpression": Attr("profile_avatar").exists(),
+            "ProjectionExpression": "user_id, barcode_uuid, profile_avatar",
+        }
+        found = migrated = 0
+
+        while True:
+            resp = table.scan(**scan_kwargs)
+            for item in resp.get("Items", []):
+                found += 1
+                if options["dry_run"]:
+                    continue
+                ref = _store_avatar(item["profile_avatar"])
+                try:
+                    table.update_item(
+                        Key={
+                            "user_id": item["user_id"],
+                            "barcode_uuid": item["barcode_uuid"],
+                        },
+                        UpdateExpression=(
+                            "SET profile_avatar_ref = :ref REMOVE profile_avatar"
+                        ),
+                        # Skip items whose avatar changed since the scan.
+                        ConditionExpression="profile_avatar = :avatar",
+                        ExpressionAttributeValues={
+                            ":ref": ref,
+                            ":avatar": item["profile_avatar"],
+                        },
+                    )
+                except table.meta.client.exceptions.ConditionalCheckFailedException:
+                    continue
+                migrated += 1
+
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Dry run: {found} barcodes have inline avatars to move."
+                )
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"Moved {migrated} of {found} inline avatars.")
+        )
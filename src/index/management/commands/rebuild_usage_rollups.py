@@ -0,0 +1,104 @@
+"""Management command to verify and rebuild analytics usage rollups."""
+
+from collections import Counter
+from datetime import date
+
+from boto3.dynamodb.conditions import Attr
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dynamodb.concurrency import parallel_scan
+from index.repositories import UsageCounterRepository
+from index.repositories.usage_counter_repo import rollup_day
+
+
+def _count_segment(items):
+    day_totals: Counter = Counter()
+    barcode_counts: Counter = Counter()
+    for item in items:
+        tc = item.get("time_created")
+        if not tc:
+            continue
+        day = rollup_day(tc)
+        day_totals[day] += 1
+        if item.get("barcode_uuid"):
+            barcode_counts[(day, item["barcode_uuid"])] += 1
+    return day_totals, barcode_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-day and per-(day, barcode) usage rollups from the "
+        "Transactions table with a parallel scan, and rewrite the rollups that "
+        "differ. Transactions written while this runs may be counted twice or "
+        "missed for the current day; re-run with --since for that day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild days on or after YYYY-MM-DD (default: all days)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Verify the rollups and report differences without writing",
+        )
+
+    def handle(self, *args, **options):
+        since = options["since"]
+        scan_kwargs = {"ProjectionExpression": "time_created, barcode_uuid"}
+        if since:
+            try:
+                date.fromisoformat(since)
+            except ValueError as exc:
+                raise CommandError("--since must be YYYY-MM-DD") from exc
+            scan_kwargs["FilterExpression"] = Attr("time_created").gte(since)
+
+        day_totals: Counter = Counter()
+        barcode_counts: Counter = Counter()
+        for segment_days, segment_barcodes in parallel_scan(
+            "transactions", _count_segment, **scan_kwargs
+        ):
+            day_totals.update(segment_days)
+            barcode_counts.update(segment_barcodes)
+
+        existing_days = UsageCounterRepository.get_day_totals(first_day=since)
+        existing_barcodes = {
+            (day, barcode_uuid): count
+            for day, counts in UsageCounterRepository.get_barcode_rollups(
+                set(existing_days) | set(day_totals)
+            ).items()
+            for barcode_uuid, count in counts.items()
+        }
+
+        days_to_write = {
+            day: count
+            for day, count in day_totals.items()
+            if existing_days.get(day) != count
+        }
+        barcodes_to_write = {
+            key: count
+            for key, count in barcode_counts.items()
+            if existing_barcodes.get(key) != count
+        }
+        stale = [(day, None) for day in existing_days if day not in day_totals] + [
+            key for key in existing_barcodes if key not in barcode_counts
+        ]
+        mismatched = len(days_to_write) + len(barcodes_to_write) + len(stale)
+
+        self.stdout.write(
+            f"Recomputed {len(day_totals)} day rollups and "
+            f"{len(barcode_counts)} barcode rollups; {mismatched} differ."
+        )
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING("Dry run: no rollups written."))
+            return
+
+        written = UsageCounterRepository.replace_rollups(
+            days_to_write, barcodes_to_write, stale
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {written} rollups and removed {len(stale)} stale ones."
+            )
+        )
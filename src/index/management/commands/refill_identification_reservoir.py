@@ -0,0 +1,32 @@
+"""Management command to top up the reservoir of Identification values."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from index.repositories import IdentificationReservoir
+
+
+class Command(BaseCommand):
+    help = (
+        "Reserve fresh Identification barcode values, locking each one, until "
+        "the reservoir holds IDENTIFICATION_RESERVOIR_TARGET values. Safe to "
+        "run from a scheduler alongside the workers' own background refills."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            type=int,
+            help="Values to keep in the reservoir (default: the setting)",
+        )
+
+    def handle(self, *args, **options):
+        target = options["target"]
+        if target is not None and target < 0:
+            raise CommandError("--target must not be negative")
+        added = IdentificationReservoir.refill(target)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reserved {added} Identification values; the reservoir "
+                f"holds {IdentificationReservoir.size()}."
+            )
+        )
@@ -0,0 +1,99 @@
+"""Management command to move legacy barcode uniqueness locks onto shards."""
+
+from boto3.dynamodb.conditions import Key
+from django.core.management.base import BaseCommand
+
+from core.dynamodb.client import (
+    cancellation_reasons,
+    get_client,
+    get_table,
+    transact_write_items,
+)
+from index.repositories.barcode_repo import (
+    UNIQUE_BARCODE_USER_ID,
+    _legacy_unique_lock_key,
+    _unique_lock_key,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite barcode uniqueness locks stored under the single legacy "
+        f'"{UNIQUE_BARCODE_USER_ID}" partition onto the hashed lock shards, '
+        "then delete the legacy items. Safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the legacy locks without rewriting them",
+        )
+
+    def handle(self, *args, **options):
+        table = get_table("barcodes")
+        query_kwargs = {
+            "KeyConditionExpression": Key("user_id").eq(UNIQUE_BARCODE_USER_ID),
+        }
+        moved = 0
+
+        while True:
+            resp = table.query(**query_kwargs)
+            items = resp.get("Items", [])
+            if options["dry_run"]:
+                moved += len(items)
+            else:
+                moved += sum(self._move(table, item) for item in items)
+
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(f"Dry run: {moved} legacy locks would be moved.")
+            )
+            return
+        self.stdout.write(self.style.SUCCESS(f"Moved {moved} legacy locks."))
+
+    @staticmethod
+    def _move(table, item) -> bool:
+        """
+        Move one legacy lock onto its shard in a single transaction.
+
+        The legacy lock must still exist, so a value released since the
+        query is not locked again. If the shard lock already exists the
+        value stays locked by it and only the legacy lock is deleted.
+        """
+        legacy_key = _legacy_unique_lock_key(item["barcode_uuid"])
+        try:
+            transact_write_items(
+                [
+                    {
+                        "Delete": {
+                            "table": "barcodes",
+                            "Key": legacy_key,
+                            "ConditionExpression": "attribute_exists(barcode_uuid)",
+                        }
+                    },
+                    {
+                        "Put": {
+                            "table": "barcodes",
+                            "Item": {
+                                **item,
+                                **_unique_lock_key(item["barcode_uuid"]),
+                            },
+                            "ConditionExpression": "attribute_not_exists(barcode_uuid)",
+                        }
+                    },
+                ]
+            )
+        except get_client().exceptions.TransactionCanceledException as exc:
+            reasons = cancellation_reasons(exc)
+            if reasons[:1] == ["ConditionalCheckFailed"]:
+                return False
+            if reasons[1:2] != ["ConditionalCheckFailed"]:
+                raise
+            table.delete_item(Key=legacy_key)
+        return True
@@ -0,0 +1,72 @@
+"""Tests for the backfill_pool_shards management command."""
+
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.dynamodb.client import get_table
+from index.repositories import BarcodeRepository
+from index.repositories.barcode_repo import _pool_shard_for
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class BackfillPoolShardsCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("backfill_pool_shards", *args, stdout=out)
+        return out.getvalue()
+
+    def _put_raw_barcode(self, uuid, shared=True):
+        # Written as before pool shards existed.
+        item = {
+            "user_id": "1",
+            "barcode_uuid": uuid,
+            "barcode": f"value-{uuid}",
+            "barcode_type": "DynamicBarcode",
+            "share_with_others": shared,
+            "profile_gender": "Female",
+            "time_created": "2026-01-01T00:00:00+00:00",
+        }
+        get_table("barcodes").put_item(Item=item)
+        return item
+
+    def test_tags_existing_shared_barcodes(self):
+        item = self._put_raw_barcode("legacy")
+        self._put_raw_barcode("private", shared=False)
+
+        output = self._run()
+
+        self.assertIn("Updated 1 of 2 barcodes", output)
+        stored = BarcodeRepository.get_by_uuid(1, "legacy")
+        self.assertEqual(stored["pool_shard"], _pool_shard_for(item))
+        self.assertNotIn("pool_shard", BarcodeRepository.get_by_uuid(1, "private"))
+        self.assertIn("Updated 0 of 2 barcodes", self._run())
+
+    def test_barcode_deleted_after_the_scan_stays_deleted(self):
+        self._put_raw_barcode("legacy")
+        table = get_table("barcodes")
+        scan = table.scan
+
+        def scan_then_delete(**kwargs):
+            resp = scan(**kwargs)
+            table.delete_item(Key={"user_id": "1", "barcode_uuid": "legacy"})
+            return resp
+
+        table.scan = scan_then_delete
+        with patch(
+            "index.management.commands.backfill_pool_shards.get_table",
+            return_value=table,
+        ):
+            self._run()
+
+        self.assertIsNone(BarcodeRepository.get_by_uuid(1, "legacy"))
+
+    def test_dry_run_writes_nothing(self):
+        self._put_raw_barcode("legacy")
+
+        output = self._run("--dry-run")
+
+        self.assertIn("1 of 1 barcodes need a pool shard update", output)
+        self.assertNotIn("pool_shard", BarcodeRepository.get_by_uuid(1, "legacy"))
@@ -0,0 +1,94 @@
+"""Tests for the backfill_usage_counters management command."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from core.dynamodb.client import get_table
+from index.repositories import TransactionRepository, UsageCounterRepository
+from index.repositories.usage_counter_repo import local_day
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class BackfillUsageCountersCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("backfill_usage_counters", *args, stdout=out)
+        return out.getvalue()
+
+    def _put_raw_transaction(self, barcode_uuid, when):
+        # Bypass the repository so no counter is maintained, as for rows
+        # written before counters existed.
+        get_table("transactions").put_item(
+            Item={
+                "user_id": "1",
+                "sk": f"TXN#{when}#raw",
+                "time_created": when,
+                "barcode_uuid": barcode_uuid,
+            }
+        )
+
+    def test_rebuilds_counters_from_transactions(self):
+        now = timezone.now()
+        yesterday = now - timedelta(days=1)
+        self._put_raw_transaction("bc-1", now.isoformat())
+        self._put_raw_transaction("bc-1", (now - timedelta(seconds=1)).isoformat())
+        self._put_raw_transaction("bc-1", yesterday.isoformat())
+
+        output = self._run()
+
+        self.assertIn("Wrote 2 daily counters", output)
+        self.assertEqual(UsageCounterRepository.get_daily_count("bc-1"), 2)
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count(
+                "bc-1", local_day(yesterday.isoformat())
+            ),
+            1,
+        )
+
+    def test_overwrites_drifted_counters(self):
+        TransactionRepository.create(user_id=1, barcode_uuid="bc-2")
+        UsageCounterRepository.increment_daily("bc-2", amount=5)
+
+        self._run()
+
+        self.assertEqual(UsageCounterRepository.get_daily_count("bc-2"), 1)
+
+    def test_resets_counters_without_transactions(self):
+        yesterday = local_day((timezone.now() - timedelta(days=1)).isoformat())
+        UsageCounterRepository.increment_daily("bc-5", day=yesterday, amount=3)
+        old_day = local_day((timezone.now() - timedelta(days=10)).isoformat())
+        UsageCounterRepository.increment_daily("bc-5", day=old_day, amount=2)
+
+        output = self._run("--days", "2")
+
+        self.assertIn("1 of them reset to 0", output)
+        self.assertEqual(UsageCounterRepository.get_daily_count("bc-5", yesterday), 0)
+        self.assertEqual(UsageCounterRepository.get_daily_count("bc-5", old_day), 2)
+
+    def test_dry_run_writes_nothing(self):
+        self._put_raw_transaction("bc-3", timezone.now().isoformat())
+
+        output = self._run("--dry-run")
+
+        self.assertIn("Dry run", output)
+        self.assertEqual(UsageCounterRepository.get_daily_count("bc-3"), 0)
+
+    def test_days_limits_rebuilt_range(self):
+        old = timezone.now() - timedelta(days=10)
+        self._put_raw_transaction("bc-4", old.isoformat())
+
+        self._run("--days", "2")
+
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count("bc-4", local_day(old.isoformat())),
+            0,
+        )
+
+    def test_rejects_non_positive_days(self):
+        with self.assertRaises(CommandError):
+            self._run("--days", "0")
@@ -0,0 +1,55 @@
+"""Tests for the migrate_barcode_avatars management command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.dynamodb.client import get_table
+from index.repositories import BarcodeRepository
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class MigrateBarcodeAvatarsCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("migrate_barcode_avatars", *args, stdout=out)
+        return out.getvalue()
+
+    def _put_inline_avatar(self, uuid, avatar="dGVzdA=="):
+        # Written as before avatars moved out of barcode items.
+        get_table("barcodes").put_item(
+            Item={
+                "user_id": "1",
+                "barcode_uuid": uuid,
+                "barcode": f"value-{uuid}",
+                "barcode_type": "Others",
+                "profile_name": "Owner",
+                "profile_avatar": avatar,
+            }
+        )
+
+    def test_moves_inline_avatars_into_shared_items(self):
+        self._put_inline_avatar("a")
+        self._put_inline_avatar("b")
+        BarcodeRepository.create(user_id=1, barcode_value="plain")
+
+        output = self._run()
+
+        self.assertIn("Moved 2 of 2 inline avatars", output)
+        first = BarcodeRepository.get_by_uuid(1, "a")
+        second = BarcodeRepository.get_by_uuid(1, "b")
+        self.assertNotIn("profile_avatar", first)
+        self.assertEqual(first["profile_avatar_ref"], second["profile_avatar_ref"])
+        self.assertEqual(BarcodeRepository.get_avatar(first), "dGVzdA==")
+        self.assertIn("Moved 0 of 0 inline avatars", self._run())
+
+    def test_dry_run_writes_nothing(self):
+        self._put_inline_avatar("a")
+
+        output = self._run("--dry-run")
+
+        self.assertIn("1 barcodes have inline avatars", output)
+        self.assertEqual(
+            BarcodeRepository.get_by_uuid(1, "a")["profile_avatar"], "dGVzdA=="
+        )
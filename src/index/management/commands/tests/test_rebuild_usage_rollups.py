@@ -0,0 +1,98 @@
+"""Tests for the rebuild_usage_rollups management command."""
+
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.dynamodb.client import get_table
+from index.repositories import TransactionRepository, UsageCounterRepository
+from index.repositories.usage_counter_repo import _day_rollup_key
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class RebuildUsageRollupsCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("rebuild_usage_rollups", *args, stdout=out)
+        return out.getvalue()
+
+    def _put_raw_transaction(self, barcode_uuid, when, suffix="raw"):
+        # Bypass the repository, as for rows written before rollups existed.
+        item = {"user_id": "1", "sk": f"TXN#{when}#{suffix}", "time_created": when}
+        if barcode_uuid:
+            item["barcode_uuid"] = barcode_uuid
+        get_table("transactions").put_item(Item=item)
+
+    def test_rebuilds_missing_rollups(self):
+        self._put_raw_transaction("bc-1", "2026-03-01T10:00:00+00:00", "a")
+        self._put_raw_transaction("bc-1", "2026-03-01T11:00:00+00:00", "b")
+        self._put_raw_transaction("bc-2", "2026-03-02T10:00:00+00:00", "c")
+        self._put_raw_transaction(None, "2026-03-02T12:00:00+00:00", "d")
+
+        output = self._run()
+
+        self.assertIn("4 differ", output)
+        self.assertEqual(
+            UsageCounterRepository.get_day_totals(),
+            {"2026-03-01": 2, "2026-03-02": 2},
+        )
+        self.assertEqual(
+            UsageCounterRepository.get_barcode_rollups(["2026-03-01", "2026-03-02"]),
+            {"2026-03-01": {"bc-1": 2}, "2026-03-02": {"bc-2": 1}},
+        )
+        self.assertIn("0 differ", self._run("--dry-run"))
+
+    def test_rollups_maintained_on_write_verify_clean(self):
+        TransactionRepository.create(user_id=1, barcode_uuid="bc-1")
+        TransactionRepository.bulk_create(
+            [{"user_id": 1, "barcode_uuid": "bc-2"}, {"user_id": 1}]
+        )
+
+        self.assertIn("0 differ", self._run("--dry-run"))
+
+    def test_repairs_drifted_and_stale_rollups(self):
+        self._put_raw_transaction("bc-1", "2026-03-01T10:00:00+00:00")
+        UsageCounterRepository.increment_rollups(
+            {("2026-03-01", "bc-1"): 5, ("2026-02-01", "gone"): 1}
+        )
+
+        self.assertIn("4 differ", self._run("--dry-run"))
+        self._run()
+
+        self.assertEqual(UsageCounterRepository.get_day_totals(), {"2026-03-01": 1})
+        self.assertEqual(
+            UsageCounterRepository.get_barcode_rollups(["2026-02-01"]),
+            {"2026-02-01": {}},
+        )
+
+    def test_day_totals_are_summed_across_shards(self):
+        self._put_raw_transaction("bc-1", "2026-03-01T10:00:00+00:00")
+        for shard in (1, 2, 3):
+            with patch(
+                "index.repositories.usage_counter_repo.random.randrange",
+                return_value=shard,
+            ):
+                UsageCounterRepository.increment_rollups({("2026-03-01", None): 2})
+
+        self.assertEqual(UsageCounterRepository.get_day_totals(), {"2026-03-01": 6})
+        self._run()
+
+        self.assertEqual(UsageCounterRepository.get_day_totals(), {"2026-03-01": 1})
+        table = get_table("usage_counters")
+        self.assertIn("Item", table.get_item(Key=_day_rollup_key("2026-03-01", 0)))
+        self.assertNotIn("Item", table.get_item(Key=_day_rollup_key("2026-03-01", 2)))
+
+    def test_since_limits_rebuilt_days(self):
+        self._put_raw_transaction("bc-1", "2026-03-01T10:00:00+00:00", "a")
+        self._put_raw_transaction("bc-1", "2026-03-05T10:00:00+00:00", "b")
+
+        self._run("--since", "2026-03-03")
+
+        self.assertEqual(UsageCounterRepository.get_day_totals(), {"2026-03-05": 1})
+
+    def test_rejects_bad_since(self):
+        with self.assertRaises(CommandError):
+            self._run("--since", "March")
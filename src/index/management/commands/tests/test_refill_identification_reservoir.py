@@ -0,0 +1,32 @@
+"""Tests for the refill_identification_reservoir management command."""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from index.repositories import IdentificationReservoir
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class RefillIdentificationReservoirCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("refill_identification_reservoir", *args, stdout=out)
+        return out.getvalue()
+
+    @override_settings(IDENTIFICATION_RESERVOIR_TARGET=12)
+    def test_refills_to_configured_target(self):
+        output = self._run()
+
+        self.assertIn("Reserved 12 Identification values", output)
+        self.assertEqual(IdentificationReservoir.size(), 12)
+        self.assertIn("Reserved 0", self._run())
+
+    def test_target_option_overrides_setting(self):
+        self.assertIn("holds 3", self._run("--target", "3"))
+
+    def test_rejects_negative_target(self):
+        with self.assertRaises(CommandError):
+            self._run("--target", "-1")
@@ -0,0 +1,88 @@
+"""Tests for the shard_barcode_locks management command."""
+
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.dynamodb.client import get_table
+from index.repositories import BarcodeRepository, DuplicateBarcodeError
+from index.repositories.barcode_repo import (
+    _legacy_unique_lock_key,
+    _unique_lock_key,
+)
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+class ShardBarcodeLocksCommandTest(DynamoDBCleanupMixin, TestCase):
+    def _run(self, *args):
+        out = StringIO()
+        call_command("shard_barcode_locks", *args, stdout=out)
+        return out.getvalue()
+
+    def _put_legacy_lock(self, value):
+        get_table("barcodes").put_item(
+            Item={**_legacy_unique_lock_key(value), "created_at": "2024-01-01"}
+        )
+
+    def _exists(self, key):
+        return "Item" in get_table("barcodes").get_item(Key=key)
+
+    def test_moves_legacy_locks_to_shards(self):
+        for i in range(3):
+            self._put_legacy_lock(f"old-{i}")
+
+        output = self._run()
+
+        self.assertIn("Moved 3 legacy locks", output)
+        for i in range(3):
+            self.assertFalse(self._exists(_legacy_unique_lock_key(f"old-{i}")))
+            self.assertTrue(self._exists(_unique_lock_key(f"old-{i}")))
+        with override_settings(BARCODE_UNIQUE_LOCK_LEGACY_READS=False):
+            with self.assertRaises(DuplicateBarcodeError):
+                BarcodeRepository.create(user_id=1, barcode_value="old-0")
+
+    def test_dry_run_changes_nothing(self):
+        self._put_legacy_lock("old-1")
+
+        output = self._run("--dry-run")
+
+        self.assertIn("1 legacy locks would be moved", output)
+        self.assertTrue(self._exists(_legacy_unique_lock_key("old-1")))
+        self.assertFalse(self._exists(_unique_lock_key("old-1")))
+
+    def test_lock_released_after_the_query_is_not_resurrected(self):
+        self._put_legacy_lock("old-1")
+        self._put_legacy_lock("old-2")
+        table = get_table("barcodes")
+        query = table.query
+
+        def query_then_release(**kwargs):
+            resp = query(**kwargs)
+            table.delete_item(Key=_legacy_unique_lock_key("old-1"))
+            return resp
+
+        table.query = query_then_release
+        with patch(
+            "index.management.commands.shard_barcode_locks.get_table",
+            return_value=table,
+        ):
+            output = self._run()
+
+        self.assertIn("Moved 1 legacy locks", output)
+        self.assertFalse(self._exists(_unique_lock_key("old-1")))
+        self.assertTrue(self._exists(_unique_lock_key("old-2")))
+        self.assertFalse(self._exists(_legacy_unique_lock_key("old-2")))
+
+    def test_existing_shard_lock_is_kept(self):
+        self._put_legacy_lock("old-1")
+        get_table("barcodes").put_item(
+            Item={**_unique_lock_key("old-1"), "owner_barcode_uuid": "current"}
+        )
+
+        self._run()
+
+        self.assertFalse(self._exists(_legacy_unique_lock_key("old-1")))
+        lock = get_table("barcodes").get_item(Key=_unique_lock_key("old-1"))["Item"]
+        self.assertEqual(lock["owner_barcode_uuid"], "current")
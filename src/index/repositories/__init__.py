@@ -1,10 +1,14 @@
 from .barcode_repo import BarcodeRepository, DuplicateBarcodeError
+from .identification_reservoir import IdentificationReservoir
 from .transaction_repo import TransactionRepository
 from .settings_repo import SettingsRepository
+from .usage_counter_repo import UsageCounterRepository
 
 __all__ = [
     "BarcodeRepository",
     "DuplicateBarcodeError",
+    "IdentificationReservoir",
     "TransactionRepository",
     "SettingsRepository",
+    "UsageCounterRepository",
 ]
@@ -7,19 +7,82 @@ denormalized profile and usage data.
 
 from __future__ import annotations
 
+import hashlib
+import heapq
+import logging
+import random
 import uuid
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional
+from itertools import islice
+from typing import Iterator, Optional
 
 from boto3.dynamodb.conditions import Attr, Key
+from django.conf import settings
 from django.utils import timezone
 
-from core.dynamodb.client import get_table, query_all
+from core.dynamodb.client import (
+    cancellation_reasons,
+    get_client,
+    get_table,
+    iter_query,
+    query_all,
+    transact_write_items,
+)
+from core.dynamodb.concurrency import map_concurrent
+from index.repositories.pull_pool import PullPoolCache
+from index.repositories.transaction_repo import TransactionRepository
+from index.repositories.usage_counter_repo import (
+    UsageCounterRepository,
+    last_use_action,
+    usage_shard_action,
+)
+from index.repositories.write_rate import WriteRateTracker
+
+logger = logging.getLogger(__name__)
 
 SHARED_DYNAMIC_QUERY_PAGE_SIZE = 50
 DASHBOARD_SHARED_BARCODE_LIMIT = 100
 PULL_CANDIDATE_LIMIT = 25
 UNIQUE_BARCODE_USER_ID = "__barcode_unique__"
+# Lock items are spread over this many partition keys
+# (``__barcode_unique__#<n>``) chosen by a hash of the barcode value. Changing
+# it moves every lock; rewrite them with shard_barcode_locks afterwards.
+UNIQUE_LOCK_SHARDS = 32
+
+# Upper bound on shared barcodes held by each worker's pull pool cache, and
+# the attributes it keeps (enough to filter; picks are re-read by key).
+PULL_POOL_MAX_ITEMS = 2000
+PULL_POOL_PROJECTION = (
+    "user_id, barcode_uuid, barcode_type, share_with_others, "
+    "profile_gender, last_used, time_created"
+)
+# Cached picks re-read before use; after this many stale ones, query directly.
+PULL_POOL_VERIFY_ATTEMPTS = 3
+# Re-reads when a barcode's value changes between reading and deleting it.
+DELETE_VALUE_RACE_ATTEMPTS = 3
+
+# Shared DynamicBarcodes carry pool_shard = DynamicBarcode#<gender>#<n>, the
+# partition key of the sparse SharedPoolShardIndex. Genders outside the pull
+# choices share the "Other" bucket. Changing POOL_SHARDS moves every item;
+# run backfill_pool_shards afterwards.
+POOL_SHARDS = 4
+POOL_GENDER_BUCKETS = ("Male", "Female", "Unknow")
+POOL_OTHER_GENDER_BUCKET = "Other"
+
+# Profile avatars are stored once per distinct image in content-addressed
+# items (``__barcode_avatar__#<n>`` / sha256 of the base64 data); barcode
+# items only carry the digest as profile_avatar_ref.
+AVATAR_USER_ID = "__barcode_avatar__"
+AVATAR_SHARDS = 32
+
+# Each user's current Identification barcode is recorded in a pointer item
+# (``__identification__#<user_id>`` / ``current``) that rotate_identification()
+# moves in the same transaction as the barcodes, so rotating never queries.
+IDENTIFICATION_POINTER_USER_ID = "__identification__"
+IDENTIFICATION_POINTER_SK = "current"
+# Re-reads when the current Identification barcode changes while rotating.
+IDENTIFICATION_ROTATE_ATTEMPTS = 3
 
 
 class DuplicateBarcodeError(ValueError):
@@ -34,25 +97,111 @@ def _table():
     return get_table("barcodes")
 
 
+def _stable_hash(value: str) -> int:
+    """Process-independent hash (unlike hash()) for choosing shards."""
+    digest = hashlib.sha256(str(value).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _unique_lock_shard(barcode_value: str) -> int:
+    return _stable_hash(barcode_value) % UNIQUE_LOCK_SHARDS
+
+
 def _unique_lock_key(barcode_value: str) -> dict:
+    return {
+        "user_id": f"{UNIQUE_BARCODE_USER_ID}#{_unique_lock_shard(barcode_value)}",
+        "barcode_uuid": str(barcode_value),
+    }
+
+
+def _legacy_unique_lock_key(barcode_value: str) -> dict:
+    """Pre-sharding lock key: every lock on one partition."""
     return {"user_id": UNIQUE_BARCODE_USER_ID, "barcode_uuid": str(barcode_value)}
 
 
-def _acquire_unique_barcode_lock(barcode_value: str) -> None:
-    try:
-        _table().put_item(
-            Item={
-                **_unique_lock_key(barcode_value),
-                "created_at": _now_iso(),
-            },
-            ConditionExpression=Attr("user_id").not_exists(),
+def _legacy_locks_enabled() -> bool:
+    return bool(getattr(settings, "BARCODE_UNIQUE_LOCK_LEGACY_READS", True))
+
+
+def _lock_claim_actions(barcode_value: str, user_id, barcode_uuid: str) -> list[dict]:
+    """
+    Transaction actions claiming the uniqueness lock for *barcode_value*.
+
+    During the migration window a legacy lock for the same value also counts
+    as taken. Every returned action fails with ConditionalCheckFailed only
+    when the value is already locked.
+    """
+    actions = [
+        {
+            "Put": {
+                "table": "barcodes",
+                "Item": {
+                    **_unique_lock_key(barcode_value),
+                    "owner_user_id": str(user_id),
+                    "owner_barcode_uuid": str(barcode_uuid),
+                    "created_at": _now_iso(),
+                },
+                "ConditionExpression": "attribute_not_exists(user_id)",
+            }
+        }
+    ]
+    if _legacy_locks_enabled():
+        actions.append(
+            {
+                "ConditionCheck": {
+                    "table": "barcodes",
+                    "Key": _legacy_unique_lock_key(barcode_value),
+                    "ConditionExpression": "attribute_not_exists(user_id)",
+                }
+            }
+        )
+    return actions
+
+
+def _lock_release_actions(barcode_value: str) -> list[dict]:
+    actions = [
+        {"Delete": {"table": "barcodes", "Key": _unique_lock_key(barcode_value)}}
+    ]
+    if _legacy_locks_enabled():
+        actions.append(
+            {
+                "Delete": {
+                    "table": "barcodes",
+                    "Key": _legacy_unique_lock_key(barcode_value),
+                }
+            }
         )
-    except _table().meta.client.exceptions.ConditionalCheckFailedException as exc:
-        raise DuplicateBarcodeError("This barcode already exists") from exc
+    return actions
+
+
+def _lock_conflict(exc, lock_actions: int) -> bool:
+    """True if the transaction failed on one of its first *lock_actions*."""
+    return "ConditionalCheckFailed" in cancellation_reasons(exc)[:lock_actions]
+
+
+def _transaction_cancelled() -> type:
+    return get_client().exceptions.TransactionCanceledException
+
 
+def _avatar_ref(avatar: str) -> str:
+    return hashlib.sha256(avatar.encode("utf-8")).hexdigest()
 
-def _release_unique_barcode_lock(barcode_value: str) -> None:
-    _table().delete_item(Key=_unique_lock_key(barcode_value))
+
+def _avatar_key(ref: str) -> dict:
+    return {
+        "user_id": f"{AVATAR_USER_ID}#{_stable_hash(ref) % AVATAR_SHARDS}",
+        "barcode_uuid": ref,
+    }
+
+
+def _store_avatar(avatar: str) -> str:
+    """Write *avatar* to its content-addressed item and return the reference."""
+    ref = _avatar_ref(avatar)
+    # Same content, same item: rewriting is idempotent.
+    _table().put_item(
+        Item={**_avatar_key(ref), "image": avatar, "created_at": _now_iso()}
+    )
+    return ref
 
 
 def _shared_dynamic_item_matches(
@@ -79,6 +228,82 @@ def _shared_dynamic_item_matches(
     return True
 
 
+def _pool_gender_bucket(gender: Optional[str]) -> str:
+    return gender if gender in POOL_GENDER_BUCKETS else POOL_OTHER_GENDER_BUCKET
+
+
+def _pool_shard_for(item: dict) -> Optional[str]:
+    """Return the pool_shard an item belongs in, or None if not in the pool."""
+    if item.get("barcode_type") != "DynamicBarcode" or not item.get(
+        "share_with_others", False
+    ):
+        return None
+    bucket = _pool_gender_bucket(item.get("profile_gender"))
+    shard = _stable_hash(item.get("barcode_uuid", "")) % POOL_SHARDS
+    return f"DynamicBarcode#{bucket}#{shard}"
+
+
+def _pool_shard_keys(gender_setting: str = None) -> list[str]:
+    """Every pool_shard value a query for *gender_setting* must read."""
+    if gender_setting is None:
+        buckets = POOL_GENDER_BUCKETS + (POOL_OTHER_GENDER_BUCKET,)
+    else:
+        buckets = (_pool_gender_bucket(gender_setting),)
+    return [
+        f"DynamicBarcode#{bucket}#{n}" for bucket in buckets for n in range(POOL_SHARDS)
+    ]
+
+
+def _sync_pool_shard(item: dict) -> dict:
+    """
+    Bring ``pool_shard`` in line with an item's sharing/type/gender.
+
+    Costs a second UpdateItem only when an update moved the barcode into,
+    out of, or across pool shards. A barcode deleted since *item* was read
+    is left deleted and *item* returned unchanged.
+    """
+    if not item or item.get("user_id") is None:
+        return item
+    desired = _pool_shard_for(item)
+    if item.get("pool_shard") == desired:
+        return item
+
+    table = _table()
+    params = {
+        "Key": {"user_id": item["user_id"], "barcode_uuid": item["barcode_uuid"]},
+        "ConditionExpression": "attribute_exists(barcode_uuid)",
+    }
+    if desired is None:
+        params["UpdateExpression"] = "REMOVE pool_shard"
+    else:
+        params["UpdateExpression"] = "SET pool_shard = :shard"
+        params["ExpressionAttributeValues"] = {":shard": desired}
+    try:
+        table.update_item(**params)
+    except table.meta.client.exceptions.ConditionalCheckFailedException:
+        return item
+    if desired is None:
+        return {k: v for k, v in item.items() if k != "pool_shard"}
+    return {**item, "pool_shard": desired}
+
+
+def _sharded_pool_reads_enabled() -> bool:
+    return bool(getattr(settings, "SHARED_POOL_SHARDED_READS", False))
+
+
+def _user_time_index_reads_enabled() -> bool:
+    return bool(getattr(settings, "USER_BARCODE_TIME_INDEX_READS", False))
+
+
+def _dashboard_order(item: dict) -> tuple:
+    """Dashboard rows sort newest first; owner and uuid break ties."""
+    return (
+        item.get("time_created", ""),
+        item.get("user_id", ""),
+        item.get("barcode_uuid", ""),
+    )
+
+
 def _query_shared_dynamic_barcodes(
     *,
     exclude_user_id: int = None,
@@ -86,9 +311,10 @@ def _query_shared_dynamic_barcodes(
     cooldown_cutoff: str = None,
     limit: int = None,
     page_size: int = None,
+    projection: str = None,
 ) -> list[dict]:
     """
-    Query shared DynamicBarcodes and stop paginating after enough usable items.
+    Query shared DynamicBarcodes newest-first and stop after enough usable items.
 
     DynamoDB applies FilterExpression after reading matching index rows, so this
     helper also rechecks the filters in Python before counting an item toward the
@@ -96,7 +322,32 @@ def _query_shared_dynamic_barcodes(
     """
     if limit is not None and limit <= 0:
         return []
+    items = _iter_shared_dynamic_barcodes(
+        exclude_user_id=exclude_user_id,
+        gender_setting=gender_setting,
+        cooldown_cutoff=cooldown_cutoff,
+        page_size=page_size,
+        projection=projection,
+    )
+    return list(islice(items, limit))
 
+
+def _iter_shared_dynamic_barcodes(
+    *,
+    exclude_user_id: int = None,
+    gender_setting: str = None,
+    cooldown_cutoff: str = None,
+    page_size: int = None,
+    projection: str = None,
+    before: str = None,
+) -> Iterator[dict]:
+    """
+    Stream shared DynamicBarcodes created at or before *before*, newest first.
+
+    Reads the pool shards of SharedPoolShardIndex in parallel (first page of
+    each), then merges the per-shard streams by time_created, fetching later
+    pages only as the merge needs them. Items failing the filters are skipped.
+    """
     filter_expr = Attr("share_with_others").eq(True)
     if exclude_user_id is not None:
         filter_expr = filter_expr & Attr("user_id").ne(str(exclude_user_id))
@@ -107,36 +358,165 @@ def _query_shared_dynamic_barcodes(
             Attr("last_used").not_exists() | Attr("last_used").lt(cooldown_cutoff)
         )
 
-    query_kwargs = {
-        "IndexName": "SharedBarcodeTypeIndex",
-        "KeyConditionExpression": Key("barcode_type").eq("DynamicBarcode"),
-        "FilterExpression": filter_expr,
-        "ScanIndexForward": False,
-    }
+    base_kwargs = {"FilterExpression": filter_expr, "ScanIndexForward": False}
     if page_size:
-        query_kwargs["Limit"] = page_size
+        base_kwargs["Limit"] = page_size
+    if projection:
+        base_kwargs["ProjectionExpression"] = projection
+
+    def key_condition(partition):
+        if before is None:
+            return partition
+        return partition & Key("time_created").lte(before)
+
+    if _sharded_pool_reads_enabled():
+        shard_kwargs = [
+            {
+                **base_kwargs,
+                "IndexName": "SharedPoolShardIndex",
+                "KeyConditionExpression": key_condition(Key("pool_shard").eq(shard)),
+            }
+            for shard in _pool_shard_keys(gender_setting)
+        ]
+    else:
+        shard_kwargs = [
+            {
+                **base_kwargs,
+                "IndexName": "SharedBarcodeTypeIndex",
+                "KeyConditionExpression": key_condition(
+                    Key("barcode_type").eq("DynamicBarcode")
+                ),
+            }
+        ]
 
     table = _table()
-    items = []
-    while True:
-        resp = table.query(**query_kwargs)
-        for item in resp.get("Items", []):
-            if not _shared_dynamic_item_matches(
-                item,
-                exclude_user_id=exclude_user_id,
-                gender_setting=gender_setting,
-                cooldown_cutoff=cooldown_cutoff,
-            ):
-                continue
+    first_pages = map_concurrent(lambda kw: table.query(**kw), shard_kwargs)
+    # Later pages are fetched only as the merge reaches them.
+    streams = [
+        iter_query(table, first_page=resp, prefetch=False, **kw)
+        for kw, resp in zip(shard_kwargs, first_pages)
+    ]
 
-            items.append(item)
-            if limit is not None and len(items) >= limit:
-                return items
+    for item in heapq.merge(
+        *streams, key=lambda i: i.get("time_created", ""), reverse=True
+    ):
+        if _shared_dynamic_item_matches(
+            item,
+            exclude_user_id=exclude_user_id,
+            gender_setting=gender_setting,
+            cooldown_cutoff=cooldown_cutoff,
+        ):
+            yield item
+
+
+def _load_pull_pool() -> list[dict]:
+    return _query_shared_dynamic_barcodes(
+        limit=PULL_POOL_MAX_ITEMS,
+        page_size=SHARED_DYNAMIC_QUERY_PAGE_SIZE * 4,
+        projection=PULL_POOL_PROJECTION,
+    )
+
+
+_pull_pool = PullPoolCache(loader=_load_pull_pool, matcher=_shared_dynamic_item_matches)
+_usage_write_rates = WriteRateTracker()
+
+
+def _usage_shards(barcode: dict) -> int:
+    return int(barcode.get("usage_shards") or 0)
+
+
+def _last_used_is_fresh(last_used: Optional[str], now: str) -> bool:
+    """True if a sharded barcode's stored last_used need not be rewritten yet."""
+    if not last_used:
+        return False
+    resolution = int(getattr(settings, "USAGE_SHARD_LAST_USED_RESOLUTION_SECONDS", 0))
+    cutoff = datetime.fromisoformat(now) - timedelta(seconds=resolution)
+    return last_used >= cutoff.isoformat()
+
+
+def _note_usage_write(user_id, barcode_uuid: str) -> None:
+    """Switch an unsharded barcode to sharded counters once it gets hot."""
+    threshold = float(getattr(settings, "USAGE_SHARD_WRITES_PER_SECOND", 0))
+    if threshold <= 0:
+        return
+    if _usage_write_rates.record(str(barcode_uuid)) >= threshold:
+        BarcodeRepository.enable_usage_shards(user_id, barcode_uuid)
 
-        last_key = resp.get("LastEvaluatedKey")
-        if not last_key:
-            return items
-        query_kwargs["ExclusiveStartKey"] = last_key
+
+def _identification_pointer_key(user_id) -> dict:
+    return {
+        "user_id": f"{IDENTIFICATION_POINTER_USER_ID}#{user_id}",
+        "barcode_uuid": IDENTIFICATION_POINTER_SK,
+    }
+
+
+def _current_identification(user_id) -> tuple[Optional[str], list[dict]]:
+    """
+    (uuid the pointer names or None, the user's current Identification
+    barcodes), read consistently.
+
+    Users without a pointer, whose Identification barcode predates it, fall
+    back to one query of their partition.
+    """
+    table = _table()
+    pointer = table.get_item(
+        Key=_identification_pointer_key(user_id), ConsistentRead=True
+    ).get("Item")
+    if pointer is None:
+        return None, query_all(
+            table,
+            KeyConditionExpression=Key("user_id").eq(str(user_id)),
+            FilterExpression=Attr("barcode_type").eq("Identification"),
+            ConsistentRead=True,
+        )
+    current_uuid = pointer["current_barcode_uuid"]
+    current = table.get_item(
+        Key={"user_id": str(user_id), "barcode_uuid": current_uuid},
+        ConsistentRead=True,
+    ).get("Item")
+    return current_uuid, [current] if current else []
+
+
+def _carried_identification_usage(old_barcodes: list[dict]) -> dict:
+    """Usage counters and limits a new Identification barcode inherits."""
+    if not old_barcodes:
+        return {}
+
+    carried = {
+        "total_usage": sum(int(b.get("total_usage", 0)) for b in old_barcodes),
+        "total_usage_limit": max(
+            int(b.get("total_usage_limit", 0)) for b in old_barcodes
+        ),
+        "daily_usage_limit": max(
+            int(b.get("daily_usage_limit", 0)) for b in old_barcodes
+        ),
+    }
+    last_used_values = [b["last_used"] for b in old_barcodes if b.get("last_used")]
+    if last_used_values:
+        carried["last_used"] = max(last_used_values)
+    return carried
+
+
+def _retire_identification_actions(old: dict) -> list[dict]:
+    """Delete *old* and its lock, failing if it was used since it was read."""
+    condition = "barcode = :bc"
+    values = {":bc": old["barcode"]}
+    if "total_usage" in old:
+        condition += " AND total_usage = :tu"
+        values[":tu"] = old["total_usage"]
+    else:
+        condition += " AND attribute_not_exists(total_usage)"
+    return [
+        {
+            "Delete": {
+                "table": "barcodes",
+                "Key": {"user_id": old["user_id"], "barcode_uuid": old["barcode_uuid"]},
+                "ConditionExpression": condition,
+                "ExpressionAttributeValues": values,
+            }
+        },
+        *_lock_release_actions(old["barcode"]),
+    ]
 
 
 class BarcodeRepository:
@@ -147,10 +527,13 @@ class BarcodeRepository:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def get_by_uuid(user_id: int, barcode_uuid: str) -> Optional[dict]:
+    def get_by_uuid(
+        user_id: int, barcode_uuid: str, consistent: bool = False
+    ) -> Optional[dict]:
         """Get a barcode item by user_id + barcode_uuid."""
         resp = _table().get_item(
-            Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)}
+            Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)},
+            ConsistentRead=consistent,
         )
         return resp.get("Item")
 
@@ -176,20 +559,70 @@ class BarcodeRepository:
         )
         return resp.get("Count", 0) > 0
 
+    @staticmethod
+    def has_avatar(barcode: dict) -> bool:
+        """Whether *barcode* has a profile avatar, without fetching it."""
+        return bool(barcode.get("profile_avatar_ref") or barcode.get("profile_avatar"))
+
+    @staticmethod
+    def get_avatar(barcode: dict) -> Optional[str]:
+        """
+        Return the base64 profile avatar for a barcode item, if any.
+
+        Items written before avatars moved out of line still carry
+        ``profile_avatar`` and are served directly.
+        """
+        if barcode.get("profile_avatar"):
+            return barcode["profile_avatar"]
+        ref = barcode.get("profile_avatar_ref")
+        if not ref:
+            return None
+        resp = _table().get_item(Key=_avatar_key(ref), ProjectionExpression="image")
+        return resp.get("Item", {}).get("image")
+
     # ------------------------------------------------------------------
     # Multi-item reads
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def iter_user_barcodes(
+        user_id: int, *, before: str = None, page_size: int = None
+    ) -> Iterator[dict]:
+        """
+        Stream a user's barcodes created at or before *before*, newest first.
+
+        Reads UserBarcodeTimeIndex a page at a time, so items carry
+        BARCODE_INDEX_ATTRIBUTES only. With USER_BARCODE_TIME_INDEX_READS off
+        (while the index backfills), reads and sorts the whole partition.
+        """
+        condition = Key("user_id").eq(str(user_id))
+        if not _user_time_index_reads_enabled():
+            items = query_all(_table(), KeyConditionExpression=condition)
+            items.sort(key=_dashboard_order, reverse=True)
+            return iter(
+                [
+                    item
+                    for item in items
+                    if before is None or item.get("time_created", "") <= before
+                ]
+            )
+
+        if before is not None:
+            condition = condition & Key("time_created").lte(before)
+        kwargs = {
+            "IndexName": "UserBarcodeTimeIndex",
+            "KeyConditionExpression": condition,
+            "ScanIndexForward": False,
+            "prefetch": False,
+        }
+        if page_size:
+            kwargs["Limit"] = page_size
+        return iter_query(_table(), **kwargs)
+
     @staticmethod
     def get_user_barcodes(user_id: int) -> list[dict]:
         """Get all barcodes owned by a user, ordered by time_created desc."""
-        items = query_all(
-            _table(),
-            KeyConditionExpression=Key("user_id").eq(str(user_id)),
-            ScanIndexForward=False,
-        )
-        items.sort(key=lambda x: x.get("time_created", ""), reverse=True)
-        return items
+        return list(BarcodeRepository.iter_user_barcodes(user_id))
 
     @staticmethod
     def get_user_barcodes_by_type(user_id: int, barcode_type: str) -> list[dict]:
@@ -225,33 +658,88 @@ class BarcodeRepository:
         Returns user's own barcodes + shared DynamicBarcodes from other users,
         sorted by time_created descending.
         """
+        items, _cursor = BarcodeRepository.get_dashboard_page(
+            user_id, shared_limit=shared_limit, shared_page_size=shared_page_size
+        )
+        return items
+
+    @staticmethod
+    def get_dashboard_page(
+        user_id: int,
+        *,
+        page_size: int = None,
+        cursor: dict = None,
+        shared_limit: int = DASHBOARD_SHARED_BARCODE_LIMIT,
+        shared_page_size: int = SHARED_DYNAMIC_QUERY_PAGE_SIZE,
+    ) -> tuple[list[dict], Optional[dict]]:
+        """
+        One page of the dashboard list, newest first: the user's own barcodes
+        and the newest *shared_limit* shared DynamicBarcodes of other users.
+
+        Both come back sorted by time_created, so they are merged lazily and
+        read only as far as the page needs. Returns (items, next_cursor);
+        pass next_cursor back for the following page. It is None after the
+        last page, and a *page_size* of None returns every item at once.
+        """
         user_id_str = str(user_id)
+        after = None
+        shared_seen = 0
+        if cursor:
+            after = (
+                cursor["time_created"],
+                cursor["user_id"],
+                cursor["barcode_uuid"],
+            )
+            shared_seen = int(cursor["shared_seen"])
+        before = after[0] if after else None
 
-        # Query 1: All user's own barcodes
-        own = query_all(
-            _table(),
-            KeyConditionExpression=Key("user_id").eq(user_id_str),
-        )
+        def unseen(stream):
+            # Items sharing the cursor's time_created may precede it.
+            if after is None:
+                return stream
+            return (item for item in stream if _dashboard_order(item) < after)
 
-        # Query 2: Newest shared DynamicBarcodes from other users.
-        shared = BarcodeRepository.get_shared_dynamic_barcodes(
-            exclude_user_id=user_id,
-            limit=shared_limit,
-            page_size=shared_page_size,
+        own = unseen(
+            BarcodeRepository.iter_user_barcodes(
+                user_id, before=before, page_size=page_size + 1 if page_size else None
+            )
         )
+        shared = islice(
+            unseen(
+                _iter_shared_dynamic_barcodes(
+                    exclude_user_id=user_id,
+                    page_size=shared_page_size,
+                    before=before,
+                )
+            ),
+            max(0, shared_limit - shared_seen),
+        )
+        merged = heapq.merge(own, shared, key=_dashboard_order, reverse=True)
 
-        # Merge and deduplicate defensively.
+        # Deduplicate defensively.
         seen = set()
-        merged = []
-        for item in own + shared:
+        items = []
+        for item in merged:
             key = (item["user_id"], item["barcode_uuid"])
-            if key not in seen:
-                seen.add(key)
-                merged.append(item)
+            if key in seen:
+                continue
+            seen.add(key)
+            items.append(item)
+            if page_size and len(items) >= page_size:
+                break
+        else:
+            return items, None
 
-        # Sort by time_created descending
-        merged.sort(key=lambda x: x.get("time_created", ""), reverse=True)
-        return merged
+        if next(merged, None) is None:
+            return items, None
+        last = items[-1]
+        return items, {
+            "time_created": last.get("time_created", ""),
+            "user_id": last["user_id"],
+            "barcode_uuid": last["barcode_uuid"],
+            "shared_seen": shared_seen
+            + sum(1 for item in items if item["user_id"] != user_id_str),
+        }
 
     @staticmethod
     def get_pull_candidates(
@@ -275,6 +763,63 @@ class BarcodeRepository:
             page_size=page_size,
         )
 
+    @staticmethod
+    def pick_pull_candidate(
+        gender_setting: str,
+        exclude_user_id: int,
+        cooldown_cutoff: str,
+    ) -> Optional[dict]:
+        """
+        Pick a random pull candidate, served from the per-worker pool cache.
+
+        Cached candidates are re-read by primary key before being returned,
+        so the result reflects current usage counters and cooldown even when
+        another worker used it since the last pool refresh. Falls back to a
+        direct GSI query when the cache is disabled, could not be loaded, has
+        no match (it holds only the newest PULL_POOL_MAX_ITEMS barcodes of
+        all genders) or every sampled cached candidate turned out to be stale.
+        """
+        filters = {
+            "exclude_user_id": exclude_user_id,
+            "gender_setting": gender_setting,
+            "cooldown_cutoff": cooldown_cutoff,
+        }
+
+        if PullPoolCache.enabled():
+            try:
+                cached = _pull_pool.candidates(limit=PULL_CANDIDATE_LIMIT, **filters)
+            except Exception:
+                logger.exception("Pull pool cache load failed; querying the index")
+                cached = []
+
+            random.shuffle(cached)
+            for candidate in cached[:PULL_POOL_VERIFY_ATTEMPTS]:
+                fresh = BarcodeRepository.get_by_uuid(
+                    candidate["user_id"], candidate["barcode_uuid"]
+                )
+                if fresh is None:
+                    _pull_pool.remove(candidate["user_id"], candidate["barcode_uuid"])
+                    continue
+                _pull_pool.upsert(fresh)
+                if _shared_dynamic_item_matches(fresh, **filters):
+                    return fresh
+
+        candidates = BarcodeRepository.get_pull_candidates(
+            limit=PULL_CANDIDATE_LIMIT,
+            page_size=SHARED_DYNAMIC_QUERY_PAGE_SIZE,
+            **filters,
+        )
+        return random.choice(candidates) if candidates else None
+
+    @staticmethod
+    def reset_pull_pool() -> None:
+        """
+        Drop this worker's pull pool cache and usage write rates (e.g. after
+        bulk data changes).
+        """
+        _pull_pool.clear()
+        _usage_write_rates.reset()
+
     # ------------------------------------------------------------------
     # Write operations
     # ------------------------------------------------------------------
@@ -299,7 +844,8 @@ class BarcodeRepository:
         A conditional lock item enforces barcode value uniqueness because DynamoDB
         GSIs do not provide unique constraints. A ConditionExpression on the
         primary key prevents duplicate items for the same (user_id, barcode_uuid)
-        pair.
+        pair. Lock and item are written in one transaction, so neither can exist
+        without the other.
         """
         bc_uuid = barcode_uuid or str(uuid.uuid4())
         now = time_created or _now_iso()
@@ -323,24 +869,46 @@ class BarcodeRepository:
         if profile_info_id:
             item["profile_info_id"] = profile_info_id
         if profile_avatar:
-            item["profile_avatar"] = profile_avatar
+            item["profile_avatar_ref"] = _store_avatar(profile_avatar)
         if profile_gender:
             item["profile_gender"] = profile_gender
+        pool_shard = _pool_shard_for(item)
+        if pool_shard:
+            item["pool_shard"] = pool_shard
 
-        _acquire_unique_barcode_lock(barcode_value)
+        lock_actions = _lock_claim_actions(barcode_value, user_id, bc_uuid)
         try:
-            _table().put_item(
-                Item=item,
-                ConditionExpression=Attr("user_id").not_exists(),
+            transact_write_items(
+                lock_actions
+                + [
+                    {
+                        "Put": {
+                            "table": "barcodes",
+                            "Item": item,
+                            "ConditionExpression": "attribute_not_exists(user_id)",
+                        }
+                    },
+                ]
             )
-        except Exception:
-            _release_unique_barcode_lock(barcode_value)
+        except _transaction_cancelled() as exc:
+            if _lock_conflict(exc, len(lock_actions)):
+                raise DuplicateBarcodeError("This barcode already exists") from exc
             raise
+        _pull_pool.upsert(item)
         return item
 
     @staticmethod
     def update(user_id: int, barcode_uuid: str, **updates) -> dict:
-        """Partial update via UpdateExpression."""
+        """
+        Partial update via UpdateExpression.
+
+        Changing ``barcode`` moves the uniqueness lock in the same transaction
+        and raises DuplicateBarcodeError if the new value is taken.
+        """
+        if "profile_avatar" in updates:
+            avatar = updates.pop("profile_avatar")
+            updates["profile_avatar_ref"] = _store_avatar(avatar) if avatar else None
+
         expr_parts = []
         expr_names = {}
         expr_values = {}
@@ -355,38 +923,398 @@ class BarcodeRepository:
         if not expr_parts:
             return {}
 
+        key = {"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)}
+        if "barcode" in updates:
+            existing = BarcodeRepository.get_by_uuid(user_id, barcode_uuid)
+            old_value = existing.get("barcode") if existing else None
+            if old_value != updates["barcode"]:
+                return BarcodeRepository._update_with_value_change(
+                    key,
+                    old_value,
+                    updates["barcode"],
+                    "SET " + ", ".join(expr_parts),
+                    expr_names,
+                    expr_values,
+                )
+
         resp = _table().update_item(
-            Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)},
+            Key=key,
             UpdateExpression="SET " + ", ".join(expr_parts),
             ExpressionAttributeNames=expr_names,
             ExpressionAttributeValues=expr_values,
             ReturnValues="ALL_NEW",
         )
-        return resp.get("Attributes", {})
+        attributes = _sync_pool_shard(resp.get("Attributes", {}))
+        _pull_pool.upsert(attributes)
+        return attributes
 
     @staticmethod
-    def delete(user_id: int, barcode_uuid: str) -> bool:
-        """Delete a barcode item."""
-        existing = BarcodeRepository.get_by_uuid(user_id, barcode_uuid)
-        _table().delete_item(
-            Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)}
+    def _update_with_value_change(
+        key: dict,
+        old_value: Optional[str],
+        new_value: str,
+        update_expression: str,
+        expr_names: dict,
+        expr_values: dict,
+    ) -> dict:
+        """Apply an update that changes ``barcode`` together with its locks."""
+        if old_value is None:
+            condition = "attribute_not_exists(#old_bc)"
+        else:
+            condition = "#old_bc = :old_bc"
+            expr_values = {**expr_values, ":old_bc": old_value}
+
+        lock_actions = _lock_claim_actions(
+            new_value, key["user_id"], key["barcode_uuid"]
         )
-        if existing and existing.get("barcode"):
-            _release_unique_barcode_lock(existing["barcode"])
+        actions = lock_actions + [
+            {
+                "Update": {
+                    "table": "barcodes",
+                    "Key": key,
+                    "UpdateExpression": update_expression,
+                    "ConditionExpression": condition,
+                    "ExpressionAttributeNames": {**expr_names, "#old_bc": "barcode"},
+                    "ExpressionAttributeValues": expr_values,
+                }
+            },
+        ]
+        if old_value is not None:
+            actions.extend(_lock_release_actions(old_value))
+
+        try:
+            transact_write_items(actions)
+        except _transaction_cancelled() as exc:
+            if _lock_conflict(exc, len(lock_actions)):
+                raise DuplicateBarcodeError("This barcode already exists") from exc
+            raise
+
+        resp = _table().get_item(Key=key, ConsistentRead=True)
+        attributes = _sync_pool_shard(resp.get("Item", {}))
+        _pull_pool.upsert(attributes)
+        return attributes
+
+    @staticmethod
+    def delete(user_id: int, barcode_uuid: str) -> bool:
+        """
+        Delete a barcode item and release its uniqueness lock atomically,
+        then delete its usage shards, if it had any.
+        """
+        key = {"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)}
+        existing = None
+        for _attempt in range(DELETE_VALUE_RACE_ATTEMPTS):
+            existing = BarcodeRepository.get_by_uuid(user_id, barcode_uuid)
+            if not existing or not existing.get("barcode"):
+                _table().delete_item(Key=key)
+                break
+            try:
+                transact_write_items(
+                    [
+                        {
+                            "Delete": {
+                                "table": "barcodes",
+                                "Key": key,
+                                # The lock released must be the one for the
+                                # value actually deleted.
+                                "ConditionExpression": "barcode = :bc",
+                                "ExpressionAttributeValues": {
+                                    ":bc": existing["barcode"]
+                                },
+                            }
+                        },
+                        *_lock_release_actions(existing["barcode"]),
+                    ]
+                )
+                break
+            except _transaction_cancelled() as exc:
+                if cancellation_reasons(exc)[:1] != ["ConditionalCheckFailed"]:
+                    raise
+        else:
+            raise RuntimeError(
+                f"Barcode {barcode_uuid} kept changing while being deleted"
+            )
+        if existing and _usage_shards(existing):
+            UsageCounterRepository.delete_usage_shards(
+                barcode_uuid, _usage_shards(existing)
+            )
+        _pull_pool.remove(user_id, barcode_uuid)
         return True
 
     @staticmethod
-    def increment_usage(user_id: int, barcode_uuid: str) -> None:
+    def rotate_identification(
+        user_id: int,
+        barcode_value: str,
+        owner_username: str = None,
+        current: dict = None,
+        reserved: bool = False,
+    ) -> dict:
+        """
+        Replace the user's Identification barcode with a new one holding
+        *barcode_value*, in one TransactWriteItems.
+
+        The new item inherits the usage counters and limits of the barcode it
+        replaces, the old item and its uniqueness lock are deleted, and the
+        user's current-Identification pointer moves to the new item. Callers
+        that already hold the current barcode pass it as *current* and the
+        rotation costs no reads. If the current barcode was used or rotated
+        since it was read, it is re-read and the rotation retried.
+
+        A *reserved* value, taken from the IdentificationReservoir, is
+        claimed from the reservoir instead of being locked afresh.
+
+        Raises DuplicateBarcodeError if *barcode_value* is already taken.
+        """
+        from index.repositories.identification_reservoir import (
+            IdentificationReservoir,
+        )
+
+        pointer_key = _identification_pointer_key(user_id)
+        for attempt in range(IDENTIFICATION_ROTATE_ATTEMPTS):
+            if current is not None and attempt == 0:
+                expected_uuid, old_barcodes = current["barcode_uuid"], [current]
+            else:
+                expected_uuid, old_barcodes = _current_identification(user_id)
+
+            now = _now_iso()
+            bc_uuid = str(uuid.uuid4())
+            item = {
+                "user_id": str(user_id),
+                "barcode_uuid": bc_uuid,
+                "barcode": barcode_value,
+                "barcode_type": "Identification",
+                "share_with_others": False,
+                "time_created": now,
+                "total_usage": 0,
+                "total_usage_limit": 0,
+                "daily_usage_limit": 0,
+                **_carried_identification_usage(old_barcodes),
+            }
+            if owner_username:
+                item["owner_username"] = owner_username
+
+            if expected_uuid is None:
+                pointer_condition = {
+                    "ConditionExpression": "attribute_not_exists(user_id)"
+                }
+            else:
+                pointer_condition = {
+                    "ConditionExpression": "current_barcode_uuid = :current",
+                    "ExpressionAttributeValues": {":current": expected_uuid},
+                }
+
+            if reserved:
+                lock_actions = IdentificationReservoir.claim_actions(
+                    barcode_value, user_id, bc_uuid
+                )
+            else:
+                lock_actions = _lock_claim_actions(barcode_value, user_id, bc_uuid)
+            actions = lock_actions + [
+                {
+                    "Put": {
+                        "table": "barcodes",
+                        "Item": item,
+                        "ConditionExpression": "attribute_not_exists(user_id)",
+                    }
+                },
+                {
+                    "Put": {
+                        "table": "barcodes",
+                        "Item": {
+                            **pointer_key,
+                            "current_barcode_uuid": bc_uuid,
+                            "updated_at": now,
+                        },
+                        **pointer_condition,
+                    }
+                },
+            ]
+            for old in old_barcodes:
+                actions.extend(_retire_identification_actions(old))
+
+            try:
+                transact_write_items(actions)
+            except _transaction_cancelled() as exc:
+                if _lock_conflict(exc, len(lock_actions)):
+                    raise DuplicateBarcodeError("This barcode already exists") from exc
+                if "ConditionalCheckFailed" not in cancellation_reasons(exc):
+                    raise
+                continue
+
+            for old in old_barcodes:
+                _pull_pool.remove(old["user_id"], old["barcode_uuid"])
+            return item
+
+        raise RuntimeError(
+            f"Identification barcode of user {user_id} kept changing while "
+            "being rotated"
+        )
+
+    @staticmethod
+    def increment_usage(
+        user_id: int,
+        barcode_uuid: str,
+        usage_shards: int = 0,
+        last_used: str = None,
+    ) -> None:
         """
         Atomic counter: total_usage += 1, last_used = now.
 
-        Replaces F('total_usage') + 1 from Django ORM.
+        Replaces F('total_usage') + 1 from Django ORM. For a sharded barcode
+        pass its usage_shards (and stored last_used): the use goes to a usage
+        shard and the barcode item is only rewritten when last_used is stale.
         """
-        _table().update_item(
-            Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)},
-            UpdateExpression="SET total_usage = total_usage + :inc, last_used = :now",
-            ExpressionAttributeValues={
-                ":inc": Decimal("1"),
-                ":now": _now_iso(),
-            },
+        now = _now_iso()
+        key = {"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)}
+        if usage_shards:
+            UsageCounterRepository.increment_usage_shard(barcode_uuid, usage_shards)
+            if _last_used_is_fresh(last_used, now):
+                return
+            _table().update_item(
+                Key=key,
+                UpdateExpression="SET last_used = :now",
+                ExpressionAttributeValues={":now": now},
+            )
+        else:
+            _table().update_item(
+                Key=key,
+                UpdateExpression=(
+                    "SET total_usage = total_usage + :inc, last_used = :now"
+                ),
+                ExpressionAttributeValues={
+                    ":inc": Decimal("1"),
+                    ":now": now,
+                },
+            )
+            _note_usage_write(user_id, barcode_uuid)
+        _pull_pool.touch(user_id, barcode_uuid, now)
+
+    @staticmethod
+    def enable_usage_shards(
+        user_id: int, barcode_uuid: str, shards: int = None
+    ) -> bool:
+        """
+        Switch a barcode to sharded usage counters (USAGE_COUNTER_SHARDS).
+
+        Its total_usage stays as the base count; later uses are added to the
+        shards. Returns False if the barcode is missing or already sharded.
+        """
+        shards = shards or int(getattr(settings, "USAGE_COUNTER_SHARDS", 0))
+        if shards < 2:
+            return False
+        table = _table()
+        try:
+            table.update_item(
+                Key={"user_id": str(user_id), "barcode_uuid": str(barcode_uuid)},
+                UpdateExpression="SET usage_shards = :shards",
+                ConditionExpression=(
+                    "attribute_exists(barcode_uuid) "
+                    "AND attribute_not_exists(usage_shards)"
+                ),
+                ExpressionAttributeValues={":shards": shards},
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    @staticmethod
+    def record_usage(
+        barcode: dict,
+        user_id: int,
+        *,
+        cooldown_seconds: int,
+        cooldown_on_barcode: bool = False,
+        used_at: str = None,
+    ) -> bool:
+        """
+        Record one use of *barcode* by *user_id* in a single TransactWriteItems:
+        the cooldown check, total_usage += 1 / last_used, the transaction
+        item and its daily counter either all happen or none do.
+
+        The cooldown is a per-(user, barcode) marker, or with
+        *cooldown_on_barcode* the barcode's own last_used. Returns False,
+        writing nothing, while the cooldown is active or if the barcode no
+        longer exists.
+
+        Uses of a sharded barcode (see enable_usage_shards) go to a usage
+        shard; its item is only checked for existence, and only updated when
+        last_used is stale. Barcodes written faster than
+        USAGE_SHARD_WRITES_PER_SECOND on this worker are sharded
+        automatically; cooldown_on_barcode barcodes never are.
+        """
+        used_at = used_at or _now_iso()
+        cutoff = (
+            datetime.fromisoformat(used_at) - timedelta(seconds=cooldown_seconds)
+        ).isoformat()
+        bc_user_id, bc_uuid = str(barcode["user_id"]), str(barcode["barcode_uuid"])
+        key = {"user_id": bc_user_id, "barcode_uuid": bc_uuid}
+        shards = 0 if cooldown_on_barcode else _usage_shards(barcode)
+
+        actions = []
+        if not cooldown_on_barcode:
+            actions.append(last_use_action(user_id, bc_uuid, used_at, cooldown_seconds))
+        if shards:
+            # Hot barcode: count on a shard and leave the barcode item alone
+            # (beyond checking it still exists) unless its last_used is stale.
+            actions.append(usage_shard_action(bc_uuid, shards))
+            if _last_used_is_fresh(barcode.get("last_used"), used_at):
+                actions.append(
+                    {
+                        "ConditionCheck": {
+                            "table": "barcodes",
+                            "Key": key,
+                            "ConditionExpression": "attribute_exists(barcode_uuid)",
+                        }
+                    }
+                )
+            else:
+                actions.append(
+                    {
+                        "Update": {
+                            "table": "barcodes",
+                            "Key": key,
+                            "UpdateExpression": "SET last_used = :now",
+                            "ConditionExpression": "attribute_exists(barcode_uuid)",
+                            "ExpressionAttributeValues": {":now": used_at},
+                        }
+                    }
+                )
+        else:
+            condition = "attribute_exists(barcode_uuid)"
+            values = {":inc": Decimal("1"), ":now": used_at}
+            if cooldown_on_barcode:
+                condition += (
+                    " AND (attribute_not_exists(last_used) OR last_used < :cutoff)"
+                )
+                values[":cutoff"] = cutoff
+            actions.append(
+                {
+                    "Update": {
+                        "table": "barcodes",
+                        "Key": key,
+                        "UpdateExpression": (
+                            "SET total_usage = total_usage + :inc, last_used = :now"
+                        ),
+                        "ConditionExpression": condition,
+                        "ExpressionAttributeValues": values,
+                    }
+                }
+            )
+        item, txn_actions = TransactionRepository.usage_actions(
+            user_id,
+            bc_uuid,
+            barcode.get("barcode"),
+            used_at,
+            barcode_owner_id=bc_user_id,
         )
+
+        try:
+            transact_write_items(actions + txn_actions)
+        except _transaction_cancelled() as exc:
+            if "ConditionalCheckFailed" in cancellation_reasons(exc):
+                return False
+            raise
+        _pull_pool.touch(bc_user_id, bc_uuid, used_at)
+        TransactionRepository.count_rollups(item)
+        if not shards and not cooldown_on_barcode:
+            _note_usage_write(bc_user_id, bc_uuid)
+        return True
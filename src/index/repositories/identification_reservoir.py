@@ -0,0 +1,288 @@
+"""
+Reservoir of pre-generated, pre-locked Identification barcode values.
+
+Drawing a fresh Identification value on the request path meant a GSI
+existence query per candidate. Instead, refill() generates values in bulk,
+claims their uniqueness locks in batched transactions and records each one
+as a reservoir item (``__identification_reservoir__#<n>`` / value). A
+request takes a value with one conditional delete of its reservoir item,
+made in the same transaction that stores the barcode (see claim_actions()),
+so it never waits on a uniqueness check.
+
+Each worker keeps a few listed but unclaimed values. Two workers may list
+the same value; the conditional claim lets only one of them use it, and the
+other simply moves on to its next value. Listings start at a random point
+of a random shard to keep such collisions rare.
+
+A worker whose listings come up short refills the reservoir on a background
+thread; the refill_identification_reservoir command does the same from a
+scheduler. When the reservoir is empty take() returns None and callers fall
+back to an unreserved random value, whose lock is claimed on write.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from boto3.dynamodb.conditions import Key
+from django.conf import settings
+
+from core.dynamodb.client import get_table, transact_write_items
+from index.repositories.barcode_repo import (
+    _lock_claim_actions,
+    _now_iso,
+    _stable_hash,
+    _transaction_cancelled,
+    _unique_lock_key,
+)
+
+logger = logging.getLogger(__name__)
+
+RESERVOIR_USER_ID = "__identification_reservoir__"
+# Lock items of reserved values name this owner until a barcode claims them.
+RESERVED_OWNER = "__reserved__"
+IDENTIFICATION_VALUE_DIGITS = 28
+RESERVOIR_SHARDS = 8
+# Values listed per query, and values reserved per transaction (three
+# actions each, within the 100-action TransactWriteItems limit).
+RESERVOIR_FETCH_SIZE = 25
+RESERVOIR_REFILL_BATCH = 25
+RESERVOIR_REFILL_ATTEMPTS = 3
+# After finding the reservoir empty, a worker stops listing it for this long.
+RESERVOIR_EMPTY_RETRY_SECONDS = 5.0
+
+
+def random_identification_value() -> str:
+    """A random 28-digit value, from one call into the CSPRNG."""
+    return str(secrets.randbelow(10**IDENTIFICATION_VALUE_DIGITS)).zfill(
+        IDENTIFICATION_VALUE_DIGITS
+    )
+
+
+def _table():
+    return get_table("barcodes")
+
+
+def _shard_partition(shard: int) -> str:
+    return f"{RESERVOIR_USER_ID}#{shard}"
+
+
+def _reservoir_key(value: str) -> dict:
+    return {
+        "user_id": _shard_partition(_stable_hash(value) % RESERVOIR_SHARDS),
+        "barcode_uuid": value,
+    }
+
+
+def _reserve_actions(value: str, now: str) -> list[dict]:
+    return _lock_claim_actions(value, RESERVED_OWNER, RESERVED_OWNER) + [
+        {
+            "Put": {
+                "table": "barcodes",
+                "Item": {**_reservoir_key(value), "created_at": now},
+            }
+        }
+    ]
+
+
+def _target() -> int:
+    return int(getattr(settings, "IDENTIFICATION_RESERVOIR_TARGET", 0))
+
+
+def _background_refill_enabled() -> bool:
+    return bool(getattr(settings, "IDENTIFICATION_RESERVOIR_BACKGROUND_REFILL", False))
+
+
+# This worker's listed, not yet handed out values, when it last found the
+# reservoir empty, and its refill thread.
+_candidates: deque[str] = deque()
+_lock = threading.Lock()
+_empty_until = 0.0
+_refill_thread: Optional[threading.Thread] = None
+
+
+def _refill_logged() -> None:
+    try:
+        IdentificationReservoir.refill()
+    except Exception:
+        logger.exception("Identification reservoir refill failed")
+
+
+class IdentificationReservoir:
+    """Pre-locked Identification values, taken with a conditional claim."""
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def take() -> Optional[str]:
+        """
+        A reserved value this worker has not handed out yet, or None if the
+        reservoir looks empty. The value is only the caller's once the
+        claim_actions() for it commit.
+        """
+        global _empty_until
+        with _lock:
+            if _candidates:
+                return _candidates.popleft()
+            if time.monotonic() < _empty_until:
+                return None
+        listed = IdentificationReservoir._list()
+        if len(listed) < RESERVOIR_FETCH_SIZE:
+            IdentificationReservoir.refill_in_background()
+        with _lock:
+            if not listed:
+                _empty_until = time.monotonic() + RESERVOIR_EMPTY_RETRY_SECONDS
+                return None
+            _candidates.extend(listed[1:])
+        return listed[0]
+
+    @staticmethod
+    def claim_actions(value: str, user_id, barcode_uuid: str) -> list[dict]:
+        """
+        Transaction actions that claim reserved *value* for a barcode.
+
+        Both fail with ConditionalCheckFailed if another request claimed the
+        value first.
+        """
+        return [
+            {
+                "Delete": {
+                    "table": "barcodes",
+                    "Key": _reservoir_key(value),
+                    "ConditionExpression": "attribute_exists(user_id)",
+                }
+            },
+            {
+                "Update": {
+                    "table": "barcodes",
+                    "Key": _unique_lock_key(value),
+                    "UpdateExpression": (
+                        "SET owner_user_id = :owner, owner_barcode_uuid = :uuid"
+                    ),
+                    "ConditionExpression": "owner_user_id = :reserved",
+                    "ExpressionAttributeValues": {
+                        ":owner": str(user_id),
+                        ":uuid": str(barcode_uuid),
+                        ":reserved": RESERVED_OWNER,
+                    },
+                }
+            },
+        ]
+
+    @staticmethod
+    def _list() -> list[str]:
+        """
+        Up to RESERVOIR_FETCH_SIZE values, read from a random point of a
+        random shard onwards. Usually one query; only a nearly empty
+        reservoir needs more.
+        """
+        start = random_identification_value()
+        first = random.randrange(RESERVOIR_SHARDS)
+        values: list[str] = []
+        for offset in range(RESERVOIR_SHARDS):
+            shard = (first + offset) % RESERVOIR_SHARDS
+            partition = Key("user_id").eq(_shard_partition(shard))
+            # From the random point to the end of the shard, then wrap around.
+            for sort_key in (
+                Key("barcode_uuid").gte(start),
+                Key("barcode_uuid").lt(start),
+            ):
+                resp = _table().query(
+                    KeyConditionExpression=partition & sort_key,
+                    ProjectionExpression="barcode_uuid",
+                    Limit=RESERVOIR_FETCH_SIZE - len(values),
+                )
+                values += [item["barcode_uuid"] for item in resp.get("Items", [])]
+                if len(values) >= RESERVOIR_FETCH_SIZE:
+                    return values
+        return values
+
+    # ------------------------------------------------------------------
+    # Refill
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def size() -> int:
+        """Values in the reservoir, including those listed by some worker."""
+        total = 0
+        table = _table()
+        for shard in range(RESERVOIR_SHARDS):
+            kwargs = {
+                "KeyConditionExpression": Key("user_id").eq(_shard_partition(shard)),
+                "Select": "COUNT",
+            }
+            while True:
+                resp = table.query(**kwargs)
+                total += resp.get("Count", 0)
+                if not resp.get("LastEvaluatedKey"):
+                    break
+                kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+        return total
+
+    @staticmethod
+    def refill(target: int = None) -> int:
+        """
+        Top the reservoir up to *target* values (default
+        IDENTIFICATION_RESERVOIR_TARGET); return how many were added.
+
+        Each batch locks its values and records them in one transaction. A
+        batch that hits an already-locked value is redrawn.
+        """
+        global _empty_until
+        target = _target() if target is None else target
+        missing = target - IdentificationReservoir.size()
+        added = 0
+        while added < missing:
+            count = min(RESERVOIR_REFILL_BATCH, missing - added)
+            for _attempt in range(RESERVOIR_REFILL_ATTEMPTS):
+                now = _now_iso()
+                values = {random_identification_value() for _ in range(count)}
+                actions = []
+                for value in values:
+                    actions.extend(_reserve_actions(value, now))
+                try:
+                    transact_write_items(actions)
+                    break
+                except _transaction_cancelled() as exc:
+                    logger.info("Identification reservoir batch redrawn: %s", exc)
+            else:
+                raise RuntimeError(
+                    "Unable to reserve Identification barcode values after "
+                    f"{RESERVOIR_REFILL_ATTEMPTS} attempts."
+                )
+            added += len(values)
+        if added:
+            _empty_until = 0.0
+        return added
+
+    @staticmethod
+    def refill_in_background() -> None:
+        """Start one refill on a daemon thread unless one is running."""
+        global _refill_thread
+        if not _background_refill_enabled():
+            return
+        with _lock:
+            if _refill_thread is not None and _refill_thread.is_alive():
+                return
+            _refill_thread = threading.Thread(
+                target=_refill_logged,
+                name="identification-reservoir-refill",
+                daemon=True,
+            )
+            _refill_thread.start()
+
+    @staticmethod
+    def reset() -> None:
+        """Forget what this worker listed, so the next take() lists afresh."""
+        global _empty_until
+        with _lock:
+            _candidates.clear()
+            _empty_until = 0.0
@@ -0,0 +1,223 @@
+"""
+Per-worker in-memory cache of the shared DynamicBarcode pull pool.
+
+Every pull-enabled generate request used to re-read SharedBarcodeTypeIndex
+and discard most rows with a FilterExpression. The pool changes slowly, so
+each worker keeps its own copy bucketed by ``profile_gender`` and applies the
+owner, gender and cooldown filters locally.
+
+Freshness:
+- Writes made through BarcodeRepository on this worker are applied to the
+  cache immediately (create, update, delete, increment_usage,
+  record_usage).
+- The whole pool is reloaded in the background once it is older than the TTL,
+  while the stale copy keeps serving. Past ``STALE_RELOAD_FACTOR`` x TTL the
+  reload happens inline.
+- Callers re-read the chosen candidate by primary key before using it, so
+  writes from other workers can only cause a skipped candidate, never a
+  wrong one.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+
+from core.dynamodb.concurrency import get_executor
+
+logger = logging.getLogger(__name__)
+
+STALE_RELOAD_FACTOR = 4
+
+
+def _item_key(item: dict) -> tuple[str, str]:
+    return str(item.get("user_id")), str(item.get("barcode_uuid"))
+
+
+def _sort_key(item: dict) -> tuple[str, str]:
+    return item.get("time_created", ""), str(item.get("barcode_uuid"))
+
+
+class PullPoolCache:
+    """Gender-bucketed, newest-first cache of shared DynamicBarcodes."""
+
+    def __init__(
+        self,
+        loader: Callable[[], list[dict]],
+        matcher: Callable[..., bool],
+    ):
+        self._loader = loader
+        self._matcher = matcher
+        self._lock = threading.Lock()
+        self._items: dict[tuple[str, str], dict] = {}
+        # gender -> items sorted ascending by (time_created, uuid)
+        self._buckets: dict[Optional[str], list[dict]] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        self._generation = 0
+        # Writes seen while a reload is in flight, replayed over its snapshot.
+        self._pending: dict[tuple[str, str], Optional[dict]] = {}
+
+    @staticmethod
+    def ttl_seconds() -> float:
+        return float(getattr(settings, "PULL_POOL_CACHE_TTL_SECONDS", 0))
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return cls.ttl_seconds() > 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def candidates(
+        self,
+        *,
+        gender_setting: str,
+        exclude_user_id: int = None,
+        cooldown_cutoff: str = None,
+        limit: int = None,
+    ) -> list[dict]:
+        """Return newest-first cached candidates passing the pull filters."""
+        self._ensure_fresh()
+        matches = []
+        with self._lock:
+            for item in reversed(self._buckets.get(gender_setting, [])):
+                if not self._matcher(
+                    item,
+                    exclude_user_id=exclude_user_id,
+                    gender_setting=gender_setting,
+                    cooldown_cutoff=cooldown_cutoff,
+                ):
+                    continue
+                matches.append(dict(item))
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def upsert(self, item: dict) -> None:
+        """Apply the latest version of a barcode item (drops non-pool items)."""
+        if not item or not item.get("barcode_uuid"):
+            return
+        with self._lock:
+            key = _item_key(item)
+            if self._refreshing:
+                self._pending[key] = dict(item)
+            self._apply(key, item)
+
+    def touch(self, user_id, barcode_uuid: str, last_used: str) -> None:
+        """Record a new ``last_used`` for a cached barcode, if present."""
+        key = (str(user_id), str(barcode_uuid))
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is None:
+                return
+            updated = {**cached, "last_used": last_used}
+            if self._refreshing:
+                self._pending[key] = updated
+            self._apply(key, updated)
+
+    def remove(self, user_id, barcode_uuid: str) -> None:
+        key = (str(user_id), str(barcode_uuid))
+        with self._lock:
+            if self._refreshing:
+                self._pending[key] = None
+            self._apply(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached data; the next read reloads synchronously."""
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+            self._buckets.clear()
+            self._pending.clear()
+            self._loaded_at = None
+            self._refreshing = False
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _apply(self, key: tuple[str, str], item: Optional[dict]) -> None:
+        """Replace or remove one cached entry. Caller holds the lock."""
+        old = self._items.pop(key, None)
+        if old is not None:
+            bucket = self._buckets.get(old.get("profile_gender"), [])
+            for i, existing in enumerate(bucket):
+                if _item_key(existing) == key:
+                    del bucket[i]
+                    break
+
+        if item is None or not self._belongs_in_pool(item):
+            return
+
+        self._items[key] = item
+        bucket = self._buckets.setdefault(item.get("profile_gender"), [])
+        bisect.insort(bucket, item, key=_sort_key)
+
+    @staticmethod
+    def _belongs_in_pool(item: dict) -> bool:
+        return item.get("barcode_type") == "DynamicBarcode" and bool(
+            item.get("share_with_others", False)
+        )
+
+    def _ensure_fresh(self) -> None:
+        ttl = self.ttl_seconds()
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded_at is not None:
+                age = now - self._loaded_at
+                if age < ttl:
+                    return
+                if age < ttl * STALE_RELOAD_FACTOR:
+                    if not self._refreshing:
+                        self._refreshing = True
+                        self._submit_background_refresh()
+                    return
+
+        self._refresh()
+
+    def _submit_background_refresh(self) -> None:
+        get_executor().submit(self._background_refresh)
+
+    def _background_refresh(self) -> None:
+        try:
+            self._refresh()
+        except Exception:
+            logger.exception("Background pull pool refresh failed")
+
+    def _refresh(self) -> None:
+        with self._lock:
+            generation = self._generation
+            self._refreshing = True
+
+        try:
+            items = self._loader()
+        except Exception:
+            with self._lock:
+                if generation == self._generation:
+                    self._refreshing = False
+                    self._pending.clear()
+            raise
+
+        with self._lock:
+            if generation != self._generation:
+                return
+            pending, self._pending = self._pending, {}
+            self._items.clear()
+            self._buckets.clear()
+            for item in items:
+                self._apply(_item_key(item), item)
+            for key, item in pending.items():
+                self._apply(key, item)
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
@@ -3,14 +3,31 @@ Repository for DynamoDB UserSettings table operations.
 
 Merges UserBarcodeSettings + UserBarcodePullSettings + BarcodePullSettings
 into a single DynamoDB item per user.
+
+Reads go through two cache tiers: a per-worker LRU and the shared Django
+cache, where items are stored under their settings_version. Every write
+bumps settings_version, stores the new item in both tiers and publishes the
+version in the shared cache, so other workers drop their local copy on their
+next read. A per-process Django cache (LocMemCache, the default) never sees
+other workers' writes, so there the shared tier keeps items no longer than
+SETTINGS_CACHE_TTL_SECONDS, which then bounds staleness on other workers.
 """
 
 from __future__ import annotations
 
+import logging
+import threading
+from collections import Counter
 from typing import Optional
 
 from boto3.dynamodb.conditions import Attr
+from django.conf import settings as django_settings
+from django.core.cache import cache
+
 from core.dynamodb.client import get_table
+from core.local_cache import LocalTTLCache
+
+logger = logging.getLogger(__name__)
 
 # Default values matching Django model defaults
 _DEFAULTS = {
@@ -26,18 +43,159 @@ _DEFAULTS = {
 }
 
 
+# Django cache backends whose contents live inside one process.
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+_local_cache: Optional[LocalTTLCache] = None
+_stats_lock = threading.Lock()
+_stats: Counter = Counter()
+
+
 def _table():
     return get_table("user_settings")
 
 
+def _local_ttl() -> float:
+    return float(getattr(django_settings, "SETTINGS_CACHE_TTL_SECONDS", 0))
+
+
+def _shared_ttl() -> int:
+    ttl = int(getattr(django_settings, "SETTINGS_SHARED_CACHE_TTL_SECONDS", 0))
+    backend = django_settings.CACHES.get("default", {}).get("BACKEND")
+    if backend in PER_PROCESS_CACHE_BACKENDS:
+        # Other workers' writes never reach this cache.
+        ttl = min(ttl, int(_local_ttl()))
+    return ttl
+
+
+def _get_local_cache() -> LocalTTLCache:
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LocalTTLCache(
+            max_entries=getattr(django_settings, "SETTINGS_CACHE_MAX_ENTRIES", 10000),
+            ttl_seconds=_local_ttl(),
+        )
+    return _local_cache
+
+
+def _count(event: str) -> None:
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def _version(item: dict) -> int:
+    return int(item.get("settings_version", 0))
+
+
+def _version_cache_key(user_id) -> str:
+    return f"index:settings:version:{user_id}"
+
+
+def _item_cache_key(user_id, version: int) -> str:
+    return f"index:settings:{user_id}:v{version}"
+
+
+def _shared_cache_get(key: str):
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.warning("Shared cache unavailable reading %s", key)
+        return None
+
+
+def _cached_settings(user_id) -> Optional[dict]:
+    """
+    Return cached settings for *user_id*, or None on a miss.
+
+    A local copy is used while no newer version has been published to the
+    shared cache; otherwise the published version is looked up there.
+    """
+    version = None
+    if _shared_ttl() > 0:
+        version = _shared_cache_get(_version_cache_key(user_id))
+    if _local_ttl() > 0:
+        local = _get_local_cache().get(str(user_id))
+        if local is not None and (version is None or _version(local) >= version):
+            _count("local_hits")
+            return local
+    if version is not None:
+        item = _shared_cache_get(_item_cache_key(user_id, version))
+        if item is not None:
+            _count("shared_hits")
+            if _local_ttl() > 0:
+                _get_local_cache().set(str(user_id), item)
+            return item
+    return None
+
+
+def _remember(item: dict, *, written: bool) -> None:
+    """
+    Store *item* in both cache tiers.
+
+    After a write (*written*) its version is published unless a newer one
+    already is; a read only publishes when no version is known. Either way a
+    slow request cannot roll back a concurrent write.
+    """
+    user_id, version = item["user_id"], _version(item)
+    if _local_ttl() > 0:
+        _get_local_cache().set(user_id, item)
+    timeout = _shared_ttl()
+    if timeout <= 0:
+        return
+    try:
+        cache.set(_item_cache_key(user_id, version), item, timeout=timeout)
+        key = _version_cache_key(user_id)
+        if not cache.add(key, version, timeout=timeout) and written:
+            published = cache.get(key)
+            if published is None or int(published) < version:
+                cache.set(key, version, timeout=timeout)
+    except Exception:
+        logger.warning("Could not publish settings of user %s to the cache", user_id)
+
+
 class SettingsRepository:
     """Data access for the MobileID-UserSettings DynamoDB table."""
 
     @staticmethod
     def get(user_id: int) -> Optional[dict]:
-        """Get user settings. Returns None if not found."""
-        resp = _table().get_item(Key={"user_id": str(user_id), "sk": "SETTINGS"})
-        return resp.get("Item")
+        """Get user settings (cached). Returns None if not found."""
+        _count("reads")
+        item = _cached_settings(user_id)
+        if item is None:
+            _count("dynamodb_reads")
+            resp = _table().get_item(Key={"user_id": str(user_id), "sk": "SETTINGS"})
+            item = resp.get("Item")
+            if item is None:
+                return None
+            _remember(item, written=False)
+        # Callers may modify the result; never hand out the cached dict.
+        return dict(item)
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """Counters of this worker's settings reads by the tier that served them."""
+        with _stats_lock:
+            reads = _stats["reads"]
+            counts = {
+                "reads": reads,
+                "local_hits": _stats["local_hits"],
+                "shared_hits": _stats["shared_hits"],
+                "dynamodb_reads": _stats["dynamodb_reads"],
+            }
+        served = counts["local_hits"] + counts["shared_hits"]
+        counts["hit_rate"] = (served / reads) if reads else 0.0
+        return counts
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop this worker's cached settings and reset the counters."""
+        if _local_cache is not None:
+            _local_cache.clear()
+        with _stats_lock:
+            _stats.clear()
 
     @staticmethod
     def get_or_create(user_id: int) -> dict:
@@ -49,29 +207,23 @@ class SettingsRepository:
         item = SettingsRepository.get(user_id)
         if item:
             return item
-
-        # Create with defaults
-        item = {"user_id": str(user_id), **_DEFAULTS}
-        _table().put_item(
-            Item={k: v for k, v in item.items() if v is not None},
-            ConditionExpression=Attr("user_id").not_exists(),
-        )
-        return item
+        return SettingsRepository.upsert(user_id)
 
     @staticmethod
-    def update(user_id: int, **updates) -> dict:
+    def upsert(user_id: int, **updates) -> dict:
         """
-        Update specific settings fields.
+        Apply *updates* (None removes a field) in one UpdateItem, creating
+        the item if needed.
 
-        Returns the full updated item.
+        Fields not being updated are filled from the defaults with
+        if_not_exists, so a first write yields a complete item and an
+        existing one keeps its values. Bumps settings_version and refreshes
+        the caches. Returns the full item (ALL_NEW).
         """
-        if not updates:
-            return SettingsRepository.get_or_create(user_id)
-
-        expr_parts = []
+        set_parts = []
+        remove_parts = []
         expr_names = {}
         expr_values = {}
-        remove_parts = []
 
         for i, (key, value) in enumerate(updates.items()):
             alias = f"#k{i}"
@@ -79,30 +231,47 @@ class SettingsRepository:
             if value is None:
                 remove_parts.append(alias)
             else:
-                val_alias = f":v{i}"
-                expr_parts.append(f"{alias} = {val_alias}")
-                expr_values[val_alias] = value
+                set_parts.append(f"{alias} = :v{i}")
+                expr_values[f":v{i}"] = value
+
+        defaults = [
+            (key, value)
+            for key, value in _DEFAULTS.items()
+            if key != "sk" and key not in updates and value is not None
+        ]
+        for i, (key, value) in enumerate(defaults):
+            expr_names[f"#d{i}"] = key
+            expr_values[f":d{i}"] = value
+            set_parts.append(f"#d{i} = if_not_exists(#d{i}, :d{i})")
 
-        update_expr = ""
-        if expr_parts:
-            update_expr += "SET " + ", ".join(expr_parts)
+        expr_values[":one"] = 1
+        clauses = ["ADD settings_version :one"]
+        if set_parts:
+            clauses.append("SET " + ", ".join(set_parts))
         if remove_parts:
-            if update_expr:
-                update_expr += " "
-            update_expr += "REMOVE " + ", ".join(remove_parts)
-
-        kwargs = {
-            "Key": {"user_id": str(user_id), "sk": "SETTINGS"},
-            "UpdateExpression": update_expr,
-            "ReturnValues": "ALL_NEW",
-        }
-        if expr_names:
-            kwargs["ExpressionAttributeNames"] = expr_names
-        if expr_values:
-            kwargs["ExpressionAttributeValues"] = expr_values
-
-        resp = _table().update_item(**kwargs)
-        return resp.get("Attributes", {})
+            clauses.append("REMOVE " + ", ".join(remove_parts))
+
+        resp = _table().update_item(
+            Key={"user_id": str(user_id), "sk": "SETTINGS"},
+            UpdateExpression=" ".join(clauses),
+            ExpressionAttributeNames=expr_names,
+            ExpressionAttributeValues=expr_values,
+            ReturnValues="ALL_NEW",
+        )
+        item = resp.get("Attributes", {})
+        _remember(item, written=True)
+        return dict(item)
+
+    @staticmethod
+    def update(user_id: int, **updates) -> dict:
+        """
+        Update specific settings fields.
+
+        Returns the full updated item.
+        """
+        if not updates:
+            return SettingsRepository.get_or_create(user_id)
+        return SettingsRepository.upsert(user_id, **updates)
 
     @staticmethod
     def set_active_barcode(
@@ -192,15 +361,18 @@ class SettingsRepository:
         ).update(barcode=None)
         """
         try:
-            _table().update_item(
+            resp = _table().update_item(
                 Key={"user_id": str(user_id), "sk": "SETTINGS"},
-                UpdateExpression="REMOVE #abc, #owner",
+                UpdateExpression="ADD settings_version :one REMOVE #abc, #owner",
                 ConditionExpression=Attr("active_barcode_uuid").eq(str(barcode_uuid)),
                 ExpressionAttributeNames={
                     "#abc": "active_barcode_uuid",
                     "#owner": "active_barcode_owner_id",
                 },
+                ExpressionAttributeValues={":one": 1},
+                ReturnValues="ALL_NEW",
             )
-            return True
         except _table().meta.client.exceptions.ConditionalCheckFailedException:
             return False
+        _remember(resp["Attributes"], written=True)
+        return True
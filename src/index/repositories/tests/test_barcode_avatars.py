@@ -0,0 +1,66 @@
+from django.test import TestCase
+
+from core.dynamodb.client import get_table
+from core.dynamodb.tables import BARCODE_INDEX_ATTRIBUTES
+from index.repositories import BarcodeRepository
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class BarcodeAvatarStorageTest(DynamoDBTestMixin, TestCase):
+    """Avatars live in content-addressed items outside the barcode rows."""
+
+    def test_create_stores_avatar_by_reference(self):
+        item = BarcodeRepository.create(
+            user_id=1,
+            barcode_value="with-avatar",
+            profile_name="Owner",
+            profile_avatar="dGVzdA==",
+        )
+
+        stored = BarcodeRepository.get_by_uuid(1, item["barcode_uuid"])
+        self.assertNotIn("profile_avatar", stored)
+        self.assertTrue(BarcodeRepository.has_avatar(stored))
+        self.assertEqual(BarcodeRepository.get_avatar(stored), "dGVzdA==")
+        # Avatar items never show up among a user's barcodes.
+        self.assertEqual(len(BarcodeRepository.get_user_barcodes(1)), 1)
+
+    def test_identical_avatars_share_one_item(self):
+        first = BarcodeRepository.create(
+            user_id=1, barcode_value="one", profile_avatar="c2FtZQ=="
+        )
+        second = BarcodeRepository.create(
+            user_id=2, barcode_value="two", profile_avatar="c2FtZQ=="
+        )
+
+        self.assertEqual(first["profile_avatar_ref"], second["profile_avatar_ref"])
+
+    def test_update_replaces_avatar_reference(self):
+        item = BarcodeRepository.create(
+            user_id=1, barcode_value="upd", profile_avatar="b2xk"
+        )
+
+        updated = BarcodeRepository.update(
+            1, item["barcode_uuid"], profile_avatar="bmV3"
+        )
+        self.assertEqual(BarcodeRepository.get_avatar(updated), "bmV3")
+
+        cleared = BarcodeRepository.update(1, item["barcode_uuid"], profile_avatar="")
+        self.assertFalse(BarcodeRepository.has_avatar(cleared))
+        self.assertIsNone(BarcodeRepository.get_avatar(cleared))
+
+    def test_legacy_inline_avatar_still_served(self):
+        legacy = {"user_id": "1", "barcode_uuid": "old", "profile_avatar": "aW5saW5l"}
+        self.assertTrue(BarcodeRepository.has_avatar(legacy))
+        self.assertEqual(BarcodeRepository.get_avatar(legacy), "aW5saW5l")
+
+    def test_barcode_indexes_project_only_read_attributes(self):
+        description = get_table("barcodes").meta.client.describe_table(
+            TableName=get_table("barcodes").name
+        )["Table"]
+        for index in description["GlobalSecondaryIndexes"]:
+            projection = index["Projection"]
+            self.assertEqual(projection["ProjectionType"], "INCLUDE")
+            self.assertEqual(
+                set(projection["NonKeyAttributes"]), set(BARCODE_INDEX_ATTRIBUTES)
+            )
+            self.assertNotIn("profile_avatar", projection["NonKeyAttributes"])
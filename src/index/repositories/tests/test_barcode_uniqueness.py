@@ -0,0 +1,115 @@
+"""Barcode value uniqueness locks are written atomically with the barcode."""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from core.dynamodb.client import get_client, get_table
+from index.repositories import BarcodeRepository, DuplicateBarcodeError, barcode_repo
+from index.repositories.barcode_repo import (
+    UNIQUE_LOCK_SHARDS,
+    _legacy_unique_lock_key,
+    _unique_lock_key,
+)
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
+
+
+def _lock(value):
+    return get_table("barcodes").get_item(Key=_unique_lock_key(value)).get("Item")
+
+
+class BarcodeUniquenessLockTest(DynamoDBCleanupMixin, TestCase):
+    def _create(self, value, user_id=1):
+        return BarcodeRepository.create(user_id=user_id, barcode_value=value)
+
+    def test_create_writes_item_and_lock_in_one_transaction(self):
+        with patch.object(
+            barcode_repo,
+            "transact_write_items",
+            wraps=barcode_repo.transact_write_items,
+        ) as mock_transact:
+            barcode = self._create("uniq-1")
+
+        mock_transact.assert_called_once()
+        # shard lock, legacy-lock check, barcode item
+        self.assertEqual(len(mock_transact.call_args.args[0]), 3)
+        lock = _lock("uniq-1")
+        self.assertEqual(lock["owner_barcode_uuid"], barcode["barcode_uuid"])
+        self.assertEqual(lock["owner_user_id"], "1")
+
+    def test_duplicate_value_raises_and_writes_nothing(self):
+        self._create("uniq-1")
+        with self.assertRaises(DuplicateBarcodeError):
+            self._create("uniq-1", user_id=2)
+        self.assertEqual(BarcodeRepository.get_user_barcodes(2), [])
+
+    def test_duplicate_primary_key_does_not_leave_a_lock(self):
+        barcode = self._create("uniq-1")
+        with self.assertRaises(get_client().exceptions.TransactionCanceledException):
+            BarcodeRepository.create(
+                user_id=1,
+                barcode_value="uniq-2",
+                barcode_uuid=barcode["barcode_uuid"],
+            )
+        self.assertIsNone(_lock("uniq-2"))
+
+    def test_delete_releases_lock(self):
+        barcode = self._create("uniq-1")
+        BarcodeRepository.delete(1, barcode["barcode_uuid"])
+
+        self.assertIsNone(BarcodeRepository.get_by_uuid(1, barcode["barcode_uuid"]))
+        self.assertIsNone(_lock("uniq-1"))
+        self._create("uniq-1", user_id=2)
+
+    def test_value_change_moves_lock(self):
+        barcode = self._create("uniq-1")
+        updated = BarcodeRepository.update(
+            1, barcode["barcode_uuid"], barcode="uniq-2", daily_usage_limit=3
+        )
+
+        self.assertEqual(updated["barcode"], "uniq-2")
+        self.assertEqual(int(updated["daily_usage_limit"]), 3)
+        self.assertIsNone(_lock("uniq-1"))
+        self.assertIsNotNone(_lock("uniq-2"))
+
+    def test_value_change_to_taken_value_raises_and_keeps_state(self):
+        barcode = self._create("uniq-1")
+        self._create("uniq-2", user_id=2)
+
+        with self.assertRaises(DuplicateBarcodeError):
+            BarcodeRepository.update(1, barcode["barcode_uuid"], barcode="uniq-2")
+
+        current = BarcodeRepository.get_by_uuid(1, barcode["barcode_uuid"])
+        self.assertEqual(current["barcode"], "uniq-1")
+        self.assertIsNotNone(_lock("uniq-1"))
+
+
+class ShardedLockMigrationTest(DynamoDBCleanupMixin, TestCase):
+    """Locks written before sharding keep blocking duplicates until migrated."""
+
+    def _put_legacy_lock(self, value):
+        get_table("barcodes").put_item(
+            Item={**_legacy_unique_lock_key(value), "created_at": "2024-01-01"}
+        )
+
+    def test_locks_spread_over_shards(self):
+        shards = {_unique_lock_key(f"value-{i}")["user_id"] for i in range(200)}
+        self.assertGreater(len(shards), UNIQUE_LOCK_SHARDS // 2)
+        self.assertEqual(_unique_lock_key("value-1"), _unique_lock_key("value-1"))
+
+    def test_legacy_lock_still_blocks_duplicate(self):
+        self._put_legacy_lock("old-1")
+        with self.assertRaises(DuplicateBarcodeError):
+            BarcodeRepository.create(user_id=1, barcode_value="old-1")
+
+    @override_settings(BARCODE_UNIQUE_LOCK_LEGACY_READS=False)
+    def test_legacy_layout_ignored_after_migration(self):
+        self._put_legacy_lock("old-1")
+        BarcodeRepository.create(user_id=1, barcode_value="old-1")
+
+    def test_delete_removes_legacy_lock_too(self):
+        barcode = BarcodeRepository.create(user_id=1, barcode_value="old-1")
+        self._put_legacy_lock("old-1")
+        BarcodeRepository.delete(1, barcode["barcode_uuid"])
+        table = get_table("barcodes")
+        self.assertNotIn("Item", table.get_item(Key=_legacy_unique_lock_key("old-1")))
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from core.dynamodb.client import iter_query
+from index.repositories import BarcodeRepository
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+def _at(minute: int) -> str:
+    return f"2026-04-23T00:{minute:02d}:00+00:00"
+
+
+@override_settings(USER_BARCODE_TIME_INDEX_READS=True)
+class DashboardPageTest(DynamoDBTestMixin, TestCase):
+    """Dashboard lists merge two sorted streams instead of sorting in Python."""
+
+    def setUp(self):
+        super().setUp()
+        # Own barcodes at even minutes, shared ones at odd minutes; uuids are
+        # out of time order so a sort-key ordered read would come back wrong.
+        for minute in (0, 2, 4, 6):
+            BarcodeRepository.create(
+                user_id=1,
+                barcode_value=f"own-{minute}",
+                barcode_uuid=f"{9 - minute}-own",
+                time_created=_at(minute),
+            )
+        for minute in (1, 3, 5):
+            BarcodeRepository.create(
+                user_id=2,
+                barcode_value=f"shared-{minute}",
+                barcode_type="DynamicBarcode",
+                share_with_others=True,
+                time_created=_at(minute),
+            )
+
+    def _values(self, items):
+        return [item["barcode"] for item in items]
+
+    def test_user_barcodes_come_back_newest_first(self):
+        expected = ["own-6", "own-4", "own-2", "own-0"]
+        self.assertEqual(self._values(BarcodeRepository.get_user_barcodes(1)), expected)
+        with override_settings(USER_BARCODE_TIME_INDEX_READS=False):
+            self.assertEqual(
+                self._values(BarcodeRepository.get_user_barcodes(1)), expected
+            )
+
+    def test_pages_walk_the_merged_list(self):
+        everything = self._values(BarcodeRepository.get_dashboard_barcodes(1))
+        self.assertEqual(
+            everything,
+            ["own-6", "shared-5", "own-4", "shared-3", "own-2", "shared-1", "own-0"],
+        )
+
+        pages = []
+        cursor = None
+        while True:
+            items, cursor = BarcodeRepository.get_dashboard_page(
+                1, page_size=3, cursor=cursor
+            )
+            pages.append(self._values(items))
+            if cursor is None:
+                break
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([value for page in pages for value in page], everything)
+
+    def test_shared_limit_holds_across_pages(self):
+        first, cursor = BarcodeRepository.get_dashboard_page(
+            1, page_size=2, shared_limit=2
+        )
+        rest, last = BarcodeRepository.get_dashboard_page(
+            1, page_size=10, cursor=cursor, shared_limit=2
+        )
+
+        self.assertIsNone(last)
+        self.assertEqual(
+            self._values(first + rest),
+            ["own-6", "shared-5", "own-4", "shared-3", "own-2", "own-0"],
+        )
+
+    def test_first_page_reads_only_what_it_returns(self):
+        with patch(
+            "index.repositories.barcode_repo.iter_query",
+            wraps=iter_query,
+        ) as mock_iter:
+            BarcodeRepository.get_dashboard_page(1, page_size=2)
+
+        own_kwargs = mock_iter.call_args_list[0].kwargs
+        self.assertEqual(own_kwargs["IndexName"], "UserBarcodeTimeIndex")
+        self.assertEqual(own_kwargs["Limit"], 3)
@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from index.repositories import (
+    BarcodeRepository,
+    DuplicateBarcodeError,
+    IdentificationReservoir,
+    identification_reservoir,
+)
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class IdentificationReservoirTest(DynamoDBTestMixin, TestCase):
+    """Identification values are reserved in bulk and claimed atomically."""
+
+    def test_refill_tops_up_to_target(self):
+        self.assertEqual(IdentificationReservoir.refill(30), 30)
+        self.assertEqual(IdentificationReservoir.refill(30), 0)
+        self.assertEqual(IdentificationReservoir.refill(32), 2)
+        self.assertEqual(IdentificationReservoir.size(), 32)
+
+    def test_reserved_values_are_locked(self):
+        IdentificationReservoir.refill(1)
+        value = IdentificationReservoir.take()
+
+        self.assertEqual(len(value), 28)
+        with self.assertRaises(DuplicateBarcodeError):
+            BarcodeRepository.create(user_id=1, barcode_value=value)
+
+    def test_take_hands_out_each_listed_value_once(self):
+        IdentificationReservoir.refill(5)
+
+        with patch.object(
+            IdentificationReservoir, "_list", wraps=IdentificationReservoir._list
+        ) as mock_list:
+            values = [IdentificationReservoir.take() for _ in range(5)]
+
+        self.assertEqual(mock_list.call_count, 1)
+        self.assertEqual(len(set(values)), 5)
+
+    def test_value_can_only_be_claimed_once(self):
+        IdentificationReservoir.refill(1)
+        value = IdentificationReservoir.take()
+
+        BarcodeRepository.rotate_identification(1, value, reserved=True)
+        with self.assertRaises(DuplicateBarcodeError):
+            BarcodeRepository.rotate_identification(2, value, reserved=True)
+        self.assertEqual(IdentificationReservoir.size(), 0)
+
+    def test_empty_reservoir_returns_none(self):
+        with patch.object(IdentificationReservoir, "refill") as mock_refill:
+            self.assertIsNone(IdentificationReservoir.take())
+
+        mock_refill.assert_not_called()
+
+    @override_settings(
+        IDENTIFICATION_RESERVOIR_BACKGROUND_REFILL=True,
+        IDENTIFICATION_RESERVOIR_TARGET=10,
+    )
+    def test_short_listing_refills_in_background(self):
+        self.assertIsNone(IdentificationReservoir.take())
+
+        identification_reservoir._refill_thread.join(timeout=10)
+        self.assertEqual(IdentificationReservoir.size(), 10)
@@ -0,0 +1,108 @@
+"""Tests for the per-worker shared DynamicBarcode pull pool cache."""
+
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase, override_settings
+
+from index.repositories.barcode_repo import _shared_dynamic_item_matches
+from index.repositories.pull_pool import PullPoolCache
+
+
+def _shared(uuid, user_id="20", gender="Male", time_created="2026-04-23T00:00:00"):
+    return {
+        "user_id": user_id,
+        "barcode_uuid": uuid,
+        "barcode_type": "DynamicBarcode",
+        "share_with_others": True,
+        "profile_gender": gender,
+        "time_created": time_created,
+    }
+
+
+@override_settings(PULL_POOL_CACHE_TTL_SECONDS=60)
+class PullPoolCacheTest(TestCase):
+    def _cache(self, items):
+        loader = MagicMock(return_value=items)
+        return (
+            PullPoolCache(loader=loader, matcher=_shared_dynamic_item_matches),
+            loader,
+        )
+
+    def _uuids(self, cache, **kwargs):
+        kwargs.setdefault("gender_setting", "Male")
+        return [item["barcode_uuid"] for item in cache.candidates(**kwargs)]
+
+    def test_loads_once_and_filters_locally(self):
+        cache, loader = self._cache(
+            [
+                _shared("old", time_created="2026-04-23T00:00:00"),
+                _shared("new", time_created="2026-04-23T00:01:00"),
+                _shared("self", user_id="10"),
+                _shared("female", gender="Female"),
+            ]
+        )
+
+        self.assertEqual(self._uuids(cache, exclude_user_id=10), ["new", "old"])
+        self.assertEqual(self._uuids(cache, gender_setting="Female"), ["female"])
+        loader.assert_called_once()
+
+    def test_touch_applies_cooldown_without_reload(self):
+        cache, loader = self._cache([_shared("a"), _shared("b", user_id="21")])
+        self._uuids(cache)
+
+        cache.touch("20", "a", "2026-04-23T00:10:00")
+
+        self.assertEqual(
+            self._uuids(cache, cooldown_cutoff="2026-04-23T00:05:00"), ["b"]
+        )
+        loader.assert_called_once()
+
+    def test_upsert_adds_and_drops_items_by_pool_membership(self):
+        cache, _ = self._cache([_shared("a")])
+        self._uuids(cache)
+
+        cache.upsert(_shared("b", user_id="21", time_created="2026-04-23T00:02:00"))
+        self.assertEqual(self._uuids(cache), ["b", "a"])
+
+        cache.upsert({**_shared("a"), "share_with_others": False})
+        self.assertEqual(self._uuids(cache), ["b"])
+
+        cache.remove("21", "b")
+        self.assertEqual(self._uuids(cache), [])
+
+    def test_limit_caps_results(self):
+        cache, _ = self._cache([_shared(f"bc-{i}", user_id=str(i)) for i in range(5)])
+
+        self.assertEqual(len(cache.candidates(gender_setting="Male", limit=2)), 2)
+
+    def test_clear_forces_synchronous_reload(self):
+        cache, loader = self._cache([_shared("a")])
+        self._uuids(cache)
+
+        cache.clear()
+        self._uuids(cache)
+
+        self.assertEqual(loader.call_count, 2)
+
+    def test_stale_pool_is_served_while_refreshing_in_background(self):
+        cache, loader = self._cache([_shared("a")])
+        self._uuids(cache)
+        cache._loaded_at -= 61
+
+        with patch.object(cache, "_submit_background_refresh") as submit:
+            self.assertEqual(self._uuids(cache), ["a"])
+
+        submit.assert_called_once()
+        loader.assert_called_once()
+
+    def test_writes_during_reload_survive_the_snapshot(self):
+        cache = None
+
+        def loader():
+            # A concurrent request removes "a" while the reload is in flight.
+            cache.remove("20", "a")
+            return [_shared("a")]
+
+        cache = PullPoolCache(loader=loader, matcher=_shared_dynamic_item_matches)
+
+        self.assertEqual(self._uuids(cache), [])
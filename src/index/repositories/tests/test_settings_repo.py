@@ -0,0 +1,140 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from index.repositories import SettingsRepository, settings_repo
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class SettingsUpsertTest(DynamoDBTestMixin, TestCase):
+    """upsert() creates or updates the settings item in one UpdateItem."""
+
+    def test_upsert_creates_item_with_defaults(self):
+        item = SettingsRepository.upsert(1, scanner_detection_enabled=True)
+
+        self.assertEqual(item, SettingsRepository.get(1))
+        self.assertTrue(item["scanner_detection_enabled"])
+        self.assertEqual(item["pull_setting"], "Disable")
+        self.assertTrue(item["prefer_front_camera"])
+        self.assertNotIn("active_barcode_uuid", item)
+
+    def test_upsert_keeps_existing_values(self):
+        SettingsRepository.upsert(1, pull_setting="Enable", prefer_front_camera=False)
+
+        item = SettingsRepository.upsert(1, active_barcode_uuid="bc-1")
+
+        self.assertEqual(item["pull_setting"], "Enable")
+        self.assertFalse(item["prefer_front_camera"])
+        self.assertEqual(item["active_barcode_uuid"], "bc-1")
+
+    def test_upsert_none_removes_field(self):
+        SettingsRepository.upsert(1, active_barcode_uuid="bc-1")
+
+        item = SettingsRepository.upsert(1, active_barcode_uuid=None)
+
+        self.assertNotIn("active_barcode_uuid", item)
+        self.assertEqual(item["pull_setting"], "Disable")
+
+    def test_get_or_create_returns_defaults(self):
+        item = SettingsRepository.get_or_create(1)
+
+        self.assertEqual(item["user_id"], "1")
+        self.assertEqual(item["pull_gender_setting"], "Unknow")
+        self.assertEqual(SettingsRepository.get_or_create(1), item)
+
+
+class SettingsCacheTest(DynamoDBTestMixin, TestCase):
+    """Settings reads are served from the worker and shared caches."""
+
+    def setUp(self):
+        super().setUp()
+        SettingsRepository.upsert(1, pull_setting="Enable")
+        SettingsRepository.clear_cache()
+
+    def test_repeated_reads_skip_dynamodb(self):
+        with patch.object(
+            settings_repo, "_table", wraps=settings_repo._table
+        ) as mock_table:
+            first = SettingsRepository.get(1)
+            second = SettingsRepository.get(1)
+
+        self.assertEqual(first, second)
+        self.assertEqual(mock_table.call_count, 0)
+        stats = SettingsRepository.cache_stats()
+        self.assertEqual(stats["reads"], 2)
+        self.assertEqual(stats["dynamodb_reads"], 0)
+        self.assertEqual(stats["hit_rate"], 1.0)
+
+    def test_shared_tier_serves_other_workers(self):
+        SettingsRepository.get(1)
+        settings_repo._get_local_cache().clear()
+
+        item = SettingsRepository.get(1)
+
+        self.assertEqual(item["pull_setting"], "Enable")
+        stats = SettingsRepository.cache_stats()
+        # setUp's write published the item; neither read reached DynamoDB.
+        self.assertEqual(stats["shared_hits"], 2)
+        self.assertEqual(stats["dynamodb_reads"], 0)
+
+    def test_write_bumps_version_and_replaces_stale_copies(self):
+        stale = SettingsRepository.get(1)
+
+        updated = SettingsRepository.update(1, pull_setting="Disable")
+        self.assertEqual(
+            int(updated["settings_version"]), int(stale["settings_version"]) + 1
+        )
+        # Another worker still holding the old version refetches it.
+        settings_repo._get_local_cache().set("1", stale)
+
+        self.assertEqual(SettingsRepository.get(1)["pull_setting"], "Disable")
+
+    def test_clear_barcode_if_matches_invalidates(self):
+        SettingsRepository.set_active_own_barcode(1, "bc-1")
+        self.assertEqual(SettingsRepository.get(1)["active_barcode_uuid"], "bc-1")
+
+        self.assertFalse(SettingsRepository.clear_barcode_if_matches(1, "bc-2"))
+        self.assertTrue(SettingsRepository.clear_barcode_if_matches(1, "bc-1"))
+
+        self.assertNotIn("active_barcode_uuid", SettingsRepository.get(1))
+
+    def test_callers_cannot_modify_cached_items(self):
+        SettingsRepository.get(1)["pull_setting"] = "Disable"
+
+        self.assertEqual(SettingsRepository.get(1)["pull_setting"], "Enable")
+
+    @override_settings(
+        SETTINGS_CACHE_TTL_SECONDS=30, SETTINGS_SHARED_CACHE_TTL_SECONDS=3600
+    )
+    def test_per_process_cache_keeps_items_no_longer_than_local_ttl(self):
+        self.assertEqual(settings_repo._shared_ttl(), 30)
+        with override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                    "LOCATION": "redis://localhost:6379/1",
+                }
+            }
+        ):
+            self.assertEqual(settings_repo._shared_ttl(), 3600)
+
+    def test_write_never_publishes_an_older_version(self):
+        current = SettingsRepository.get(1)
+        newer = SettingsRepository.update(1, pull_setting="Disable")
+
+        # A slow write of the older item finishes last.
+        settings_repo._remember(current, written=True)
+
+        settings_repo._get_local_cache().clear()
+        item = SettingsRepository.get(1)
+        self.assertEqual(item["settings_version"], newer["settings_version"])
+        self.assertEqual(item["pull_setting"], "Disable")
+
+    @override_settings(
+        SETTINGS_CACHE_TTL_SECONDS=0, SETTINGS_SHARED_CACHE_TTL_SECONDS=0
+    )
+    def test_disabled_cache_reads_dynamodb(self):
+        SettingsRepository.get(1)
+        SettingsRepository.get(1)
+
+        self.assertEqual(SettingsRepository.cache_stats()["dynamodb_reads"], 2)
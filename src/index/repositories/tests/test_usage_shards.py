@@ -0,0 +1,188 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from index.repositories import (
+    BarcodeRepository,
+    TransactionRepository,
+    UsageCounterRepository,
+)
+from index.repositories.write_rate import WriteRateTracker
+from index.services.usage_limit import UsageLimitService
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class ShardedUsageCounterTest(DynamoDBTestMixin, TestCase):
+    """Hot barcodes count uses on shard items instead of the barcode row."""
+
+    def setUp(self):
+        super().setUp()
+        self.barcode = BarcodeRepository.create(
+            user_id=1,
+            barcode_value="hot-barcode",
+            barcode_type="DynamicBarcode",
+            share_with_others=True,
+        )
+        BarcodeRepository.update(
+            user_id=1, barcode_uuid=self.barcode["barcode_uuid"], total_usage=5
+        )
+
+    def _reload(self):
+        return BarcodeRepository.get_by_uuid(1, self.barcode["barcode_uuid"])
+
+    def _record(self, barcode, user_id, used_at):
+        return BarcodeRepository.record_usage(
+            barcode, user_id, cooldown_seconds=300, used_at=used_at.isoformat()
+        )
+
+    def test_sharded_uses_leave_base_count_alone(self):
+        self.assertFalse(BarcodeRepository.enable_usage_shards(1, "missing"))
+        self.assertTrue(
+            BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        )
+        self.assertFalse(
+            BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        )
+        barcode = self._reload()
+        now = timezone.now()
+
+        for user_id in (2, 3, 4):
+            self.assertTrue(self._record(barcode, user_id, now))
+
+        stored = self._reload()
+        self.assertEqual(int(stored["total_usage"]), 5)
+        self.assertEqual(UsageLimitService.total_usage(stored), 8)
+        self.assertEqual(
+            UsageCounterRepository.get_sharded_totals([stored]),
+            {self.barcode["barcode_uuid"]: 3},
+        )
+        self.assertEqual(
+            len(TransactionRepository.for_barcode(self.barcode["barcode_uuid"])), 3
+        )
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count(self.barcode["barcode_uuid"]), 3
+        )
+
+    @override_settings(USAGE_SHARD_LAST_USED_RESOLUTION_SECONDS=60)
+    def test_sharded_barcode_last_used_is_coarse(self):
+        BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        now = timezone.now()
+
+        self._record(self._reload(), 2, now)
+        self._record(self._reload(), 3, now + timedelta(seconds=30))
+        self.assertEqual(self._reload()["last_used"], now.isoformat())
+
+        later = now + timedelta(seconds=90)
+        self._record(self._reload(), 4, later)
+        self.assertEqual(self._reload()["last_used"], later.isoformat())
+
+    def test_deleted_sharded_barcode_records_nothing(self):
+        BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        now = timezone.now()
+        self.assertTrue(self._record(self._reload(), 2, now))
+        barcode = self._reload()
+        BarcodeRepository.delete(1, self.barcode["barcode_uuid"])
+
+        # last_used is fresh, so the barcode item is only condition-checked.
+        self.assertFalse(self._record(barcode, 3, now + timedelta(seconds=1)))
+        self.assertEqual(
+            len(TransactionRepository.for_barcode(self.barcode["barcode_uuid"])), 1
+        )
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count(self.barcode["barcode_uuid"]), 1
+        )
+
+    def test_delete_removes_usage_shards(self):
+        BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        now = timezone.now()
+        for user_id in (2, 3, 4):
+            self._record(self._reload(), user_id, now)
+        barcode = self._reload()
+
+        BarcodeRepository.delete(1, self.barcode["barcode_uuid"])
+
+        self.assertEqual(
+            UsageCounterRepository.get_sharded_totals([barcode]),
+            {self.barcode["barcode_uuid"]: 0},
+        )
+
+    def test_total_limit_counts_shards(self):
+        BarcodeRepository.update(
+            user_id=1, barcode_uuid=self.barcode["barcode_uuid"], total_usage_limit=7
+        )
+        BarcodeRepository.enable_usage_shards(1, self.barcode["barcode_uuid"], 4)
+        now = timezone.now()
+
+        self._record(self._reload(), 2, now)
+        self.assertTrue(UsageLimitService.check_total_limit(self._reload())[0])
+        self._record(self._reload(), 3, now)
+
+        allowed, msg = UsageLimitService.check_total_limit(self._reload())
+        self.assertFalse(allowed)
+        self.assertIn("Total usage limit of 7", msg)
+        stats = UsageLimitService.get_usage_stats(self._reload())
+        self.assertEqual(stats["total_used"], 7)
+        self.assertEqual(stats["total_remaining"], 0)
+
+    def test_unsharded_barcodes_cost_no_shard_reads(self):
+        with patch(
+            "index.repositories.usage_counter_repo.batch_get_items"
+        ) as mock_batch:
+            totals = UsageCounterRepository.get_sharded_totals([self._reload()])
+
+        self.assertEqual(totals, {})
+        mock_batch.assert_not_called()
+
+    @override_settings(
+        USAGE_SHARD_WRITES_PER_SECOND=0.2,
+        USAGE_SHARD_RATE_WINDOW_SECONDS=10,
+        USAGE_COUNTER_SHARDS=4,
+    )
+    def test_hot_barcode_is_sharded_automatically(self):
+        now = timezone.now()
+
+        self._record(self._reload(), 2, now)
+        self.assertNotIn("usage_shards", self._reload())
+        self._record(self._reload(), 3, now)
+
+        stored = self._reload()
+        self.assertEqual(int(stored["usage_shards"]), 4)
+        self.assertEqual(int(stored["total_usage"]), 7)
+
+        # Later uses land on the shards.
+        self._record(stored, 4, now)
+        self.assertEqual(int(self._reload()["total_usage"]), 7)
+        self.assertEqual(UsageLimitService.total_usage(self._reload()), 8)
+
+    @override_settings(USAGE_SHARD_WRITES_PER_SECOND=0.2, USAGE_COUNTER_SHARDS=4)
+    def test_cooldown_on_barcode_is_never_sharded(self):
+        now = timezone.now()
+        for i in range(3):
+            BarcodeRepository.record_usage(
+                self._reload(),
+                1,
+                cooldown_seconds=0,
+                cooldown_on_barcode=True,
+                used_at=(now + timedelta(seconds=i + 1)).isoformat(),
+            )
+
+        stored = self._reload()
+        self.assertNotIn("usage_shards", stored)
+        self.assertEqual(int(stored["total_usage"]), 8)
+
+
+class WriteRateTrackerTest(TestCase):
+    @override_settings(USAGE_SHARD_RATE_WINDOW_SECONDS=10)
+    def test_rate_resets_each_window(self):
+        tracker = WriteRateTracker()
+        with patch("index.repositories.write_rate.time.monotonic") as clock:
+            clock.return_value = 1000.0
+            tracker.reset()
+            self.assertEqual(tracker.record("a"), 0.1)
+            self.assertEqual(tracker.record("a"), 0.2)
+            self.assertEqual(tracker.record("b"), 0.1)
+
+            clock.return_value = 1010.0
+            self.assertEqual(tracker.record("a"), 0.1)
@@ -0,0 +1,144 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from index.repositories import (
+    TransactionRepository,
+    UsageCounterRepository,
+    transaction_repo,
+)
+from index.repositories.write_buffer import MAX_BATCH_ITEMS, WriteBehindBuffer
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail_next = 0
+
+    def __call__(self, items):
+        self.gate.wait(5)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("throttled")
+        self.batches.append(list(items))
+
+    @property
+    def items(self):
+        return [item for batch in self.batches for item in batch]
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@override_settings(
+    USAGE_ROLLUP_WRITE_BEHIND=True,
+    USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS=60,
+    USAGE_ROLLUP_BUFFER_MAX_ITEMS=50,
+    USAGE_ROLLUP_BUFFER_ENQUEUE_TIMEOUT_SECONDS=0.2,
+)
+class WriteBehindBufferTest(SimpleTestCase):
+    def setUp(self):
+        self.writer = RecordingWriter()
+        self.buffer = WriteBehindBuffer(self.writer, name="test")
+
+    def tearDown(self):
+        self.writer.gate.set()
+        self.buffer.close(timeout=1)
+
+    def test_full_batch_flushes_without_waiting_for_interval(self):
+        for i in range(MAX_BATCH_ITEMS + 3):
+            self.buffer.enqueue({"n": i})
+
+        self.assertTrue(_wait_for(lambda: len(self.writer.batches) == 1))
+        self.assertEqual(len(self.writer.batches[0]), MAX_BATCH_ITEMS)
+        self.assertEqual(len(self.buffer.pending()), 3)
+
+    @override_settings(USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS=0.05)
+    def test_partial_batch_flushes_after_interval(self):
+        self.buffer.enqueue({"n": 1})
+
+        self.assertTrue(_wait_for(lambda: self.writer.items == [{"n": 1}]))
+        self.assertEqual(self.buffer.pending(), [])
+
+    def test_pending_items_visible_until_flushed(self):
+        self.buffer.enqueue({"n": 1})
+        self.assertEqual(self.buffer.pending(), [{"n": 1}])
+
+        self.buffer.flush()
+
+        self.assertEqual(self.writer.items, [{"n": 1}])
+        self.assertEqual(self.buffer.pending(), [])
+
+    def test_full_buffer_applies_backpressure_then_writes_inline(self):
+        self.writer.gate.clear()  # DynamoDB stalls
+        for i in range(50):
+            self.buffer.enqueue({"n": i})
+
+        extra = threading.Thread(target=self.buffer.enqueue, args=({"n": "x"},))
+        extra.start()
+        time.sleep(0.1)
+        self.assertEqual(self.buffer.inline_writes, 0)  # still waiting for room
+        self.assertTrue(_wait_for(lambda: self.buffer.inline_writes == 1))
+
+        self.writer.gate.set()
+        extra.join(2)
+        self.buffer.flush()
+        self.assertEqual(len(self.writer.items), 51)
+        self.assertEqual(self.buffer.pending(), [])
+
+    def test_failed_batch_is_retried_in_order(self):
+        self.writer.fail_next = 1
+        self.buffer.enqueue({"n": 1})
+        self.buffer.enqueue({"n": 2})
+
+        self.buffer.flush()  # fails, keeps the batch
+        self.assertEqual(self.buffer.pending(), [{"n": 1}, {"n": 2}])
+        self.buffer.flush()
+
+        self.assertEqual(self.writer.items, [{"n": 1}, {"n": 2}])
+
+    def test_close_writes_remaining_items(self):
+        for i in range(3):
+            self.buffer.enqueue({"n": i})
+
+        self.buffer.close()
+
+        self.assertEqual(len(self.writer.items), 3)
+
+    @override_settings(USAGE_ROLLUP_WRITE_BEHIND=False)
+    def test_disabled_buffer_writes_synchronously(self):
+        self.buffer.enqueue({"n": 1})
+
+        self.assertEqual(self.writer.batches, [[{"n": 1}]])
+        self.assertEqual(self.buffer.pending(), [])
+
+
+@override_settings(
+    USAGE_ROLLUP_WRITE_BEHIND=True, USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS=60
+)
+class BufferedRollupTest(DynamoDBTestMixin, TestCase):
+    def tearDown(self):
+        transaction_repo._rollup_buffer.reset()
+        super().tearDown()
+
+    def test_rollups_are_written_when_the_buffer_flushes(self):
+        item, _actions = TransactionRepository.usage_actions(
+            user_id=1, barcode_uuid="bc-1"
+        )
+        TransactionRepository.count_rollups(item)
+
+        self.assertEqual(UsageCounterRepository.get_day_totals(), {})
+
+        TransactionRepository.flush_buffered()
+
+        self.assertEqual(sum(UsageCounterRepository.get_day_totals().values()), 1)
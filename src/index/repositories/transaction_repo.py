@@ -6,13 +6,29 @@ Handles append-only transaction logging with per-user and per-barcode queries.
 
 from __future__ import annotations
 
+import logging
 import uuid
+from collections import Counter
 from typing import Optional
 
 from boto3.dynamodb.conditions import Key
 from django.utils import timezone
 
-from core.dynamodb.client import get_table, query_all, query_limited
+from core.dynamodb.client import QueryStream, get_table, iter_pages, iter_query
+from core.dynamodb.concurrency import map_concurrent
+from index.repositories.usage_counter_repo import (
+    UsageCounterRepository,
+    daily_increment_action,
+    local_day,
+    rollup_day,
+)
+from index.repositories.write_buffer import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+# Attributes that make up a cursor into the table and BarcodeTransactionIndex.
+TRANSACTION_KEY_NAMES = ("user_id", "sk")
+BARCODE_TRANSACTION_KEY_NAMES = ("barcode_uuid", "time_created", "user_id", "sk")
 
 
 def _now_iso() -> str:
@@ -23,6 +39,57 @@ def _table():
     return get_table("transactions")
 
 
+def _new_item(
+    user_id,
+    barcode_uuid: str = None,
+    barcode_value: str = None,
+    time_created=None,
+    barcode_owner_id=None,
+) -> dict:
+    now = time_created or _now_iso()
+    item = {
+        "user_id": str(user_id),
+        "sk": f"TXN#{now}#{uuid.uuid4()}",
+        "time_created": now,
+    }
+    if barcode_uuid:
+        item["barcode_uuid"] = str(barcode_uuid)
+    if barcode_value:
+        item["barcode_value"] = barcode_value
+    if barcode_uuid and barcode_owner_id is not None:
+        # Lets readers fetch the barcode by its primary key.
+        item["barcode_owner_id"] = str(barcode_owner_id)
+    return item
+
+
+def _write_items(items: list[dict]) -> None:
+    """Batch-write transaction items and add them to the usage counters."""
+    daily_counts: Counter = Counter()
+    rollup_counts: Counter = Counter()
+    with _table().batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
+            now = item["time_created"]
+            if item.get("barcode_uuid"):
+                daily_counts[(item["barcode_uuid"], local_day(now))] += 1
+            rollup_counts[(rollup_day(now), item.get("barcode_uuid"))] += 1
+
+    for (bc_uuid, day), count in daily_counts.items():
+        UsageCounterRepository.increment_daily(bc_uuid, day, amount=count)
+    if rollup_counts:
+        UsageCounterRepository.increment_rollups(rollup_counts)
+
+
+def _write_rollups(items: list[dict]) -> None:
+    UsageCounterRepository.increment_rollups(
+        Counter((rollup_day(i["time_created"]), i.get("barcode_uuid")) for i in items)
+    )
+
+
+# Rollups of transactions written transactionally (see usage_actions()).
+_rollup_buffer = WriteBehindBuffer(_write_rollups, name="usage-rollups")
+
+
 class TransactionRepository:
     """Data access for the MobileID-Transactions DynamoDB table."""
 
@@ -36,60 +103,87 @@ class TransactionRepository:
         barcode_uuid: str = None,
         barcode_value: str = None,
         time_created: str = None,
+        barcode_owner_id: int = None,
     ) -> dict:
-        """Create a single transaction record."""
-        now = time_created or _now_iso()
-        txn_id = str(uuid.uuid4())
-        sk = f"TXN#{now}#{txn_id}"
-
-        item = {
-            "user_id": str(user_id),
-            "sk": sk,
-            "time_created": now,
-        }
-
-        if barcode_uuid:
-            item["barcode_uuid"] = str(barcode_uuid)
-        if barcode_value:
-            item["barcode_value"] = barcode_value
+        """
+        Create a single transaction record.
 
+        Also bumps the barcode's materialized daily usage counter and the
+        analytics rollups (buffered, see count_rollups()).
+        """
+        item = _new_item(
+            user_id, barcode_uuid, barcode_value, time_created, barcode_owner_id
+        )
         _table().put_item(Item=item)
+        if barcode_uuid:
+            UsageCounterRepository.increment_daily(
+                item["barcode_uuid"], local_day(item["time_created"])
+            )
+        TransactionRepository.count_rollups(item)
         return item
 
     @staticmethod
-    def bulk_create(items: list[dict], batch_size: int = 25) -> list[dict]:
+    def usage_actions(
+        user_id: int,
+        barcode_uuid: str,
+        barcode_value: str = None,
+        time_created: str = None,
+        barcode_owner_id: int = None,
+    ) -> tuple[dict, list[dict]]:
         """
-        Batch write transactions. DynamoDB limit is 25 per batch.
+        Build a transaction item and the transact_write_items() actions that
+        store it and bump the barcode's daily counter.
 
-        Each item dict should have: user_id, barcode_uuid (optional),
-        barcode_value (optional), time_created (optional).
+        For callers that commit the transaction together with other writes.
+        Once the write succeeds, pass the item to count_rollups().
         """
-        created = []
-        table = _table()
-
-        with table.batch_writer() as batch:
-            for item_data in items:
-                now = item_data.get("time_created") or _now_iso()
-                txn_id = str(uuid.uuid4())
-                sk = f"TXN#{now}#{txn_id}"
-
-                item = {
-                    "user_id": str(item_data["user_id"]),
-                    "sk": sk,
-                    "time_created": now,
+        item = _new_item(
+            user_id, barcode_uuid, barcode_value, time_created, barcode_owner_id
+        )
+        actions = [
+            {
+                "Put": {
+                    "table": "transactions",
+                    "Item": item,
+                    "ConditionExpression": "attribute_not_exists(sk)",
                 }
+            },
+            daily_increment_action(
+                item["barcode_uuid"], local_day(item["time_created"])
+            ),
+        ]
+        return item, actions
 
-                barcode_uuid = item_data.get("barcode_uuid")
-                if barcode_uuid:
-                    item["barcode_uuid"] = str(barcode_uuid)
+    @staticmethod
+    def count_rollups(item: dict) -> None:
+        """Add a written transaction to the rollups (buffered)."""
+        _rollup_buffer.enqueue(item)
 
-                barcode_value = item_data.get("barcode_value")
-                if barcode_value:
-                    item["barcode_value"] = barcode_value
+    @staticmethod
+    def flush_buffered() -> None:
+        """Write every buffered rollup now."""
+        _rollup_buffer.flush()
 
-                batch.put_item(Item=item)
-                created.append(item)
+    @staticmethod
+    def bulk_create(items: list[dict], batch_size: int = 25) -> list[dict]:
+        """
+        Batch write transactions. DynamoDB limit is 25 per batch.
 
+        Each item dict should have: user_id, barcode_uuid (optional),
+        barcode_value (optional), time_created (optional),
+        barcode_owner_id (optional).
+        """
+        created = [
+            _new_item(
+                item_data["user_id"],
+                item_data.get("barcode_uuid"),
+                item_data.get("barcode_value"),
+                item_data.get("time_created"),
+                item_data.get("barcode_owner_id"),
+            )
+            for item_data in items
+        ]
+        _write_items(created)
         return created
 
     # ------------------------------------------------------------------
@@ -97,17 +191,20 @@ class TransactionRepository:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def for_user(
+    def iter_for_user(
         user_id: int,
         since: str = None,
         until: str = None,
-        limit: int = None,
-    ) -> list[dict]:
+        cursor: dict = None,
+        **stream_kwargs,
+    ) -> QueryStream:
         """
-        Query transactions for a user, ordered by time descending.
+        Stream transactions for a user, newest first, a page at a time.
 
         SK format is TXN#<iso_time>#<uuid>, so we push time range into
         the KeyConditionExpression for efficient server-side filtering.
+        Resume from a previous stream's ``cursor``; *stream_kwargs* (e.g.
+        max_items, Limit) go to iter_query().
         """
         sk_condition = Key("sk").begins_with("TXN#")
         if since and until:
@@ -120,20 +217,36 @@ class TransactionRepository:
         kwargs = {
             "KeyConditionExpression": Key("user_id").eq(str(user_id)) & sk_condition,
             "ScanIndexForward": False,
+            "key_names": TRANSACTION_KEY_NAMES,
+            **stream_kwargs,
         }
-
-        if limit:
-            return query_limited(_table(), limit, **kwargs)
-        return query_all(_table(), **kwargs)
+        if cursor:
+            kwargs["ExclusiveStartKey"] = cursor
+        return iter_query(_table(), **kwargs)
 
     @staticmethod
-    def for_barcode(
-        barcode_uuid: str,
+    def for_user(
+        user_id: int,
         since: str = None,
         until: str = None,
         limit: int = None,
     ) -> list[dict]:
-        """GSI1 query: transactions for a specific barcode."""
+        """Query transactions for a user, ordered by time descending."""
+        return list(
+            TransactionRepository.iter_for_user(
+                user_id, since, until, max_items=limit or None
+            )
+        )
+
+    @staticmethod
+    def iter_for_barcode(
+        barcode_uuid: str,
+        since: str = None,
+        until: str = None,
+        cursor: dict = None,
+        **stream_kwargs,
+    ) -> QueryStream:
+        """GSI1 query: stream transactions for a specific barcode, newest first."""
         key_expr = Key("barcode_uuid").eq(str(barcode_uuid))
         if since and until:
             key_expr = key_expr & Key("time_created").between(since, until)
@@ -146,11 +259,46 @@ class TransactionRepository:
             "IndexName": "BarcodeTransactionIndex",
             "KeyConditionExpression": key_expr,
             "ScanIndexForward": False,
+            "key_names": BARCODE_TRANSACTION_KEY_NAMES,
+            **stream_kwargs,
         }
+        if cursor:
+            kwargs["ExclusiveStartKey"] = cursor
+        return iter_query(_table(), **kwargs)
 
-        if limit:
-            return query_limited(_table(), limit, **kwargs)
-        return query_all(_table(), **kwargs)
+    @staticmethod
+    def for_barcode(
+        barcode_uuid: str,
+        since: str = None,
+        until: str = None,
+        limit: int = None,
+    ) -> list[dict]:
+        """GSI1 query: transactions for a specific barcode."""
+        return list(
+            TransactionRepository.iter_for_barcode(
+                barcode_uuid, since, until, max_items=limit or None
+            )
+        )
+
+    @staticmethod
+    def recent_for_barcodes(barcode_uuids: list[str], limit: int = 3) -> dict:
+        """
+        Return {barcode_uuid: [latest transactions]} for many barcodes.
+
+        DynamoDB has no batch query, so the per-barcode GSI queries run
+        concurrently on the shared DynamoDB pool. A barcode whose query
+        fails maps to None so callers can fall back per item.
+        """
+        uuids = list(dict.fromkeys(str(u) for u in barcode_uuids))
+
+        def _fetch(bc_uuid):
+            try:
+                return TransactionRepository.for_barcode(bc_uuid, limit=limit)
+            except Exception:
+                logger.exception("Error fetching transactions for barcode %s", bc_uuid)
+                return None
+
+        return dict(zip(uuids, map_concurrent(_fetch, uuids)))
 
     @staticmethod
     def count_for_barcode_since(barcode_uuid: str, since: str) -> int:
@@ -169,14 +317,9 @@ class TransactionRepository:
             ),
             "Select": "COUNT",
         }
-        total = 0
-        while True:
-            resp = _table().query(**query_kwargs)
-            total += resp.get("Count", 0)
-            last_key = resp.get("LastEvaluatedKey")
-            if not last_key:
-                return total
-            query_kwargs["ExclusiveStartKey"] = last_key
+        return sum(
+            resp.get("Count", 0) for resp in iter_pages(_table(), **query_kwargs)
+        )
 
     @staticmethod
     def recent_user_barcode_usage(user_id: int, barcode_uuid: str, since: str) -> bool:
@@ -197,14 +340,11 @@ class TransactionRepository:
             "ProjectionExpression": "barcode_uuid",
             "ScanIndexForward": False,
         }
-        while True:
-            resp = _table().query(**query_kwargs)
-            if resp.get("Count", 0) > 0:
-                return True
-            last_key = resp.get("LastEvaluatedKey")
-            if not last_key:
-                return False
-            query_kwargs["ExclusiveStartKey"] = last_key
+        # Usually settled by the first page: read later ones only on demand.
+        return any(
+            resp.get("Count", 0) > 0
+            for resp in iter_pages(_table(), prefetch=False, **query_kwargs)
+        )
 
     @staticmethod
     def recent_user_usage(user_id: int, since: str) -> Optional[dict]:
@@ -0,0 +1,445 @@
+"""
+Repository for DynamoDB UsageCounters table operations.
+
+Materialized per-barcode daily usage counters:
+- DailyUsage: PK=BARCODE#<barcode_uuid>, SK=DAY#<YYYY-MM-DD>
+
+The day is the local calendar date (settings.TIME_ZONE) of the transaction,
+so a daily limit check is a single GetItem instead of a COUNT query over the
+BarcodeTransactionIndex GSI.
+
+Permanent usage rollups for admin analytics, bucketed by the date part of
+the stored time_created (UTC), like the scan-based analytics:
+- DayBarcodeRollup: PK=ROLLUP#<YYYY-MM-DD>,      SK=BARCODE#<barcode_uuid>
+- DayRollup:        PK=ROLLUP#DAYS#<0..K-1>,    SK=DAY#<YYYY-MM-DD>
+
+Day totals count every transaction; per-barcode rollups only those with a
+barcode. Every use adds to its day's total, so the total is split over
+DAY_ROLLUP_SHARDS partitions and summed on read.
+
+Per-(user, barcode) cooldown markers, expired by TTL once the cooldown ends:
+- LastUse: PK=USER#<user_id>, SK=LASTUSE#<barcode_uuid>
+
+Total usage of hot barcodes (barcode item has usage_shards = K) is split over
+K counters; the total is the barcode's total_usage plus every shard:
+- UsageShard: PK=TOTAL#<barcode_uuid>, SK=SHARD#<0..K-1>
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from boto3.dynamodb.conditions import Attr, Key
+from django.utils import timezone
+
+from core.dynamodb.client import batch_get_items, get_table, iter_query
+from core.dynamodb.concurrency import map_concurrent
+
+# Counters only back "today" checks; keep a month of history for repairs and
+# let DynamoDB TTL clean up the rest.
+DAILY_COUNTER_RETENTION_DAYS = 35
+
+# Partitions each day total is spread over; reads query all of them.
+DAY_ROLLUP_SHARDS = 8
+
+
+def _table():
+    return get_table("usage_counters")
+
+
+def _daily_key(barcode_uuid: str, day: str) -> dict:
+    return {"pk": f"BARCODE#{barcode_uuid}", "sk": f"DAY#{day}"}
+
+
+def _daily_expires_at(day: str) -> int:
+    """Epoch seconds after which a daily counter may be expired by TTL."""
+    start_local = datetime.combine(
+        date.fromisoformat(day), time.min, tzinfo=timezone.get_current_timezone()
+    )
+    expires = start_local + timedelta(days=DAILY_COUNTER_RETENTION_DAYS + 1)
+    return int(expires.timestamp())
+
+
+def _day_rollup_key(day: str, shard: int) -> dict:
+    return {"pk": f"ROLLUP#DAYS#{shard}", "sk": f"DAY#{day}"}
+
+
+def _barcode_rollup_key(day: str, barcode_uuid: str) -> dict:
+    return {"pk": f"ROLLUP#{day}", "sk": f"BARCODE#{barcode_uuid}"}
+
+
+def _last_use_key(user_id, barcode_uuid: str) -> dict:
+    return {"pk": f"USER#{user_id}", "sk": f"LASTUSE#{barcode_uuid}"}
+
+
+def _daily_increment(barcode_uuid: str, day: str, amount: int = 1) -> dict:
+    """UpdateItem parameters adding *amount* to a daily counter."""
+    return {
+        "Key": _daily_key(barcode_uuid, day),
+        "UpdateExpression": (
+            "ADD usage_count :inc "
+            "SET barcode_uuid = :bc, usage_date = :day, "
+            "expires_at = if_not_exists(expires_at, :exp)"
+        ),
+        "ExpressionAttributeValues": {
+            ":inc": Decimal(amount),
+            ":bc": barcode_uuid,
+            ":day": day,
+            ":exp": _daily_expires_at(day),
+        },
+    }
+
+
+def _last_use_update(
+    user_id, barcode_uuid: str, used_at: str, cooldown_seconds: int
+) -> dict:
+    """
+    UpdateItem parameters recording *used_at* as the last use, conditional on
+    the previous use being at least *cooldown_seconds* old. TTL deletion lags,
+    so the condition checks last_used rather than relying on expired markers
+    being gone.
+    """
+    used = datetime.fromisoformat(used_at)
+    cutoff = (used - timedelta(seconds=cooldown_seconds)).isoformat()
+    return {
+        "Key": _last_use_key(user_id, barcode_uuid),
+        "UpdateExpression": "SET last_used = :now, expires_at = :exp",
+        "ConditionExpression": (
+            "attribute_not_exists(last_used) OR last_used < :cutoff"
+        ),
+        "ExpressionAttributeValues": {
+            ":now": used_at,
+            ":cutoff": cutoff,
+            ":exp": int(used.timestamp()) + int(cooldown_seconds),
+        },
+    }
+
+
+def daily_increment_action(barcode_uuid: str, day: str) -> dict:
+    """transact_write_items() action adding one use to a daily counter."""
+    return {
+        "Update": {
+            "table": "usage_counters",
+            **_daily_increment(str(barcode_uuid), day),
+        }
+    }
+
+
+def last_use_action(
+    user_id, barcode_uuid: str, used_at: str, cooldown_seconds: int
+) -> dict:
+    """transact_write_items() action setting a conditional cooldown marker."""
+    return {
+        "Update": {
+            "table": "usage_counters",
+            **_last_use_update(user_id, barcode_uuid, used_at, cooldown_seconds),
+        }
+    }
+
+
+def _usage_shard_key(barcode_uuid: str, shard: int) -> dict:
+    return {"pk": f"TOTAL#{barcode_uuid}", "sk": f"SHARD#{shard}"}
+
+
+def usage_shard_action(barcode_uuid: str, shards: int) -> dict:
+    """transact_write_items() action adding one use to a random usage shard."""
+    return {
+        "Update": {
+            "table": "usage_counters",
+            "Key": _usage_shard_key(str(barcode_uuid), random.randrange(shards)),
+            "UpdateExpression": "ADD usage_count :inc",
+            "ExpressionAttributeValues": {":inc": Decimal("1")},
+        }
+    }
+
+
+def rollup_day(time_created: str) -> str:
+    """Return the rollup bucket (YYYY-MM-DD) for a stored time_created."""
+    return time_created[:10]
+
+
+def local_day(time_created: str = None) -> str:
+    """Return the local YYYY-MM-DD bucket for an ISO timestamp (default: today)."""
+    if not time_created:
+        return timezone.localdate().isoformat()
+    dt = datetime.fromisoformat(time_created)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return timezone.localtime(dt).date().isoformat()
+
+
+class UsageCounterRepository:
+    """Data access for the MobileID-UsageCounters DynamoDB table."""
+
+    @staticmethod
+    def get_daily_count(barcode_uuid: str, day: str = None) -> int:
+        """Return the usage count for a barcode on *day* (default: today)."""
+        resp = _table().get_item(
+            Key=_daily_key(str(barcode_uuid), day or local_day()),
+            ProjectionExpression="usage_count",
+        )
+        return int(resp.get("Item", {}).get("usage_count", 0))
+
+    @staticmethod
+    def get_daily_counts(barcode_uuids: Iterable[str], day: str = None) -> dict:
+        """
+        Return {barcode_uuid: count} for many barcodes via BatchGetItem.
+
+        Barcodes without a counter item map to 0.
+        """
+        day = day or local_day()
+        uuids = list(dict.fromkeys(str(u) for u in barcode_uuids))
+        counts = {u: 0 for u in uuids}
+        if not uuids:
+            return counts
+
+        items = batch_get_items(
+            "usage_counters",
+            [_daily_key(u, day) for u in uuids],
+            projection="barcode_uuid, usage_count",
+        )
+        for item in items:
+            counts[item["barcode_uuid"]] = int(item.get("usage_count", 0))
+        return counts
+
+    @staticmethod
+    def increment_daily(barcode_uuid: str, day: str = None, amount: int = 1) -> None:
+        """Atomically add *amount* to the daily counter for *day* (default: today)."""
+        _table().update_item(
+            **_daily_increment(str(barcode_uuid), day or local_day(), amount)
+        )
+
+    @staticmethod
+    def put_daily_counts(counts: Iterable[tuple[str, str, int]]) -> int:
+        """
+        Overwrite daily counters from (barcode_uuid, day, count) tuples.
+
+        Used by the backfill command; returns the number of items written.
+        """
+        written = 0
+        with _table().batch_writer() as batch:
+            for barcode_uuid, day, count in counts:
+                batch.put_item(
+                    Item={
+                        **_daily_key(str(barcode_uuid), day),
+                        "barcode_uuid": str(barcode_uuid),
+                        "usage_date": day,
+                        "usage_count": Decimal(int(count)),
+                        "expires_at": _daily_expires_at(day),
+                    }
+                )
+                written += 1
+        return written
+
+    @staticmethod
+    def get_daily_counter_keys(first_day: str) -> set[tuple[str, str]]:
+        """
+        Return {(barcode_uuid, day)} for every daily counter on or after
+        *first_day*.
+
+        Scans the whole table; used by the backfill command.
+        """
+        table = _table()
+        scan_kwargs = {
+            "ProjectionExpression": "barcode_uuid, usage_date",
+            "FilterExpression": Attr("pk").begins_with("BARCODE#")
+            & Attr("sk").gte(f"DAY#{first_day}"),
+        }
+        keys = set()
+        while True:
+            resp = table.scan(**scan_kwargs)
+            for item in resp.get("Items", []):
+                keys.add((item["barcode_uuid"], item["usage_date"]))
+            last_key = resp.get("LastEvaluatedKey")
+            if not last_key:
+                return keys
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+    @staticmethod
+    def mark_use_if_cooled_down(
+        user_id, barcode_uuid: str, used_at: str, cooldown_seconds: int
+    ) -> bool:
+        """
+        Record *used_at* as the user's last use of a barcode, unless the
+        previous use is less than *cooldown_seconds* old.
+
+        One conditional UpdateItem; returns False without writing when the
+        cooldown is still active.
+        """
+        table = _table()
+        try:
+            table.update_item(
+                **_last_use_update(user_id, barcode_uuid, used_at, cooldown_seconds)
+            )
+        except table.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Sharded usage totals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def increment_usage_shard(barcode_uuid: str, shards: int) -> None:
+        """Add one use to a random one of *shards* usage counters."""
+        params = usage_shard_action(barcode_uuid, shards)["Update"]
+        del params["table"]
+        _table().update_item(**params)
+
+    @staticmethod
+    def delete_usage_shards(barcode_uuid: str, shards: int) -> None:
+        """Delete the *shards* usage counters of a deleted barcode."""
+        with _table().batch_writer() as batch:
+            for shard in range(int(shards)):
+                batch.delete_item(Key=_usage_shard_key(str(barcode_uuid), shard))
+
+    @staticmethod
+    def get_sharded_totals(barcodes: Iterable[dict]) -> dict:
+        """
+        Return {barcode_uuid: sum of its usage shards} for the sharded
+        barcodes among *barcodes*, in one strongly consistent BatchGetItem.
+
+        Barcodes without usage_shards are omitted and cost nothing.
+        """
+        keys = []
+        totals = {}
+        for barcode in barcodes:
+            shards = int(barcode.get("usage_shards") or 0)
+            if not shards or not barcode.get("barcode_uuid"):
+                continue
+            bc_uuid = str(barcode["barcode_uuid"])
+            if bc_uuid in totals:
+                continue
+            totals[bc_uuid] = 0
+            keys.extend(_usage_shard_key(bc_uuid, n) for n in range(shards))
+        if not keys:
+            return totals
+
+        items = batch_get_items(
+            "usage_counters", keys, projection="pk, usage_count", consistent=True
+        )
+        for item in items:
+            totals[item["pk"][len("TOTAL#") :]] += int(item.get("usage_count", 0))
+        return totals
+
+    # ------------------------------------------------------------------
+    # Analytics rollups
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def increment_rollups(counts: dict) -> None:
+        """
+        Add transaction counts to the rollups.
+
+        *counts* maps (day, barcode_uuid or None) to a count; days come from
+        rollup_day(). Each day total goes to a random one of its
+        DAY_ROLLUP_SHARDS items.
+        """
+        day_totals: Counter = Counter()
+        table = _table()
+        for (day, barcode_uuid), count in counts.items():
+            day_totals[day] += count
+            if barcode_uuid:
+                table.update_item(
+                    Key=_barcode_rollup_key(day, barcode_uuid),
+                    UpdateExpression="ADD usage_count :inc",
+                    ExpressionAttributeValues={":inc": Decimal(count)},
+                )
+        for day, count in day_totals.items():
+            table.update_item(
+                Key=_day_rollup_key(day, random.randrange(DAY_ROLLUP_SHARDS)),
+                UpdateExpression="ADD usage_count :inc",
+                ExpressionAttributeValues={":inc": Decimal(count)},
+            )
+
+    @staticmethod
+    def get_day_totals(
+        first_day: Optional[str] = None, last_day: Optional[str] = None
+    ) -> dict:
+        """Return {day: count} for days with usage in [first_day, last_day]."""
+        if first_day and last_day and first_day > last_day:
+            return {}
+        if first_day and last_day:
+            sk_condition = Key("sk").between(f"DAY#{first_day}", f"DAY#{last_day}")
+        elif first_day:
+            sk_condition = Key("sk").gte(f"DAY#{first_day}")
+        elif last_day:
+            sk_condition = Key("sk").lte(f"DAY#{last_day}")
+        else:
+            sk_condition = Key("sk").begins_with("DAY#")
+        table = _table()
+
+        def _fetch(shard):
+            return list(
+                iter_query(
+                    table,
+                    KeyConditionExpression=Key("pk").eq(f"ROLLUP#DAYS#{shard}")
+                    & sk_condition,
+                    ProjectionExpression="sk, usage_count",
+                )
+            )
+
+        totals: Counter = Counter()
+        for items in map_concurrent(_fetch, range(DAY_ROLLUP_SHARDS)):
+            for item in items:
+                totals[item["sk"][len("DAY#") :]] += int(item.get("usage_count", 0))
+        return dict(totals)
+
+    @staticmethod
+    def get_barcode_rollups(days: Iterable[str]) -> dict:
+        """Return {day: {barcode_uuid: count}}, one concurrent query per day."""
+        days = list(dict.fromkeys(days))
+        table = _table()
+
+        def _fetch(day):
+            items = iter_query(
+                table,
+                KeyConditionExpression=Key("pk").eq(f"ROLLUP#{day}"),
+                ProjectionExpression="sk, usage_count",
+            )
+            return {
+                item["sk"][len("BARCODE#") :]: int(item.get("usage_count", 0))
+                for item in items
+            }
+
+        return dict(zip(days, map_concurrent(_fetch, days)))
+
+    @staticmethod
+    def replace_rollups(
+        day_totals: dict, barcode_counts: dict, stale: Iterable[tuple] = ()
+    ) -> int:
+        """
+        Overwrite rollups: day_totals {day: n}, barcode_counts
+        {(day, barcode_uuid): n}. *stale* (day, barcode_uuid or None) rollups
+        are deleted; None selects the day total. A day total is written to
+        its first shard and its other shards are deleted. Returns items
+        written.
+        """
+        written = 0
+        with _table().batch_writer() as batch:
+            for day, count in day_totals.items():
+                batch.put_item(
+                    Item={**_day_rollup_key(day, 0), "usage_count": Decimal(int(count))}
+                )
+                for shard in range(1, DAY_ROLLUP_SHARDS):
+                    batch.delete_item(Key=_day_rollup_key(day, shard))
+                written += 1
+            for (day, barcode_uuid), count in barcode_counts.items():
+                batch.put_item(
+                    Item={
+                        **_barcode_rollup_key(day, barcode_uuid),
+                        "usage_count": Decimal(int(count)),
+                    }
+                )
+                written += 1
+            for day, barcode_uuid in stale:
+                if barcode_uuid:
+                    batch.delete_item(Key=_barcode_rollup_key(day, barcode_uuid))
+                    continue
+                for shard in range(DAY_ROLLUP_SHARDS):
+                    batch.delete_item(Key=_day_rollup_key(day, shard))
+        return written
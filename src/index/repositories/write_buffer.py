@@ -0,0 +1,212 @@
+"""
+Per-worker write-behind buffer for append-only items.
+
+Writes that need not be visible to the request that caused them, such as
+analytics rollups, would otherwise put extra DynamoDB round trips on every
+generate request. The request only enqueues the item and a background
+thread flushes batches of up to 25 once a batch is full or its oldest item
+is older than the flush interval.
+
+Guarantees:
+- Memory is bounded by the max-pending setting. While DynamoDB is slow or
+  failing the buffer fills up; enqueue then blocks for up to the enqueue
+  timeout and finally writes the item inline, so requests slow down instead
+  of items being dropped.
+- Failed batches are retried in order with backoff.
+- Pending items are flushed at interpreter exit (gunicorn's graceful worker
+  shutdown). A killed worker loses what was still pending.
+- With write-behind disabled (the test default) every enqueue writes
+  synchronously.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = 25
+RETRY_BACKOFF_SECONDS = (0.1, 0.5, 1.0, 2.0, 5.0)
+
+
+class WriteBehindBuffer:
+    """Bounded queue flushed to *writer* in batches by a daemon thread."""
+
+    def __init__(self, writer: Callable[[list[dict]], None], *, name: str):
+        self._writer = writer
+        self._name = name
+        self._cond = threading.Condition()
+        # (enqueued_at, item), oldest first
+        self._pending: deque[tuple[float, dict]] = deque()
+        self._in_flight: list[tuple[float, dict]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._exit_hook = False
+        self._failures = 0
+        self.flushed = 0
+        self.inline_writes = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(settings, "USAGE_ROLLUP_WRITE_BEHIND", False))
+
+    @staticmethod
+    def flush_interval() -> float:
+        return float(getattr(settings, "USAGE_ROLLUP_FLUSH_INTERVAL_SECONDS", 1.0))
+
+    @staticmethod
+    def max_pending() -> int:
+        return max(
+            MAX_BATCH_ITEMS, int(getattr(settings, "USAGE_ROLLUP_BUFFER_MAX_ITEMS", 0))
+        )
+
+    @staticmethod
+    def enqueue_timeout() -> float:
+        return float(
+            getattr(settings, "USAGE_ROLLUP_BUFFER_ENQUEUE_TIMEOUT_SECONDS", 2.0)
+        )
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+
+    def enqueue(self, item: dict) -> None:
+        """Queue *item* for writing; blocks briefly when the buffer is full."""
+        if not self.enabled():
+            self._writer([item])
+            return
+
+        deadline = time.monotonic() + self.enqueue_timeout()
+        with self._cond:
+            self._ensure_thread()
+            while not self._has_room():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._closed:
+                    break
+                self._cond.wait(remaining)
+            if self._has_room() and not self._closed:
+                self._pending.append((time.monotonic(), item))
+                self._cond.notify_all()
+                return
+
+        # Still full after waiting: DynamoDB is not keeping up. Pay for this
+        # write on the request rather than grow without bound.
+        logger.warning("%s buffer full; writing inline", self._name)
+        self.inline_writes += 1
+        self._writer([item])
+
+    def pending(self) -> list[dict]:
+        """Snapshot of items accepted but not yet written, oldest first."""
+        with self._cond:
+            return [item for _, item in (*self._in_flight, *self._pending)]
+
+    def flush(self) -> None:
+        """Write everything pending from the calling thread."""
+        while True:
+            with self._cond:
+                # Let an in-flight background batch finish first.
+                while self._in_flight:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch = self._take_batch()
+            if not self._write(batch):
+                # Logged by _write; the batch stays pending for a later flush.
+                return
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and write what is left (registered at exit)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+        left = len(self.pending())
+        if left:
+            logger.error("%s buffer closed with %d unwritten items", self._name, left)
+
+    def reset(self) -> None:
+        """Drop pending items and reopen (tests only)."""
+        with self._cond:
+            self._pending.clear()
+            self._closed = False
+            self._failures = 0
+            self.flushed = 0
+            self.inline_writes = 0
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _has_room(self) -> bool:
+        return len(self._pending) + len(self._in_flight) < self.max_pending()
+
+    def _ensure_thread(self) -> None:
+        """Start the flusher on first use. Caller holds the lock."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name=f"{self._name}-flusher", daemon=True
+        )
+        self._thread.start()
+        if not self._exit_hook:
+            atexit.register(self.close)
+            self._exit_hook = True
+
+    def _take_batch(self) -> list[tuple[float, dict]]:
+        """Pop up to one batch into _in_flight. Caller holds the lock."""
+        count = min(MAX_BATCH_ITEMS, len(self._pending))
+        self._in_flight = [self._pending.popleft() for _ in range(count)]
+        return self._in_flight
+
+    def _write(self, batch: list[tuple[float, dict]]) -> bool:
+        try:
+            self._writer([item for _, item in batch])
+        except Exception:
+            logger.exception("%s flush of %d items failed", self._name, len(batch))
+            with self._cond:
+                self._pending.extendleft(reversed(batch))
+                self._in_flight = []
+                self._failures += 1
+                self._cond.notify_all()
+            return False
+        with self._cond:
+            self._in_flight = []
+            self._failures = 0
+            self.flushed += len(batch)
+            self._cond.notify_all()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if len(self._pending) >= MAX_BATCH_ITEMS:
+                        break
+                    if self._pending:
+                        due = self._pending[0][0] + self.flush_interval()
+                        remaining = due - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._closed:
+                    # close() flushes the remainder on its own thread.
+                    return
+                batch = self._take_batch()
+
+            if not self._write(batch):
+                backoff = RETRY_BACKOFF_SECONDS[
+                    min(self._failures, len(RETRY_BACKOFF_SECONDS)) - 1
+                ]
+                time.sleep(backoff)
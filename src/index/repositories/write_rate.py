@@ -0,0 +1,47 @@
+"""
+Per-worker write-rate tracking used to spot hot keys.
+
+Writes are counted per key in fixed windows of
+USAGE_SHARD_RATE_WINDOW_SECONDS; counts reset when a window ends, so memory
+is bounded by the keys written within one window. Each gunicorn worker only
+sees its own share of the traffic, so rates (and thresholds compared with
+them) are per worker.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from typing import Hashable
+
+from django.conf import settings
+
+
+class WriteRateTracker:
+    """Counts writes per key and reports each key's rate in the current window."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._counts: Counter = Counter()
+
+    @staticmethod
+    def window_seconds() -> float:
+        return max(1.0, float(getattr(settings, "USAGE_SHARD_RATE_WINDOW_SECONDS", 10)))
+
+    def record(self, key: Hashable) -> float:
+        """Count one write to *key*; return its writes per second this window."""
+        window = self.window_seconds()
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= window:
+                self._counts.clear()
+                self._window_start = now
+            self._counts[key] += 1
+            return self._counts[key] / window
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self._window_start = time.monotonic()
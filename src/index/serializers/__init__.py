@@ -1,4 +1,4 @@
-from .barcode import BarcodeSerializer  # noqa: F401
+from .barcode import BarcodeSerializer, prefetch_barcode_activity  # noqa: F401
 from .barcode_create import (  # noqa: F401
     BarcodeCreateSerializer,
     DynamicBarcodeWithProfileSerializer,
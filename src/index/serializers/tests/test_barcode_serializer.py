@@ -132,3 +132,42 @@ class BarcodeSerializerTest(DynamoDBTestMixin, TestCase):
             self.assertIn("id", entry)
             self.assertIn("user", entry)
             self.assertIn("time_created", entry)
+
+    def test_prefetched_activity_avoids_per_barcode_queries(self):
+        """Serializing with prefetched activity must not query per barcode."""
+        from unittest.mock import patch
+
+        from index.repositories import UsageCounterRepository
+        from index.serializers import BarcodeSerializer, prefetch_barcode_activity
+
+        other = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="6543210987654321",
+            barcode_type="Others",
+            owner_username=self.user.username,
+        )
+        for barcode in (self.barcode, other):
+            TransactionRepository.create(
+                user_id=self.user.id,
+                barcode_uuid=barcode["barcode_uuid"],
+                barcode_value=barcode["barcode"],
+            )
+
+        activity = prefetch_barcode_activity([self.barcode, other])
+
+        with patch.object(
+            TransactionRepository, "for_barcode"
+        ) as mock_for_barcode, patch.object(
+            UsageCounterRepository, "get_daily_count"
+        ) as mock_daily_count:
+            data = BarcodeSerializer(
+                [self.barcode, other],
+                many=True,
+                context={"barcode_activity": activity},
+            ).data
+
+        mock_for_barcode.assert_not_called()
+        mock_daily_count.assert_not_called()
+        for entry in data:
+            self.assertEqual(len(entry["recent_transactions"]), 1)
+            self.assertEqual(entry["usage_stats"]["daily_used"], 1)
@@ -5,7 +5,10 @@ from .constants import (
     RESULT_TEMPLATE,
 )
 from .generator import generate_barcode
-from .identification import generate_unique_identification_barcode
+from .identification import (
+    generate_unique_identification_barcode,
+    rotate_identification_barcode,
+)
 
 __all__ = [
     "BARCODE_DYNAMIC",
@@ -14,4 +17,5 @@ __all__ = [
     "RESULT_TEMPLATE",
     "generate_barcode",
     "generate_unique_identification_barcode",
+    "rotate_identification_barcode",
 ]
@@ -6,6 +6,8 @@ BARCODE_OTHERS: Final[str] = "Others"
 
 STICKINESS_MINUTES: Final[int] = 10
 USAGE_COOLDOWN_MINUTES: Final[int] = 5
+# Fresh values drawn when an Identification rotation hits a taken one.
+IDENTIFICATION_VALUE_ATTEMPTS: Final[int] = 5
 
 RESULT_TEMPLATE = {
     "status": "error",  # overwritten on success
@@ -1,16 +1,14 @@
 from datetime import timedelta
+from typing import Optional
 
 from django.utils import timezone
 
+from core.dynamodb.concurrency import ConcurrentReads
 from index.repositories import (
     BarcodeRepository,
     SettingsRepository,
     TransactionRepository,
 )
-from index.repositories.barcode_repo import (
-    PULL_CANDIDATE_LIMIT,
-    SHARED_DYNAMIC_QUERY_PAGE_SIZE,
-)
 from index.services.usage_limit import UsageLimitService
 
 from .constants import (
@@ -21,57 +19,82 @@ from .constants import (
     STICKINESS_MINUTES,
     USAGE_COOLDOWN_MINUTES,
 )
-from .identification import _create_identification_barcode
+from .identification import rotate_identification_barcode
 from .usage import _touch_barcode_usage
 from .utils import _timestamp
 
 
+def _sticky_owner(settings: dict, recent_txn: dict) -> Optional[str]:
+    """Owner user_id of the recent transaction's barcode, if recorded."""
+    if recent_txn.get("barcode_owner_id"):
+        return recent_txn["barcode_owner_id"]
+    if settings.get("active_barcode_uuid") == recent_txn["barcode_uuid"]:
+        return settings.get("active_barcode_owner_id")
+    return None
+
+
+def _sticky_candidate(
+    reads: ConcurrentReads, user, settings: dict, recent_txn
+) -> Optional[dict]:
+    """Resolve the barcode of the user's recent transaction, if any."""
+    if not recent_txn or not recent_txn.get("barcode_uuid"):
+        return None
+    owner_id = _sticky_owner(settings, recent_txn)
+    if owner_id:
+        # One strongly consistent GetItem: the pool pick running alongside
+        # may have just changed this barcode.
+        return BarcodeRepository.get_by_uuid(
+            owner_id, recent_txn["barcode_uuid"], consistent=True
+        )
+    # Transactions written before the owner was recorded: own barcode by
+    # key, or a shared one by value, looked up at once.
+    own = reads.submit(
+        BarcodeRepository.get_by_uuid, user.id, recent_txn["barcode_uuid"]
+    )
+    shared = None
+    if recent_txn.get("barcode_value"):
+        shared = reads.submit(
+            BarcodeRepository.get_by_barcode_value, recent_txn["barcode_value"]
+        )
+    candidate = reads.result(own)
+    if not candidate and shared is not None:
+        candidate = reads.result(shared)
+    return candidate
+
+
 def generate_barcode(user) -> dict:
-    """Generate or refresh a barcode for *user*."""
+    """
+    Generate or refresh a barcode for *user*.
+
+    Reads that do not depend on each other run concurrently, so latency
+    follows the longest chain of dependent reads rather than their sum.
+    """
     result = RESULT_TEMPLATE.copy()
     selected = None
 
     settings = SettingsRepository.get_or_create(user.id)
 
     if settings.get("pull_setting") == "Enable":
-        # 1. Check for recent personal usage (Stickiness)
-        cutoff_10m = (
-            timezone.now() - timedelta(minutes=STICKINESS_MINUTES)
-        ).isoformat()
-        recent_txn = TransactionRepository.recent_user_usage(user.id, since=cutoff_10m)
-
-        candidate = None
-        if recent_txn and recent_txn.get("barcode_uuid"):
-            bc_uuid = recent_txn["barcode_uuid"]
-            # Look up the barcode to get full data
-            user_barcodes = BarcodeRepository.get_user_barcodes(user.id)
-            candidate = next(
-                (b for b in user_barcodes if b["barcode_uuid"] == bc_uuid), None
+        now = timezone.now()
+        cutoff_10m = (now - timedelta(minutes=STICKINESS_MINUTES)).isoformat()
+        cutoff_5m = (now - timedelta(minutes=USAGE_COOLDOWN_MINUTES)).isoformat()
+
+        with ConcurrentReads() as reads:
+            # 1. Check for recent personal usage (Stickiness)
+            recent = reads.submit(
+                TransactionRepository.recent_user_usage, user.id, since=cutoff_10m
             )
-            if not candidate:
-                # Might be a shared barcode from another user
-                candidate = BarcodeRepository.get_by_barcode_value(
-                    recent_txn.get("barcode_value", "")
-                )
-
-        # 2. Pull from pool if no candidate
-        if not candidate:
-            cutoff_5m = (
-                timezone.now() - timedelta(minutes=USAGE_COOLDOWN_MINUTES)
-            ).isoformat()
-
-            candidates = BarcodeRepository.get_pull_candidates(
+            # 2. Pool pick, started speculatively: it is only needed without
+            # a sticky candidate, and is cancelled on exit if still queued.
+            pooled = reads.submit(
+                BarcodeRepository.pick_pull_candidate,
                 gender_setting=settings.get("pull_gender_setting", "Unknow"),
                 exclude_user_id=user.id,
                 cooldown_cutoff=cutoff_5m,
-                limit=PULL_CANDIDATE_LIMIT,
-                page_size=SHARED_DYNAMIC_QUERY_PAGE_SIZE,
             )
-
-            if candidates:
-                import random
-
-                candidate = random.choice(candidates)
+            candidate = _sticky_candidate(reads, user, settings, reads.result(recent))
+            if not candidate:
+                candidate = reads.result(pooled)
 
         # 3. Apply selection
         if candidate:
@@ -115,7 +138,7 @@ def generate_barcode(user) -> dict:
 
     # Handle by barcode type
     if barcode_type == BARCODE_IDENTIFICATION:
-        new_bc = _create_identification_barcode(user)
+        new_bc = rotate_identification_barcode(user, current=selected)
         SettingsRepository.set_active_barcode(user.id, new_bc["barcode_uuid"])
 
         allowed, limit_error = UsageLimitService.check_all_limits(new_bc)
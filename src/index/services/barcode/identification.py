@@ -1,16 +1,21 @@
-from index.repositories import BarcodeRepository
+from index.repositories import (
+    BarcodeRepository,
+    DuplicateBarcodeError,
+    IdentificationReservoir,
+)
+from index.repositories.identification_reservoir import random_identification_value
 
-from .constants import BARCODE_IDENTIFICATION
-from .utils import _random_digits
+from .constants import IDENTIFICATION_VALUE_ATTEMPTS
 
 
 def generate_unique_identification_barcode(max_attempts: int = 50) -> str:
     """Return a unique 28-digit Identification barcode.
 
-    Retries up to *max_attempts* before raising an exception.
+    Retries up to *max_attempts* before raising an exception. Each attempt
+    costs an index query; rotate_identification_barcode() needs none.
     """
     for _ in range(max_attempts):
-        code = _random_digits(28)
+        code = random_identification_value()
         if not BarcodeRepository.barcode_exists(code):
             return code
     raise RuntimeError(
@@ -19,54 +24,28 @@ def generate_unique_identification_barcode(max_attempts: int = 50) -> str:
     )
 
 
-def _carry_forward_identification_usage(
-    old_barcodes: list[dict], new_barcode: dict
-) -> None:
-    """Merge prior Identification usage onto *new_barcode*."""
-    if not old_barcodes:
-        return
+def rotate_identification_barcode(user, current: dict = None) -> dict:
+    """Rotate a user's Identification barcode while preserving usage state.
 
-    total_usage = sum(int(b.get("total_usage", 0)) for b in old_barcodes)
-    max_total_limit = max(int(b.get("total_usage_limit", 0)) for b in old_barcodes)
-    max_daily_limit = max(int(b.get("daily_usage_limit", 0)) for b in old_barcodes)
-
-    last_used_values = [b.get("last_used") for b in old_barcodes if b.get("last_used")]
-    last_used = max(last_used_values) if last_used_values else None
-
-    updates = {
-        "total_usage": total_usage,
-        "total_usage_limit": max_total_limit,
-        "daily_usage_limit": max_daily_limit,
-    }
-    if last_used:
-        updates["last_used"] = last_used
-
-    BarcodeRepository.update(
-        user_id=new_barcode["user_id"],
-        barcode_uuid=new_barcode["barcode_uuid"],
-        **updates,
-    )
-
-
-def _create_identification_barcode(user) -> dict:
-    """Rotate a user's Identification barcode while preserving usage state."""
-    old_barcodes = BarcodeRepository.get_user_barcodes_by_type(
-        user.id, BARCODE_IDENTIFICATION
-    )
-
-    new_barcode = BarcodeRepository.create(
-        user_id=user.id,
-        barcode_value=generate_unique_identification_barcode(),
-        barcode_type=BARCODE_IDENTIFICATION,
-        owner_username=user.username,
-    )
-
-    if old_barcodes:
-        _carry_forward_identification_usage(old_barcodes, new_barcode)
-        for old_bc in old_barcodes:
-            BarcodeRepository.delete(
-                user_id=old_bc["user_id"],
-                barcode_uuid=old_bc["barcode_uuid"],
+    *current* is the Identification barcode being replaced, when the caller
+    already holds it. Values come pre-locked from the IdentificationReservoir;
+    while it is empty a random value is used and its lock claimed on write.
+    A value that turns out to be taken is simply redrawn.
+    """
+    for _ in range(IDENTIFICATION_VALUE_ATTEMPTS):
+        value = IdentificationReservoir.take()
+        reserved = value is not None
+        try:
+            return BarcodeRepository.rotate_identification(
+                user.id,
+                value if reserved else random_identification_value(),
+                owner_username=user.username,
+                current=current,
+                reserved=reserved,
             )
-
-    return new_barcode
+        except DuplicateBarcodeError:
+            continue
+    raise RuntimeError(
+        f"Unable to generate unique Identification barcode after "
+        f"{IDENTIFICATION_VALUE_ATTEMPTS} attempts."
+    )
@@ -2,8 +2,10 @@
 
 Covers the three module-level callables:
 - generate_unique_identification_barcode (collision retry + exhaustion)
-- _carry_forward_identification_usage (aggregation across prior barcodes)
-- _create_identification_barcode (rotation flow)
+- rotate_identification_barcode (rotation flow)
+
+and the repository helpers behind the rotation (carried-forward counters,
+the current-Identification pointer).
 """
 
 from unittest.mock import patch
@@ -11,11 +13,12 @@ from unittest.mock import patch
 from django.contrib.auth.models import User
 from django.test import TestCase
 
-from index.repositories import BarcodeRepository
+from core.dynamodb.client import get_table
+from index.repositories import BarcodeRepository, IdentificationReservoir, barcode_repo
+from index.repositories.barcode_repo import _carried_identification_usage
 from index.services.barcode.constants import BARCODE_IDENTIFICATION
 from index.services.barcode.identification import (
-    _carry_forward_identification_usage,
-    _create_identification_barcode,
+    rotate_identification_barcode,
     generate_unique_identification_barcode,
 )
 from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin
@@ -54,22 +57,9 @@ class GenerateUniqueIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
         self.assertIn("after 3 attempts", str(cm.exception))
 
 
-class CarryForwardIdentificationUsageTest(DynamoDBCleanupMixin, TestCase):
-    def setUp(self):
-        super().setUp()
-        self.user = User.objects.create_user(username="carryuser", password="pw")
-        self.new_barcode = BarcodeRepository.create(
-            user_id=self.user.id,
-            barcode_value="9" * 28,
-            barcode_type=BARCODE_IDENTIFICATION,
-            owner_username=self.user.username,
-        )
-
-    def test_is_noop_when_no_old_barcodes(self):
-        with patch.object(BarcodeRepository, "update") as mock_update:
-            _carry_forward_identification_usage([], self.new_barcode)
-
-        mock_update.assert_not_called()
+class CarriedIdentificationUsageTest(TestCase):
+    def test_is_empty_when_no_old_barcodes(self):
+        self.assertEqual(_carried_identification_usage([]), {})
 
     def test_sums_usage_and_takes_max_limits(self):
         old = [
@@ -87,42 +77,32 @@ class CarryForwardIdentificationUsageTest(DynamoDBCleanupMixin, TestCase):
             },
         ]
 
-        with patch.object(BarcodeRepository, "update") as mock_update:
-            _carry_forward_identification_usage(old, self.new_barcode)
-
-        mock_update.assert_called_once()
-        kwargs = mock_update.call_args.kwargs
-        self.assertEqual(kwargs["user_id"], self.new_barcode["user_id"])
-        self.assertEqual(kwargs["barcode_uuid"], self.new_barcode["barcode_uuid"])
-        self.assertEqual(kwargs["total_usage"], 8)
-        self.assertEqual(kwargs["total_usage_limit"], 100)
-        self.assertEqual(kwargs["daily_usage_limit"], 20)
-        self.assertEqual(kwargs["last_used"], "2026-04-21T10:00:00Z")
+        self.assertEqual(
+            _carried_identification_usage(old),
+            {
+                "total_usage": 8,
+                "total_usage_limit": 100,
+                "daily_usage_limit": 20,
+                "last_used": "2026-04-21T10:00:00Z",
+            },
+        )
 
     def test_omits_last_used_when_no_old_barcode_has_it(self):
         old = [
             {"total_usage": 1, "total_usage_limit": 10, "daily_usage_limit": 1},
         ]
 
-        with patch.object(BarcodeRepository, "update") as mock_update:
-            _carry_forward_identification_usage(old, self.new_barcode)
-
-        kwargs = mock_update.call_args.kwargs
-        self.assertNotIn("last_used", kwargs)
+        self.assertNotIn("last_used", _carried_identification_usage(old))
 
     def test_handles_missing_usage_fields_as_zero(self):
-        old = [{}]  # completely empty prior record
-
-        with patch.object(BarcodeRepository, "update") as mock_update:
-            _carry_forward_identification_usage(old, self.new_barcode)
+        carried = _carried_identification_usage([{}])
 
-        kwargs = mock_update.call_args.kwargs
-        self.assertEqual(kwargs["total_usage"], 0)
-        self.assertEqual(kwargs["total_usage_limit"], 0)
-        self.assertEqual(kwargs["daily_usage_limit"], 0)
+        self.assertEqual(carried["total_usage"], 0)
+        self.assertEqual(carried["total_usage_limit"], 0)
+        self.assertEqual(carried["daily_usage_limit"], 0)
 
     def test_coerces_string_numbers(self):
-        # DynamoDB returns numeric attributes as Decimal/str — the function
+        # DynamoDB returns numeric attributes as Decimal/str — the helper
         # casts via int(), so string digits must also work.
         old = [
             {
@@ -132,13 +112,11 @@ class CarryForwardIdentificationUsageTest(DynamoDBCleanupMixin, TestCase):
             },
         ]
 
-        with patch.object(BarcodeRepository, "update") as mock_update:
-            _carry_forward_identification_usage(old, self.new_barcode)
+        carried = _carried_identification_usage(old)
 
-        kwargs = mock_update.call_args.kwargs
-        self.assertEqual(kwargs["total_usage"], 2)
-        self.assertEqual(kwargs["total_usage_limit"], 50)
-        self.assertEqual(kwargs["daily_usage_limit"], 5)
+        self.assertEqual(carried["total_usage"], 2)
+        self.assertEqual(carried["total_usage_limit"], 50)
+        self.assertEqual(carried["daily_usage_limit"], 5)
 
 
 class CreateIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
@@ -147,7 +125,7 @@ class CreateIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
         self.user = User.objects.create_user(username="rotator", password="pw")
 
     def test_creates_new_barcode_when_user_has_none(self):
-        new_bc = _create_identification_barcode(self.user)
+        new_bc = rotate_identification_barcode(self.user)
 
         self.assertEqual(new_bc["barcode_type"], BARCODE_IDENTIFICATION)
         # Repository stores the raw value under the "barcode" attribute name.
@@ -174,7 +152,7 @@ class CreateIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
             daily_usage_limit=3,
         )
 
-        new_bc = _create_identification_barcode(self.user)
+        new_bc = rotate_identification_barcode(self.user)
 
         remaining = BarcodeRepository.get_user_barcodes_by_type(
             self.user.id, BARCODE_IDENTIFICATION
@@ -195,7 +173,7 @@ class CreateIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
                 owner_username=self.user.username,
             )
 
-        new_bc = _create_identification_barcode(self.user)
+        new_bc = rotate_identification_barcode(self.user)
 
         remaining = BarcodeRepository.get_user_barcodes_by_type(
             self.user.id, BARCODE_IDENTIFICATION
@@ -203,6 +181,104 @@ class CreateIdentificationBarcodeTest(DynamoDBCleanupMixin, TestCase):
         self.assertEqual(len(remaining), 1)
         self.assertEqual(remaining[0]["barcode_uuid"], new_bc["barcode_uuid"])
 
+    def test_rotation_with_current_barcode_is_one_transaction(self):
+        first = rotate_identification_barcode(self.user)
+        BarcodeRepository.update(
+            user_id=first["user_id"],
+            barcode_uuid=first["barcode_uuid"],
+            total_usage=4,
+        )
+        current = BarcodeRepository.get_by_uuid(self.user.id, first["barcode_uuid"])
+
+        with patch(
+            "index.repositories.barcode_repo.transact_write_items",
+            wraps=barcode_repo.transact_write_items,
+        ) as mock_transact, patch.object(
+            barcode_repo, "_current_identification"
+        ) as mock_read, patch.object(
+            BarcodeRepository, "barcode_exists"
+        ) as mock_exists:
+            new_bc = rotate_identification_barcode(self.user, current=current)
+
+        mock_transact.assert_called_once()
+        mock_read.assert_not_called()
+        mock_exists.assert_not_called()
+        self.assertEqual(int(new_bc["total_usage"]), 4)
+        self.assertIsNone(
+            BarcodeRepository.get_by_uuid(self.user.id, first["barcode_uuid"])
+        )
+        # The old value's lock went with it.
+        BarcodeRepository.create(user_id=self.user.id, barcode_value=first["barcode"])
+
+    def test_rotation_uses_pointer_instead_of_query(self):
+        first = rotate_identification_barcode(self.user)
+
+        with patch.object(
+            BarcodeRepository, "get_user_barcodes_by_type"
+        ) as mock_by_type, patch(
+            "index.repositories.barcode_repo.query_all"
+        ) as mock_query:
+            new_bc = rotate_identification_barcode(self.user)
+
+        mock_by_type.assert_not_called()
+        mock_query.assert_not_called()
+        self.assertIsNone(
+            BarcodeRepository.get_by_uuid(self.user.id, first["barcode_uuid"])
+        )
+        self.assertEqual(
+            _current_identification_uuids(self.user.id), [new_bc["barcode_uuid"]]
+        )
+
+    def test_stale_current_barcode_is_reread(self):
+        first = rotate_identification_barcode(self.user)
+        stale = BarcodeRepository.get_by_uuid(self.user.id, first["barcode_uuid"])
+        # Used after the caller read it.
+        BarcodeRepository.update(
+            user_id=first["user_id"],
+            barcode_uuid=first["barcode_uuid"],
+            total_usage=1,
+        )
+
+        new_bc = rotate_identification_barcode(self.user, current=stale)
+
+        self.assertEqual(int(new_bc["total_usage"]), 1)
+        remaining = BarcodeRepository.get_user_barcodes_by_type(
+            self.user.id, BARCODE_IDENTIFICATION
+        )
+        self.assertEqual(
+            [b["barcode_uuid"] for b in remaining], [new_bc["barcode_uuid"]]
+        )
+
+    def test_taken_value_is_redrawn(self):
+        taken = BarcodeRepository.create(user_id=self.user.id, barcode_value="7" * 28)
+
+        with patch(
+            "index.services.barcode.identification.random_identification_value",
+            side_effect=[taken["barcode"], "8" * 28],
+        ):
+            new_bc = rotate_identification_barcode(self.user)
+
+        self.assertEqual(new_bc["barcode"], "8" * 28)
+
+    def test_rotation_takes_reserved_value(self):
+        IdentificationReservoir.refill(3)
+
+        with patch.object(BarcodeRepository, "barcode_exists") as mock_exists:
+            new_bc = rotate_identification_barcode(self.user)
+
+        mock_exists.assert_not_called()
+        self.assertEqual(IdentificationReservoir.size(), 2)
+        # The reserved lock now names the new barcode.
+        lock = get_table("barcodes").get_item(
+            Key=barcode_repo._unique_lock_key(new_bc["barcode"])
+        )["Item"]
+        self.assertEqual(lock["owner_barcode_uuid"], new_bc["barcode_uuid"])
+
+
+def _current_identification_uuids(user_id) -> list[str]:
+    _, current = barcode_repo._current_identification(user_id)
+    return [b["barcode_uuid"] for b in current]
+
 
 _counter = {"n": 0}
 
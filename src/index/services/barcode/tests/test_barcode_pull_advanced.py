@@ -1,10 +1,17 @@
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
 
-from index.repositories import BarcodeRepository, SettingsRepository
+from index.repositories import BarcodeRepository, SettingsRepository, barcode_repo
+from index.repositories.barcode_repo import (
+    POOL_SHARDS,
+    _pool_shard_for,
+    _query_shared_dynamic_barcodes,
+)
 from index.services.barcode import generate_barcode
 from index.services.barcode.tests.test_barcode_pull_basic import BarcodePullTestBase
+from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
 
 
 class BarcodePullAdvancedTest(BarcodePullTestBase):
@@ -113,3 +120,142 @@ class BarcodePullAdvancedTest(BarcodePullTestBase):
 
         self.assertEqual(result["status"], "success")
         self.assertIn("unknow_shareable", result["barcode"])
+
+    def test_repeated_pulls_reuse_cached_pool(self):
+        """Pulls after the first are served from the pool cache, not the GSI."""
+        other_user = User.objects.create_user("pooluser", password="pw")
+        SettingsRepository.update(
+            other_user.id, pull_setting="Enable", pull_gender_setting="Male"
+        )
+        owner = User.objects.create_user("secondowner")
+        BarcodeRepository.create(
+            user_id=owner.id,
+            barcode_value="male_shareable_2",
+            barcode_type="DynamicBarcode",
+            share_with_others=True,
+            profile_gender="Male",
+        )
+
+        with patch(
+            "index.repositories.barcode_repo._query_shared_dynamic_barcodes",
+            wraps=_query_shared_dynamic_barcodes,
+        ) as mock_query:
+            first = generate_barcode(self.school_user)
+            second = generate_barcode(other_user)
+
+        self.assertEqual(first["status"], "success")
+        self.assertEqual(second["status"], "success")
+        # The first pick's barcode is cooling down; the second gets the other.
+        self.assertNotEqual(first["barcode"], second["barcode"])
+        self.assertEqual(mock_query.call_count, 1)
+
+    def test_pool_cache_miss_falls_back_to_index(self):
+        # The cached pool was truncated before reaching this gender.
+        with patch.object(barcode_repo._pull_pool, "_loader", return_value=[]):
+            result = generate_barcode(self.school_user)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("male_shareable", result["barcode"])
+
+    def test_failed_pool_load_falls_back_to_index(self):
+        with patch.object(
+            barcode_repo._pull_pool, "_loader", side_effect=RuntimeError("throttled")
+        ):
+            result = generate_barcode(self.school_user)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("male_shareable", result["barcode"])
+
+    @override_settings(PULL_POOL_CACHE_TTL_SECONDS=0)
+    def test_pull_without_pool_cache_queries_index(self):
+        with patch(
+            "index.services.barcode.generator._timestamp", return_value="20230101000000"
+        ):
+            result = generate_barcode(self.school_user)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("male_shareable", result["barcode"])
+
+
+@override_settings(SHARED_POOL_SHARDED_READS=True)
+class ShardedPoolIndexTest(DynamoDBTestMixin, TestCase):
+    """Shared DynamicBarcodes are spread over SharedPoolShardIndex partitions."""
+
+    def _create(self, user_id, uuid, gender="Male", shared=True, when=None):
+        return BarcodeRepository.create(
+            user_id=user_id,
+            barcode_value=f"value-{uuid}",
+            barcode_type="DynamicBarcode",
+            barcode_uuid=uuid,
+            share_with_others=shared,
+            profile_gender=gender,
+            time_created=when,
+        )
+
+    def test_only_shared_dynamic_barcodes_get_a_shard(self):
+        shared = self._create(1, "shared")
+        private = self._create(1, "private", shared=False)
+        other = BarcodeRepository.create(
+            user_id=1, barcode_value="other", share_with_others=True
+        )
+
+        self.assertTrue(shared["pool_shard"].startswith("DynamicBarcode#Male#"))
+        self.assertNotIn("pool_shard", private)
+        self.assertNotIn("pool_shard", other)
+
+    def test_update_moves_item_into_and_out_of_pool(self):
+        self._create(1, "bc", shared=False)
+
+        shared = BarcodeRepository.update(1, "bc", share_with_others=True)
+        self.assertEqual(shared["pool_shard"], _pool_shard_for(shared))
+        self.assertEqual(
+            BarcodeRepository.get_by_uuid(1, "bc")["pool_shard"], shared["pool_shard"]
+        )
+
+        unshared = BarcodeRepository.update(1, "bc", share_with_others=False)
+        self.assertNotIn("pool_shard", unshared)
+        self.assertNotIn("pool_shard", BarcodeRepository.get_by_uuid(1, "bc"))
+
+    def test_fan_out_merges_shards_newest_first(self):
+        for i in range(12):
+            self._create(100 + i, f"bc-{i:02d}", when=f"2026-01-01T00:00:{i:02d}+00:00")
+        self._create(200, "female", gender="Female")
+
+        self.assertGreater(
+            len(
+                {
+                    _pool_shard_for(
+                        BarcodeRepository.get_by_uuid(100 + i, f"bc-{i:02d}")
+                    )
+                    for i in range(12)
+                }
+            ),
+            1,
+        )
+        items = _query_shared_dynamic_barcodes(gender_setting="Male", limit=5)
+        self.assertEqual(
+            [item["barcode_uuid"] for item in items],
+            ["bc-11", "bc-10", "bc-09", "bc-08", "bc-07"],
+        )
+
+        everything = _query_shared_dynamic_barcodes()
+        self.assertEqual(len(everything), 13)
+        created = [item["time_created"] for item in everything]
+        self.assertEqual(created, sorted(created, reverse=True))
+
+    def test_gender_query_reads_only_that_genders_shards(self):
+        with patch.object(
+            barcode_repo, "map_concurrent", wraps=barcode_repo.map_concurrent
+        ) as mock_map:
+            _query_shared_dynamic_barcodes(gender_setting="Female")
+
+        shard_queries = mock_map.call_args.args[1]
+        self.assertEqual(len(shard_queries), POOL_SHARDS)
+        for kwargs in shard_queries:
+            self.assertEqual(kwargs["IndexName"], "SharedPoolShardIndex")
+
+    @override_settings(SHARED_POOL_SHARDED_READS=False)
+    def test_legacy_index_still_readable(self):
+        self._create(1, "bc")
+        items = _query_shared_dynamic_barcodes(gender_setting="Male")
+        self.assertEqual([item["barcode_uuid"] for item in items], ["bc"])
@@ -1,10 +1,12 @@
+import threading
 from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
+from core.dynamodb import concurrency
 from index.repositories import (
     BarcodeRepository,
     SettingsRepository,
@@ -73,6 +75,82 @@ class BarcodePullTestBase(DynamoDBTestMixin, TestCase):
 
 
 class BarcodePullBasicTest(BarcodePullTestBase):
+    def test_stickiness_and_pool_reads_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def recent_user_usage(*args, **kwargs):
+            barrier.wait()  # returns only once the pool pick runs too
+
+        def pick_pull_candidate(**kwargs):
+            barrier.wait()
+            return self.bc_male
+
+        with patch.object(
+            TransactionRepository, "recent_user_usage", side_effect=recent_user_usage
+        ), patch.object(
+            BarcodeRepository, "pick_pull_candidate", side_effect=pick_pull_candidate
+        ):
+            result = generate_barcode(self.school_user)
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("male_shareable", result["barcode"])
+
+    def test_sticky_own_barcode_is_read_by_key(self):
+        TransactionRepository.create(
+            user_id=self.school_user.id,
+            barcode_uuid=self.bc_owned["barcode_uuid"],
+            barcode_value=self.bc_owned["barcode"],
+        )
+
+        with patch.object(BarcodeRepository, "get_user_barcodes") as mock_list:
+            result = generate_barcode(self.school_user)
+
+        mock_list.assert_not_called()
+        self.assertEqual(result["barcode"], "male_owned")
+
+    def test_sticky_shared_barcode_uses_recorded_owner(self):
+        TransactionRepository.create(
+            user_id=self.school_user.id,
+            barcode_uuid=self.bc_male["barcode_uuid"],
+            barcode_value=self.bc_male["barcode"],
+            barcode_owner_id=self.bc_male["user_id"],
+        )
+        get_by_uuid = BarcodeRepository.get_by_uuid
+
+        with patch.object(
+            BarcodeRepository, "get_by_uuid", side_effect=get_by_uuid
+        ) as mock_get, patch.object(
+            BarcodeRepository, "get_by_barcode_value"
+        ) as mock_by_value, patch.object(
+            # The speculative pool pick re-reads its own candidate by key.
+            BarcodeRepository,
+            "pick_pull_candidate",
+            return_value=None,
+        ):
+            result = generate_barcode(self.school_user)
+
+        mock_by_value.assert_not_called()
+        mock_get.assert_called_once_with(
+            self.bc_male["user_id"], self.bc_male["barcode_uuid"], consistent=True
+        )
+        self.assertIn("male_shareable", result["barcode"])
+
+    @override_settings(DYNAMODB_MAX_CONCURRENCY=2, DYNAMODB_FANOUT_TIMEOUT_SECONDS=0.05)
+    def test_busy_pool_falls_back_to_inline_reads(self):
+        concurrency.reset()
+        release = threading.Event()
+        # Background work holds every pool thread past the fan-out deadline.
+        for _ in range(2):
+            concurrency.get_executor().submit(release.wait, 5)
+        try:
+            result = generate_barcode(self.school_user)
+        finally:
+            release.set()
+            concurrency.reset()
+
+        self.assertEqual(result["status"], "success")
+        self.assertIn("male_shareable", result["barcode"])
+
     def test_pull_basic_candidate(self):
         """Test pulling a valid candidate (Male, Shareable)"""
         with patch(
@@ -227,6 +305,10 @@ class BarcodePullBasicTest(BarcodePullTestBase):
         self.assertIn("male_alt2_shareable", result["barcode"])
 
 
+# The fake table models one paginated index stream, i.e. the unsharded
+# SharedBarcodeTypeIndex path; sharded fan-out is covered in
+# test_barcode_pull_advanced.
+@override_settings(SHARED_POOL_SHARDED_READS=False)
 class BarcodeRepositoryBoundedSharedReadTest(TestCase):
     def test_get_pull_candidates_stops_after_limit_and_preserves_filters(self):
         cutoff = "2026-04-23T00:05:00+00:00"
@@ -354,9 +436,10 @@ class BarcodeRepositoryBoundedSharedReadTest(TestCase):
 
         with (
             patch("index.repositories.barcode_repo._table", return_value=fake_table),
-            patch(
-                "index.repositories.barcode_repo.query_all",
-                return_value=[own_dynamic, own_static],
+            patch.object(
+                BarcodeRepository,
+                "iter_user_barcodes",
+                return_value=iter([own_dynamic, own_static]),
             ),
         ):
             barcodes = BarcodeRepository.get_dashboard_barcodes(
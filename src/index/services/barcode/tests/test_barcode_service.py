@@ -1,10 +1,16 @@
 from datetime import timedelta
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.utils import timezone
 
-from index.repositories import BarcodeRepository, TransactionRepository
+from index.repositories import (
+    BarcodeRepository,
+    TransactionRepository,
+    UsageCounterRepository,
+    barcode_repo,
+)
 from index.services.barcode.usage import _touch_barcode_usage
 from index.services.barcode.utils import _random_digits
 from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
@@ -169,6 +175,125 @@ class BarcodeServiceTest(BarcodeServiceTestBase):
         txns = TransactionRepository.for_barcode(barcode2["barcode_uuid"])
         self.assertEqual(len(txns), 2)
 
+    def test_cooldown_is_one_conditional_marker_write(self):
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="1234567890123456",
+            barcode_type="Others",
+            owner_username=self.user.username,
+        )
+
+        with patch.object(
+            TransactionRepository, "recent_user_barcode_usage"
+        ) as mock_query:
+            _touch_barcode_usage(barcode, request_user=self.user)
+            _touch_barcode_usage(barcode, request_user=self.user)
+
+        mock_query.assert_not_called()
+        updated = BarcodeRepository.get_by_uuid(
+            barcode["user_id"], barcode["barcode_uuid"]
+        )
+        self.assertEqual(int(updated["total_usage"]), 1)
+
+    def test_cooldown_marker_expires_after_window(self):
+        now = timezone.now()
+        six_minutes_ago = (now - timedelta(minutes=6)).isoformat()
+
+        self.assertTrue(
+            UsageCounterRepository.mark_use_if_cooled_down(
+                self.user.id, "bc-1", six_minutes_ago, 300
+            )
+        )
+        self.assertTrue(
+            UsageCounterRepository.mark_use_if_cooled_down(
+                self.user.id, "bc-1", now.isoformat(), 300
+            )
+        )
+        self.assertFalse(
+            UsageCounterRepository.mark_use_if_cooled_down(
+                self.user.id, "bc-1", (now + timedelta(minutes=1)).isoformat(), 300
+            )
+        )
+        # Markers are per (user, barcode).
+        self.assertTrue(
+            UsageCounterRepository.mark_use_if_cooled_down(
+                self.school_user.id, "bc-1", now.isoformat(), 300
+            )
+        )
+
+    def test_usage_is_recorded_in_one_transaction(self):
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="1234567890123456",
+            barcode_type="Others",
+            owner_username=self.user.username,
+        )
+
+        with patch(
+            "index.repositories.barcode_repo.transact_write_items",
+            wraps=barcode_repo.transact_write_items,
+        ) as mock_transact:
+            self.assertTrue(_touch_barcode_usage(barcode, request_user=self.user))
+            self.assertFalse(_touch_barcode_usage(barcode, request_user=self.user))
+
+        self.assertEqual(mock_transact.call_count, 2)
+        self.assertEqual(len(mock_transact.call_args_list[0].args[0]), 4)
+        updated = BarcodeRepository.get_by_uuid(
+            barcode["user_id"], barcode["barcode_uuid"]
+        )
+        self.assertEqual(int(updated["total_usage"]), 1)
+        (txn,) = TransactionRepository.for_barcode(barcode["barcode_uuid"])
+        self.assertEqual(txn["barcode_owner_id"], barcode["user_id"])
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count(barcode["barcode_uuid"]), 1
+        )
+        self.assertEqual(sum(UsageCounterRepository.get_day_totals().values()), 1)
+
+    def test_failed_usage_transaction_writes_nothing(self):
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="1234567890123456",
+            barcode_type="Others",
+            owner_username=self.user.username,
+        )
+        BarcodeRepository.delete(barcode["user_id"], barcode["barcode_uuid"])
+
+        self.assertFalse(_touch_barcode_usage(barcode, request_user=self.user))
+
+        self.assertIsNone(
+            BarcodeRepository.get_by_uuid(barcode["user_id"], barcode["barcode_uuid"])
+        )
+        self.assertEqual(TransactionRepository.for_user(self.user.id), [])
+        self.assertEqual(
+            UsageCounterRepository.get_daily_count(barcode["barcode_uuid"]), 0
+        )
+        # The cooldown marker was rolled back with the rest.
+        self.assertTrue(
+            UsageCounterRepository.mark_use_if_cooled_down(
+                self.user.id, barcode["barcode_uuid"], timezone.now().isoformat(), 300
+            )
+        )
+
+    def test_identification_cooldown_checks_stored_last_used(self):
+        barcode = BarcodeRepository.create(
+            user_id=self.user.id,
+            barcode_value="12345678901234567890123456789",
+            barcode_type="Identification",
+            owner_username=self.user.username,
+        )
+
+        self.assertTrue(_touch_barcode_usage(barcode, request_user=self.user))
+        # The caller's copy predates the first use; the condition still holds.
+        self.assertFalse(_touch_barcode_usage(barcode, request_user=self.user))
+
+        updated = BarcodeRepository.get_by_uuid(
+            barcode["user_id"], barcode["barcode_uuid"]
+        )
+        self.assertEqual(int(updated["total_usage"]), 1)
+        self.assertEqual(
+            len(TransactionRepository.for_barcode(barcode["barcode_uuid"])), 1
+        )
+
     def test_touch_barcode_usage_different_users_within_5_minutes(self):
         """Test that different users can use the same barcode within 5 minutes"""
         barcode = BarcodeRepository.create(
@@ -1,61 +1,37 @@
-from datetime import timedelta
-
 from django.utils import timezone
 
-from index.repositories import BarcodeRepository, TransactionRepository
+from index.repositories import BarcodeRepository
 
 from .constants import BARCODE_IDENTIFICATION, USAGE_COOLDOWN_MINUTES
 
 
-def _has_recent_duplicate_usage(
-    barcode: dict,
-    *,
-    request_user,
-    cutoff_5m: str,
-) -> bool:
-    """Return True when usage should be suppressed by the cooldown window."""
-    if barcode.get("barcode_type") == BARCODE_IDENTIFICATION:
-        last_used = barcode.get("last_used")
-        return bool(last_used and last_used >= cutoff_5m)
-
-    return TransactionRepository.recent_user_barcode_usage(
-        user_id=request_user.id,
-        barcode_uuid=barcode["barcode_uuid"],
-        since=cutoff_5m,
-    )
-
-
-def _touch_barcode_usage(barcode: dict, *, request_user=None) -> None:
+def _touch_barcode_usage(barcode: dict, *, request_user=None) -> bool:
     """Increment usage counters for *barcode* atomically.
 
     If the same user has used this barcode within the last 5 minutes,
     we skip recording a new transaction and do not increment usage counters.
+    The cooldown check, the counters and the transaction are one conditional
+    write, so concurrent requests cannot both pass. Identification barcodes
+    cool down on the barcode's own last_used.
 
-    If a barcode is being used by someone other than its owner, we still
-    update the usage counters but we do NOT create a Transaction.
-    """
-    now = timezone.now()
-
-    # Check for duplicate usage within 5 minutes for the same user and barcode
-    if request_user is not None:
-        cutoff_5m = (now - timedelta(minutes=USAGE_COOLDOWN_MINUTES)).isoformat()
-        if _has_recent_duplicate_usage(
-            barcode,
-            request_user=request_user,
-            cutoff_5m=cutoff_5m,
-        ):
-            return
-
-    # Atomic increment: total_usage += 1, last_used = now
-    BarcodeRepository.increment_usage(
-        user_id=barcode["user_id"],
-        barcode_uuid=barcode["barcode_uuid"],
-    )
+    Without a request_user only the usage counters are updated.
 
-    if request_user is not None:
-        TransactionRepository.create(
-            user_id=request_user.id,
+    Returns whether the usage was recorded.
+    """
+    if request_user is None:
+        # Atomic increment: total_usage += 1, last_used = now
+        BarcodeRepository.increment_usage(
+            user_id=barcode["user_id"],
             barcode_uuid=barcode["barcode_uuid"],
-            barcode_value=barcode.get("barcode"),
-            time_created=now.isoformat(),
+            usage_shards=int(barcode.get("usage_shards") or 0),
+            last_used=barcode.get("last_used"),
         )
+        return True
+
+    return BarcodeRepository.record_usage(
+        barcode,
+        request_user.id,
+        cooldown_seconds=USAGE_COOLDOWN_MINUTES * 60,
+        cooldown_on_barcode=barcode.get("barcode_type") == BARCODE_IDENTIFICATION,
+        used_at=timezone.now().isoformat(),
+    )
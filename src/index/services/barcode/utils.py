@@ -5,7 +5,7 @@ from django.utils import timezone
 
 def _random_digits(length: int) -> str:
     """Return a random string of *length* numeric digits."""
-    return "".join(str(secrets.randbelow(10)) for _ in range(length))
+    return str(secrets.randbelow(10**length)).zfill(length)
 
 
 def _timestamp() -> str:
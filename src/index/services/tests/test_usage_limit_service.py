@@ -1,7 +1,13 @@
+from unittest.mock import patch
+
 from django.contrib.auth.models import User
 from django.test import TestCase
 
-from index.repositories import BarcodeRepository, TransactionRepository
+from index.repositories import (
+    BarcodeRepository,
+    TransactionRepository,
+    UsageCounterRepository,
+)
 from index.services.transfer import TransferBarcodeParser
 from index.services.usage_limit import UsageLimitService
 from index.tests.dynamodb_cleanup import DynamoDBCleanupMixin as DynamoDBTestMixin
@@ -177,6 +183,34 @@ class UsageLimitServiceTest(DynamoDBTestMixin, TestCase):
         self.assertEqual(stats["daily_remaining"], 0)
         self.assertEqual(stats["total_remaining"], 0)
 
+    def test_daily_limit_reads_counter_instead_of_counting_transactions(self):
+        barcode = BarcodeRepository.update(
+            user_id=self.barcode["user_id"],
+            barcode_uuid=self.barcode["barcode_uuid"],
+            daily_usage_limit=2,
+        )
+        UsageCounterRepository.increment_daily(barcode["barcode_uuid"], amount=2)
+
+        with patch.object(
+            TransactionRepository, "count_for_barcode_since"
+        ) as mock_count:
+            allowed, msg = UsageLimitService.check_daily_limit(barcode)
+
+        mock_count.assert_not_called()
+        self.assertFalse(allowed)
+        self.assertIn("Daily usage limit of 2", msg)
+
+    def test_bulk_create_increments_daily_counters(self):
+        TransactionRepository.bulk_create(
+            [
+                {"user_id": self.user.id, "barcode_uuid": self.barcode["barcode_uuid"]},
+                {"user_id": self.user.id, "barcode_uuid": self.barcode["barcode_uuid"]},
+                {"user_id": self.user.id},
+            ]
+        )
+        stats = UsageLimitService.get_usage_stats(self.barcode)
+        self.assertEqual(stats["daily_used"], 2)
+
 
 class TransferBarcodeParserTest(TestCase):
     """Unit tests for TransferBarcodeParser"""
@@ -1,10 +1,152 @@
 from __future__ import annotations
 
 from collections import Counter
-from datetime import datetime
-from typing import Optional, Sequence, Tuple, Dict, Any
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
-from index.repositories import TransactionRepository
+from boto3.dynamodb.conditions import Attr
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+from core.dynamodb.concurrency import parallel_scan
+from index.repositories import TransactionRepository, UsageCounterRepository
+
+# Analytics only look at these; everything else stays off the wire.
+ANALYTICS_SCAN_PROJECTION = "time_created, barcode_uuid"
+# History pages return these; user_id and sk also let a page end mid-query.
+HISTORY_PROJECTION = "user_id, sk, time_created, barcode_uuid, barcode_value"
+HISTORY_CURSOR_SALT = "index.transactions.history"
+
+
+def _history_page_size(page_size: Optional[int]) -> int:
+    """*page_size* clamped to [1, TRANSACTION_HISTORY_MAX_PAGE_SIZE]."""
+    if page_size is None:
+        page_size = getattr(settings, "TRANSACTION_HISTORY_PAGE_SIZE", 50)
+    return max(
+        1,
+        min(
+            int(page_size), getattr(settings, "TRANSACTION_HISTORY_MAX_PAGE_SIZE", 200)
+        ),
+    )
+
+
+def _history_cursor(
+    user_id, since: Optional[str], until: Optional[str], key: dict
+) -> str:
+    """Sign *key*, bound to the listing it continues."""
+    return signing.dumps(
+        {"u": str(user_id), "s": since, "t": until, "k": key},
+        salt=HISTORY_CURSOR_SALT,
+        compress=True,
+    )
+
+
+def _history_start_key(
+    cursor: str, user_id, since: Optional[str], until: Optional[str]
+) -> dict:
+    """
+    The ExclusiveStartKey inside *cursor*.
+
+    Raises ValueError if the cursor was tampered with, has expired, or
+    belongs to another user or time range.
+    """
+    try:
+        data = signing.loads(
+            cursor,
+            salt=HISTORY_CURSOR_SALT,
+            max_age=getattr(
+                settings, "TRANSACTION_HISTORY_CURSOR_MAX_AGE_SECONDS", None
+            ),
+        )
+    except signing.BadSignature:
+        raise ValueError("Invalid or expired cursor.")
+    if (data.get("u"), data.get("s"), data.get("t")) != (str(user_id), since, until):
+        raise ValueError("Cursor does not match this listing.")
+    return data["k"]
+
+
+def _history_entry(item: dict) -> dict:
+    return {
+        "transaction_id": item["sk"].rsplit("#", 1)[-1],
+        "time_created": item.get("time_created"),
+        "barcode_uuid": item.get("barcode_uuid"),
+        "barcode_value": item.get("barcode_value"),
+    }
+
+
+def _rollup_day_range(
+    since: Optional[datetime], until: Optional[datetime]
+) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """
+    Return the inclusive (first_day, last_day) rollup range for [since, until).
+
+    Rollups have one-day (UTC) resolution, so returns None, meaning "scan",
+    unless both bounds are absent or fall on UTC midnight.
+    """
+    if not getattr(settings, "USAGE_ROLLUP_READS", False):
+        return None
+    days = []
+    for value, offset in ((since, 0), (until, 1)):
+        if value is None:
+            days.append(None)
+            continue
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        value = value.astimezone(dt_timezone.utc)
+        if value.time() != datetime.min.time():
+            return None
+        days.append((value.date() - timedelta(days=offset)).isoformat())
+    return days[0], days[1]
+
+
+def _daily_totals(since, until) -> Counter:
+    """{YYYY-MM-DD: transactions} from the rollups, or a scan if unaligned."""
+    day_range = _rollup_day_range(since, until)
+    if day_range is not None:
+        return Counter(UsageCounterRepository.get_day_totals(*day_range))
+
+    per_day: Counter = Counter()
+    for partial in _scan_transactions(
+        lambda items: Counter(item.get("time_created", "")[:10] for item in items),
+        since=since,
+        until=until,
+    ):
+        per_day.update(partial)
+    return per_day
+
+
+def _barcode_totals_from_rollups(days) -> Counter:
+    """Sum the per-barcode rollups of *days* (only days with usage exist)."""
+    totals: Counter = Counter()
+    for counts in UsageCounterRepository.get_barcode_rollups(days).values():
+        totals.update(counts)
+    return totals
+
+
+def _scan_transactions(
+    aggregate: Callable,
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> list:
+    """
+    Parallel scan of the Transactions table for [since, until).
+
+    The time range is applied server-side; returns one ``aggregate`` result
+    per scan segment.
+    """
+    scan_kwargs = {"ProjectionExpression": ANALYTICS_SCAN_PROJECTION}
+    condition = None
+    if since:
+        condition = Attr("time_created").gte(since.isoformat())
+    if until:
+        before = Attr("time_created").lt(until.isoformat())
+        condition = before if condition is None else condition & before
+    if condition is not None:
+        scan_kwargs["FilterExpression"] = condition
+    return parallel_scan("transactions", aggregate, **scan_kwargs)
 
 
 class TransactionQueryMixin:
@@ -25,6 +167,54 @@ class TransactionQueryMixin:
             until=until_str,
         )
 
+    @staticmethod
+    def history_page(
+        user,
+        *,
+        cursor: Optional[str] = None,
+        page_size: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        One page of a user's transactions, newest first.
+
+        Returns {"results": [...], "next_cursor": str | None}. Pass
+        next_cursor back, with the same since/until, for the following page;
+        it is None after the last one. Reads at most one page from DynamoDB,
+        whatever the length of the history. Raises ValueError for a bad
+        cursor.
+        """
+        user_id = user.id if hasattr(user, "id") else user
+        since_str = since.isoformat() if since else None
+        until_str = until.isoformat() if until else None
+        page_size = _history_page_size(page_size)
+        start_key = (
+            _history_start_key(cursor, user_id, since_str, until_str)
+            if cursor
+            else None
+        )
+
+        stream = TransactionRepository.iter_for_user(
+            user_id,
+            since_str,
+            until_str,
+            cursor=start_key,
+            max_items=page_size,
+            prefetch=False,
+            ProjectionExpression=HISTORY_PROJECTION,
+        )
+        results = [_history_entry(item) for item in stream]
+        next_key = stream.cursor
+        return {
+            "results": results,
+            "next_cursor": (
+                _history_cursor(user_id, since_str, until_str, next_key)
+                if next_key
+                else None
+            ),
+        }
+
     @staticmethod
     def top_barcodes(
         *,
@@ -35,34 +225,22 @@ class TransactionQueryMixin:
         """
         Return [(barcode_uuid, count), ...] ordered by count desc.
 
-        NOTE: This requires a table scan. Acceptable for admin analytics,
-        not for hot-path queries.
+        Whole-day ranges are answered from the daily rollups. Other ranges
+        need a table scan: acceptable for admin analytics, not for hot-path
+        queries.
         """
-        # Scan-based aggregation — acceptable for low-frequency admin queries
-        from core.dynamodb.client import get_table
+        day_range = _rollup_day_range(since, until)
+        if day_range is not None:
+            days = UsageCounterRepository.get_day_totals(*day_range)
+            return _barcode_totals_from_rollups(days).most_common(limit)
 
-        table = get_table("transactions")
         counter: Counter = Counter()
-
-        kwargs = {}
-        last_key = None
-        while True:
-            if last_key:
-                kwargs["ExclusiveStartKey"] = last_key
-            resp = table.scan(**kwargs)
-            for item in resp.get("Items", []):
-                tc = item.get("time_created", "")
-                if since and tc < since.isoformat():
-                    continue
-                if until and tc >= until.isoformat():
-                    continue
-                bc_uuid = item.get("barcode_uuid")
-                counter[bc_uuid] += 1
-
-            last_key = resp.get("LastEvaluatedKey")
-            if not last_key:
-                break
-
+        for partial in _scan_transactions(
+            lambda items: Counter(item.get("barcode_uuid") for item in items),
+            since=since,
+            until=until,
+        ):
+            counter.update(partial)
         return counter.most_common(limit)
 
     @staticmethod
@@ -76,49 +254,26 @@ class TransactionQueryMixin:
         Group usage counts by time bucket.
 
         Returns [(bucket_key, count), ...] where bucket_key is a date string.
-        NOTE: Scan-based — admin-only.
+        NOTE: Reads daily rollups for whole-day ranges, else scans — admin-only.
         """
-        from core.dynamodb.client import get_table
+        if granularity not in ("day", "week", "month"):
+            raise ValueError("granularity must be 'day', 'week', or 'month'.")
 
-        table = get_table("transactions")
+        # Days are folded into the requested buckets once, after the merge.
         buckets: Counter = Counter()
-
-        kwargs = {}
-        last_key = None
-        while True:
-            if last_key:
-                kwargs["ExclusiveStartKey"] = last_key
-            resp = table.scan(**kwargs)
-            for item in resp.get("Items", []):
-                tc = item.get("time_created", "")
-                if since and tc < since.isoformat():
+        for day, count in _daily_totals(since, until).items():
+            if granularity == "day":
+                bucket = day  # YYYY-MM-DD
+            elif granularity == "week":
+                try:
+                    # ISO week start (Monday)
+                    start = date.fromisoformat(day)
+                except ValueError:
                     continue
-                if until and tc >= until.isoformat():
-                    continue
-
-                # Truncate to bucket
-                if granularity == "day":
-                    bucket = tc[:10]  # YYYY-MM-DD
-                elif granularity == "week":
-                    try:
-                        dt = datetime.fromisoformat(tc)
-                        # ISO week start (Monday)
-                        week_start = dt - __import__("datetime").timedelta(
-                            days=dt.weekday()
-                        )
-                        bucket = week_start.strftime("%Y-%m-%d")
-                    except (ValueError, TypeError):
-                        continue
-                elif granularity == "month":
-                    bucket = tc[:7]  # YYYY-MM
-                else:
-                    raise ValueError("granularity must be 'day', 'week', or 'month'.")
-
-                buckets[bucket] += 1
-
-            last_key = resp.get("LastEvaluatedKey")
-            if not last_key:
-                break
+                bucket = (start - timedelta(days=start.weekday())).isoformat()
+            else:
+                bucket = day[:7]  # YYYY-MM
+            buckets[bucket] += count
 
         return sorted(buckets.items())
 
@@ -129,40 +284,38 @@ class TransactionQueryMixin:
         until: Optional[datetime] = None,
         only_valid_barcodes: bool = False,
     ) -> Dict[str, Any]:
-        """Scan-based barcode usage stats — admin-only."""
-        from core.dynamodb.client import get_table
-
-        table = get_table("transactions")
-        total = 0
-        with_fk = 0
-        per_barcode: Counter = Counter()
-
-        kwargs = {}
-        last_key = None
-        while True:
-            if last_key:
-                kwargs["ExclusiveStartKey"] = last_key
-            resp = table.scan(**kwargs)
-            for item in resp.get("Items", []):
-                tc = item.get("time_created", "")
-                if since and tc < since.isoformat():
-                    continue
-                if until and tc >= until.isoformat():
-                    continue
+        """Barcode usage stats from rollups or a scan — admin-only."""
+        day_range = _rollup_day_range(since, until)
+        if day_range is not None:
+            day_totals = UsageCounterRepository.get_day_totals(*day_range)
+            per_barcode = _barcode_totals_from_rollups(day_totals)
+            return {
+                "total": sum(day_totals.values()),
+                "with_fk": sum(per_barcode.values()),
+                "per_barcode": dict(per_barcode),
+            }
 
+        def aggregate(items):
+            total = 0
+            per_barcode: Counter = Counter()
+            for item in items:
                 total += 1
                 bc_uuid = item.get("barcode_uuid")
                 if bc_uuid:
-                    with_fk += 1
                     per_barcode[bc_uuid] += 1
+            return total, per_barcode
 
-            last_key = resp.get("LastEvaluatedKey")
-            if not last_key:
-                break
+        total = 0
+        per_barcode: Counter = Counter()
+        for segment_total, segment_counts in _scan_transactions(
+            aggregate, since=since, until=until
+        ):
+            total += segment_total
+            per_barcode.update(segment_counts)
 
         return {
             "total": total,
-            "with_fk": with_fk,
+            "with_fk": sum(per_barcode.values()),
             "per_barcode": dict(per_barcode),
         }
 
@@ -2,7 +2,7 @@ from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 from django.contrib.auth.models import AnonymousUser, User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from index.repositories import BarcodeRepository, TransactionRepository
@@ -158,6 +158,25 @@ class TransactionQueryServiceTests(DynamoDBTestMixin, TestCase):
         self.assertEqual(results[0]["sk"], tx2["sk"])
         self.assertEqual(results[1]["sk"], tx1["sk"])
 
+    def test_iter_for_user_resumes_from_cursor(self):
+        now = timezone.now()
+        created = [
+            self._create_tx(self.user, self.barcode1, now - timedelta(minutes=m))
+            for m in range(5)
+        ]
+
+        stream = TransactionRepository.iter_for_user(self.user.id, Limit=2)
+        first = [next(stream)["sk"] for _ in range(3)]
+        stream.close()
+        rest = [
+            item["sk"]
+            for item in TransactionRepository.iter_for_user(
+                self.user.id, cursor=stream.cursor
+            )
+        ]
+
+        self.assertEqual(first + rest, [tx["sk"] for tx in created])
+
     def test_for_user_with_since_filter(self):
         now = timezone.now()
         self._create_tx(self.user, self.barcode1, now - timedelta(days=2))
@@ -239,6 +258,78 @@ class TransactionQueryServiceTests(DynamoDBTestMixin, TestCase):
         self.assertEqual(stats["per_barcode"][self.barcode1["barcode_uuid"]], 2)
         self.assertEqual(stats["per_barcode"][self.barcode2["barcode_uuid"]], 1)
 
+    def test_top_barcodes_applies_time_range(self):
+        now = timezone.now()
+        self._create_tx(self.user, self.barcode1, now - timedelta(days=3))
+        self._create_tx(self.user, self.barcode2, now - timedelta(hours=1))
+        self._create_tx(self.user, self.barcode2, now + timedelta(hours=1))
+
+        results = TransactionQueryMixin.top_barcodes(
+            since=now - timedelta(days=1), until=now
+        )
+        self.assertEqual(results, [(self.barcode2["barcode_uuid"], 1)])
+
+    def test_usage_over_time_week_and_month_buckets(self):
+        monday = timezone.now().replace(year=2026, month=3, day=2, hour=12)
+        self._create_tx(self.user, self.barcode1, monday)
+        self._create_tx(self.user, self.barcode1, monday + timedelta(days=3))
+        self._create_tx(self.user, self.barcode1, monday + timedelta(days=7))
+
+        weeks = TransactionQueryMixin.usage_over_time(granularity="week")
+        self.assertEqual(weeks, [("2026-03-02", 2), ("2026-03-09", 1)])
+        months = TransactionQueryMixin.usage_over_time(granularity="month")
+        self.assertEqual(months, [("2026-03", 3)])
+
+    def test_analytics_scan_only_projected_attributes_in_range(self):
+        since = timezone.now() - timedelta(days=1)
+        with patch(
+            "index.services.transactions.queries.parallel_scan", return_value=[]
+        ) as mock_scan:
+            TransactionQueryMixin.barcode_usage_stats(since=since)
+
+        kwargs = mock_scan.call_args.kwargs
+        self.assertEqual(kwargs["ProjectionExpression"], "time_created, barcode_uuid")
+        self.assertIn("FilterExpression", kwargs)
+
+    @override_settings(USAGE_ROLLUP_READS=True)
+    def test_whole_day_ranges_read_rollups_without_scanning(self):
+        day = timezone.now().replace(
+            year=2026, month=3, day=2, hour=0, minute=0, second=0, microsecond=0
+        )
+        self._create_tx(self.user, self.barcode1, day - timedelta(hours=1))
+        self._create_tx(self.user, self.barcode1, day + timedelta(hours=1))
+        self._create_tx(self.user, self.barcode2, day + timedelta(hours=2))
+        self._create_tx(self.user, self.barcode2, day + timedelta(days=1, hours=1))
+
+        with patch("index.services.transactions.queries.parallel_scan") as mock_scan:
+            top = TransactionQueryMixin.top_barcodes(
+                since=day, until=day + timedelta(days=1)
+            )
+            over_time = TransactionQueryMixin.usage_over_time(since=day)
+            stats = TransactionQueryMixin.barcode_usage_stats(until=day)
+
+        mock_scan.assert_not_called()
+        self.assertEqual(
+            sorted(top),
+            sorted(
+                [(self.barcode1["barcode_uuid"], 1), (self.barcode2["barcode_uuid"], 1)]
+            ),
+        )
+        self.assertEqual(over_time, [("2026-03-02", 2), ("2026-03-03", 1)])
+        self.assertEqual(stats["total"], 1)
+        self.assertEqual(stats["per_barcode"], {self.barcode1["barcode_uuid"]: 1})
+
+    @override_settings(USAGE_ROLLUP_READS=False)
+    def test_rollup_reads_can_be_disabled(self):
+        self._create_tx(self.user, self.barcode1, timezone.now())
+
+        with patch(
+            "index.services.transactions.queries.parallel_scan", return_value=[]
+        ) as mock_scan:
+            TransactionQueryMixin.top_barcodes()
+
+        mock_scan.assert_called_once()
+
     def test_for_barcode_returns_filtered_transactions(self):
         now = timezone.now()
         tx1 = self._create_tx(self.user, self.barcode1, now)
@@ -287,67 +378,95 @@ class TransactionQueryServiceTests(DynamoDBTestMixin, TestCase):
         results = TransactionRepository.for_barcode(self.barcode1["barcode_uuid"])
         self.assertEqual(len(results), 5)
 
+    def test_history_page_walks_the_history_with_cursors(self):
+        now = timezone.now()
+        for i in range(5):
+            self._create_tx(self.user, self.barcode1, now - timedelta(minutes=i))
+        self._create_tx(self.user2, self.barcode2, now)
+
+        first = TransactionQueryMixin.history_page(self.user, page_size=2)
+        self.assertEqual(len(first["results"]), 2)
+        self.assertEqual(
+            set(first["results"][0]),
+            {"transaction_id", "time_created", "barcode_uuid", "barcode_value"},
+        )
+        self.assertIsNotNone(first["next_cursor"])
+
+        seen = list(first["results"])
+        cursor = first["next_cursor"]
+        while cursor:
+            page = TransactionQueryMixin.history_page(
+                self.user, cursor=cursor, page_size=2
+            )
+            seen += page["results"]
+            cursor = page["next_cursor"]
+
+        times = [entry["time_created"] for entry in seen]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(times, sorted(times, reverse=True))
+
+    def test_history_page_reads_one_page_only(self):
+        with patch(
+            "index.repositories.transaction_repo.iter_query",
+            return_value=MagicMock(cursor=None),
+        ) as mock_iter:
+            page = TransactionQueryMixin.history_page(self.user, page_size=10**6)
+
+        self.assertEqual(page, {"results": [], "next_cursor": None})
+        kwargs = mock_iter.call_args.kwargs
+        self.assertEqual(kwargs["max_items"], 200)
+        self.assertFalse(kwargs["prefetch"])
+
+    def test_history_page_rejects_foreign_or_tampered_cursors(self):
+        now = timezone.now()
+        for i in range(3):
+            self._create_tx(self.user, self.barcode1, now - timedelta(minutes=i))
+        cursor = TransactionQueryMixin.history_page(self.user, page_size=1)[
+            "next_cursor"
+        ]
+
+        with self.assertRaises(ValueError):
+            TransactionQueryMixin.history_page(self.user2, cursor=cursor)
+        with self.assertRaises(ValueError):
+            TransactionQueryMixin.history_page(
+                self.user, cursor=cursor, since=now - timedelta(days=1)
+            )
+        with self.assertRaises(ValueError):
+            TransactionQueryMixin.history_page(self.user, cursor=cursor + "x")
+
 
 class TransactionRepositoryRoutingTests(TestCase):
     """
-    Verify the bounded path uses query_limited and unbounded path uses
-    query_all — guards against accidentally routing unlimited reads through
-    the bounded helper (which would cap them at max_items).
+    Verify the bounded path passes max_items to iter_query and the unbounded
+    path does not — guards against accidentally capping unlimited reads.
     """
 
-    def test_for_user_with_limit_routes_through_query_limited(self):
-        with patch(
-            "index.repositories.transaction_repo.query_limited",
-            return_value=[],
-        ) as mock_limited, patch(
-            "index.repositories.transaction_repo.query_all",
-            return_value=[],
-        ) as mock_all:
-            TransactionRepository.for_user(user_id=1, limit=5)
-
-        mock_limited.assert_called_once()
-        self.assertEqual(mock_limited.call_args.args[1], 5)
-        mock_all.assert_not_called()
-
-    def test_for_user_without_limit_routes_through_query_all(self):
-        with patch(
-            "index.repositories.transaction_repo.query_limited",
-            return_value=[],
-        ) as mock_limited, patch(
-            "index.repositories.transaction_repo.query_all",
-            return_value=[],
-        ) as mock_all:
-            TransactionRepository.for_user(user_id=1)
-
-        mock_all.assert_called_once()
-        mock_limited.assert_not_called()
-
-    def test_for_barcode_with_limit_routes_through_query_limited(self):
+    def _route(self, read, **kwargs):
         with patch(
-            "index.repositories.transaction_repo.query_limited",
-            return_value=[],
-        ) as mock_limited, patch(
-            "index.repositories.transaction_repo.query_all",
-            return_value=[],
-        ) as mock_all:
-            TransactionRepository.for_barcode(barcode_uuid="bc", limit=3)
-
-        mock_limited.assert_called_once()
-        self.assertEqual(mock_limited.call_args.args[1], 3)
-        mock_all.assert_not_called()
-
-    def test_for_barcode_without_limit_routes_through_query_all(self):
-        with patch(
-            "index.repositories.transaction_repo.query_limited",
-            return_value=[],
-        ) as mock_limited, patch(
-            "index.repositories.transaction_repo.query_all",
-            return_value=[],
-        ) as mock_all:
-            TransactionRepository.for_barcode(barcode_uuid="bc")
-
-        mock_all.assert_called_once()
-        mock_limited.assert_not_called()
+            "index.repositories.transaction_repo.iter_query",
+            return_value=iter(()),
+        ) as mock_iter:
+            read(**kwargs)
+        mock_iter.assert_called_once()
+        return mock_iter.call_args.kwargs
+
+    def test_for_user_with_limit_bounds_the_stream(self):
+        kwargs = self._route(TransactionRepository.for_user, user_id=1, limit=5)
+        self.assertEqual(kwargs["max_items"], 5)
+
+    def test_for_user_without_limit_streams_everything(self):
+        kwargs = self._route(TransactionRepository.for_user, user_id=1)
+        self.assertIsNone(kwargs["max_items"])
+
+    def test_for_barcode_with_limit_bounds_the_stream(self):
+        kwargs = self._route(
+            TransactionRepository.for_barcode, barcode_uuid="bc", limit=3
+        )
+        self.assertEqual(kwargs["max_items"], 3)
+
+    def test_for_barcode_without_limit_streams_everything(self):
+        kwargs = self._route(TransactionRepository.for_barcode, barcode_uuid="bc")
+        self.assertIsNone(kwargs["max_items"])
 
 
 class TransactionServiceCompositeTests(TestCase):
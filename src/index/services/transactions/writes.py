@@ -20,6 +20,13 @@ class CreatedTransaction:
     time_created: str
 
 
+def _barcode_owner_id(barcode: object) -> Optional[str]:
+    """Owner user_id of a DynamoDB barcode dict or Barcode model, if known."""
+    if isinstance(barcode, dict):
+        return barcode.get("user_id")
+    return getattr(barcode, "user_id", None)
+
+
 class TransactionWriteMixin:
     """Write operations for Transaction service."""
 
@@ -52,6 +59,7 @@ class TransactionWriteMixin:
                 str(barcode.barcode_uuid) if hasattr(barcode, "barcode_uuid") else None
             )
             barcode_value = barcode.barcode if hasattr(barcode, "barcode") else None
+        owner_id = _barcode_owner_id(barcode)
 
         when = time_created.isoformat() if time_created else None
 
@@ -60,6 +68,7 @@ class TransactionWriteMixin:
             barcode_uuid=barcode_uuid,
             barcode_value=barcode_value,
             time_created=when,
+            barcode_owner_id=owner_id,
         )
         return item
 
@@ -112,6 +121,7 @@ class TransactionWriteMixin:
                     "barcode_uuid": barcode_uuid,
                     "barcode_value": barcode_value,
                     "time_created": when_str,
+                    "barcode_owner_id": _barcode_owner_id(barcode),
                 }
             )
 
@@ -1,48 +1,37 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, time
 from typing import Optional, Tuple
 
-from django.utils import timezone
-
-from index.repositories import TransactionRepository
+from core.dynamodb.concurrency import ConcurrentReads
+from index.repositories import UsageCounterRepository
 
 
 class UsageLimitService:
     """Service for checking and enforcing barcode usage limits."""
 
     @staticmethod
-    def _today_window() -> tuple[str, str]:
-        """
-        Return the start and end ISO timestamps for "today" in the current timezone.
-        """
-        local_tz = timezone.get_current_timezone()
-        today_date = timezone.localdate()
-
-        start_local = datetime.combine(today_date, time.min, tzinfo=local_tz)
-        end_local = start_local + timedelta(days=1)
-
-        return start_local.isoformat(), end_local.isoformat()
-
-    @staticmethod
-    def check_daily_limit(barcode: dict) -> Tuple[bool, Optional[str]]:
+    def check_daily_limit(
+        barcode: dict, today_count: Optional[int] = None
+    ) -> Tuple[bool, Optional[str]]:
         """
         Check if barcode has exceeded its daily usage limit.
 
+        Reads the materialized daily counter (one GetItem) rather than
+        counting today's transactions.
+
         Args:
             barcode: Dict with barcode data (from DynamoDB or repository).
+            today_count: Today's usage when already read.
         """
         daily_limit = int(barcode.get("daily_usage_limit", 0))
 
         if daily_limit == 0:
             return True, None
 
-        start_of_day, end_of_day = UsageLimitService._today_window()
-
-        today_count = TransactionRepository.count_for_barcode_since(
-            barcode_uuid=barcode["barcode_uuid"],
-            since=start_of_day,
-        )
+        if today_count is None:
+            today_count = UsageCounterRepository.get_daily_count(
+                barcode["barcode_uuid"]
+            )
 
         if today_count >= daily_limit:
             return (
@@ -53,14 +42,43 @@ class UsageLimitService:
         return True, None
 
     @staticmethod
-    def check_total_limit(barcode: dict) -> Tuple[bool, Optional[str]]:
-        """Check if barcode has exceeded its total usage limit."""
+    def total_usage(barcode: dict, shard_usage: Optional[int] = None) -> int:
+        """
+        Return the barcode's total usage, including its usage shards if it
+        has sharded counters. Pass *shard_usage* when already prefetched.
+        """
+        total = int(barcode.get("total_usage", 0))
+        if not barcode.get("usage_shards"):
+            return total
+        if shard_usage is None:
+            shard_usage = UsageCounterRepository.get_sharded_totals([barcode]).get(
+                str(barcode["barcode_uuid"]), 0
+            )
+        return total + shard_usage
+
+    @staticmethod
+    def check_total_limit(
+        barcode: dict, total_usage: Optional[int] = None
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Check if barcode has exceeded its total usage limit.
+
+        The check runs before the use is written, so it is not atomic with
+        it: concurrent requests can all pass it, and a barcode can end up
+        over its limit by at most the number of its uses in flight at once
+        (across all workers). Sharded counters do not widen this bound: the
+        shards are summed with strongly consistent reads, so every use whose
+        write finished before the check is counted.
+
+        Pass *total_usage* when already read.
+        """
         total_limit = int(barcode.get("total_usage_limit", 0))
 
         if total_limit == 0:
             return True, None
 
-        total_usage = int(barcode.get("total_usage", 0))
+        if total_usage is None:
+            total_usage = UsageLimitService.total_usage(barcode)
         if total_usage >= total_limit:
             return (
                 False,
@@ -71,24 +89,48 @@ class UsageLimitService:
 
     @staticmethod
     def check_all_limits(barcode: dict) -> Tuple[bool, Optional[str]]:
-        """Check both daily and total usage limits."""
-        allowed, error = UsageLimitService.check_daily_limit(barcode)
-        if not allowed:
-            return allowed, error
-        return UsageLimitService.check_total_limit(barcode)
+        """
+        Check both daily and total usage limits.
+
+        The daily counter and the usage shards (if any) are read
+        concurrently.
+        """
+        daily_read = total_read = None
+        with ConcurrentReads() as reads:
+            if int(barcode.get("daily_usage_limit", 0)):
+                daily_read = reads.submit(
+                    UsageCounterRepository.get_daily_count, barcode["barcode_uuid"]
+                )
+            if int(barcode.get("total_usage_limit", 0)) and barcode.get("usage_shards"):
+                total_read = reads.submit(UsageLimitService.total_usage, barcode)
+
+            allowed, error = UsageLimitService.check_daily_limit(
+                barcode, None if daily_read is None else reads.result(daily_read)
+            )
+            if not allowed:
+                return allowed, error
+            return UsageLimitService.check_total_limit(
+                barcode, None if total_read is None else reads.result(total_read)
+            )
 
     @staticmethod
-    def get_usage_stats(barcode: dict) -> dict:
-        """Get current usage statistics for a barcode."""
+    def get_usage_stats(
+        barcode: dict,
+        daily_used: Optional[int] = None,
+        shard_usage: Optional[int] = None,
+    ) -> dict:
+        """
+        Get current usage statistics for a barcode.
+
+        Pass *daily_used* (and *shard_usage* for sharded barcodes) when they
+        were already prefetched to skip the counter reads.
+        """
         daily_limit = int(barcode.get("daily_usage_limit", 0))
         total_limit = int(barcode.get("total_usage_limit", 0))
-        total_usage = int(barcode.get("total_usage", 0))
+        total_usage = UsageLimitService.total_usage(barcode, shard_usage)
 
-        start_of_day, _ = UsageLimitService._today_window()
-        daily_used = TransactionRepository.count_for_barcode_since(
-            barcode_uuid=barcode["barcode_uuid"],
-            since=start_of_day,
-        )
+        if daily_used is None:
+            daily_used = UsageCounterRepository.get_daily_count(barcode["barcode_uuid"])
 
         return {
             "daily_used": daily_used,
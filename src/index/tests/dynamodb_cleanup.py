@@ -6,7 +6,15 @@ DynamoDB data persists across test methods and test classes within the same
 test run. This module provides cleanup helpers to ensure test isolation.
 """
 
+from django.core.cache import cache
+
+from authn.repositories import SecurityRepository
 from core.dynamodb.client import get_table
+from index.repositories import (
+    BarcodeRepository,
+    IdentificationReservoir,
+    SettingsRepository,
+)
 
 
 def _clear_table(table_key: str) -> None:
@@ -33,8 +41,22 @@ def _clear_table(table_key: str) -> None:
 
 def clear_all_dynamodb_tables() -> None:
     """Clear all DynamoDB tables."""
-    for table_key in ("barcodes", "transactions", "user_settings", "auth_security"):
+    for table_key in (
+        "barcodes",
+        "transactions",
+        "user_settings",
+        "auth_security",
+        "usage_counters",
+    ):
         _clear_table(table_key)
+    # Per-worker caches would otherwise serve rows from the previous test.
+    BarcodeRepository.reset_pull_pool()
+    SecurityRepository.clear_session_revocation_cache()
+    SecurityRepository.clear_blacklist_cache()
+    SettingsRepository.clear_cache()
+    IdentificationReservoir.reset()
+    # Shared-cache entries (e.g. settings versions) refer to the cleared rows.
+    cache.clear()
 
 
 class DynamoDBCleanupMixin:
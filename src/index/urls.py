@@ -8,6 +8,7 @@ from index.api.dashboard import (
     DynamicBarcodeCreateAPIView,
     TransferDynamicBarcodeAPIView,
 )
+from index.api.transactions import TransactionHistoryAPIView
 
 app_name = "index"
 
@@ -42,4 +43,10 @@ urlpatterns = [
         TransferDynamicBarcodeAPIView.as_view(),
         name="api_transfer_dynamic_barcode",
     ),
+    # paginated transaction history of the current user
+    path(
+        "transaction_history/",
+        TransactionHistoryAPIView.as_view(),
+        name="api_transaction_history",
+    ),
 ]